@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark for `python -m synthos_core.cli agent echo`.
+
+Runs the command several times with `-X importtime`, then reports the median
+wall time, the total import time and the slowest top-level imports. With
+--budget-ms the script exits non-zero when the median wall time exceeds the
+budget, so it can guard against startup regressions in CI.
+
+Usage:
+  python scripts/bench_cli_startup.py --runs 10 --budget-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_COMMAND = ["-m", "synthos_core.cli", "agent", "echo", "--input", '{"message": "hi"}', "--no-pretty"]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for top-level imports."""
+    rows: List[Tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        # One leading space marks a top-level import; nested imports are indented further
+        if len(m.group(3)) != 1:
+            continue
+        rows.append((m.group(4), int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def run_once(command: List[str]) -> Tuple[float, List[Tuple[str, int, int]]]:
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))
+        raise SystemExit(f"command failed with exit code {proc.returncode}:\n{tail}")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark synthos_core.cli cold-start latency")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest top-level imports")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if median wall time exceeds this")
+    args = parser.parse_args()
+
+    walls: List[float] = []
+    cumulative: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        elapsed, rows = run_once(DEFAULT_COMMAND)
+        walls.append(elapsed)
+        for module, _self_us, cum_us in rows:
+            cumulative.setdefault(module, []).append(cum_us)
+
+    median_ms = statistics.median(walls) * 1000
+    import_ms = sum(statistics.median(v) for v in cumulative.values()) / 1000
+    print(f"runs: {args.runs}  median wall: {median_ms:.1f} ms  imports: {import_ms:.1f} ms")
+    print(f"{'top-level import':<40} {'median ms':>10}")
+    slowest = sorted(cumulative.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for module, values in slowest[: args.top]:
+        print(f"{module:<40} {statistics.median(values) / 1000:>10.1f}")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"FAIL: median wall time {median_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Memory benchmark: whole-file json.loads task loading vs. the mmap-backed
+incremental iterator in synthos_core.taskfile.
+
+Each loader runs in a fresh interpreter so peak RSS is measured in isolation.
+
+Usage:
+  python scripts/bench_task_loading.py --tasks 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+LOADERS = {
+    # cli._load_tasks ('run'): read the whole file, parse it, keep every item
+    "read_text+json.loads": (
+        "import json, pathlib\n"
+        "items = json.loads(pathlib.Path(PATH).read_text())\n"
+        "count = len(items)\n"
+    ),
+    # 'run --stream --tasks FILE': items are parsed and consumed one at a time
+    "iter_json_array": (
+        "from synthos_core.taskfile import iter_json_array\n"
+        "count = sum(1 for _ in iter_json_array(PATH))\n"
+    ),
+}
+
+CHILD_TEMPLATE = (
+    "import resource, sys, time\n"
+    "sys.path.insert(0, {root!r})\n"
+    "PATH = {path!r}\n"
+    "t0 = time.perf_counter()\n"
+    "{body}"
+    "elapsed = time.perf_counter() - t0\n"
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "if sys.platform == 'darwin':\n"
+    "    rss //= 1024\n"
+    "print(count, elapsed, rss)\n"
+)
+
+
+def write_tasks_file(path: Path, count: int) -> None:
+    with path.open("w") as f:
+        f.write("[\n")
+        for i in range(count):
+            task = {
+                "id": f"t{i}",
+                "agent_type": "trekcore" if i % 2 else "webget",
+                "input": {"action": "list_audio", "category_url": f"https://www.trekcore.com/audio/cat{i % 97}/"},
+            }
+            f.write(json.dumps(task))
+            f.write(",\n" if i + 1 < count else "\n")
+        f.write("]\n")
+
+
+def run_loader(body: str, path: Path) -> tuple:
+    code = CHILD_TEMPLATE.format(root=str(REPO_ROOT), path=str(path), body=body)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+    return int(out[0]), float(out[1]), int(out[2])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of task file loaders")
+    parser.add_argument("--tasks", type=int, default=200_000, help="Number of tasks in the generated file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.json"
+        write_tasks_file(path, args.tasks)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"{args.tasks} tasks, {size_mb:.1f} MiB file")
+        print(f"{'loader':<28} {'tasks':>10} {'seconds':>9} {'peak RSS MiB':>13}")
+        for label, body in LOADERS.items():
+            count, elapsed, rss_kb = run_loader(body, path)
+            print(f"{label:<28} {count:>10} {elapsed:>9.2f} {rss_kb / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
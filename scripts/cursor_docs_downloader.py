@@ -0,0 +1,60 @@
+"""
+Download the Cursor docs into a local page store and keep the full-text
+index used by the cursor agent and scripts/topic_lookup.py in step.
+
+Each run is incremental: pages are requested conditionally, only changed
+pages are rewritten, and pages that disappeared are dropped. Every language
+has its own store (<docs-dir>/<lang>/) and index shard, and a crawl never
+follows links into another language's subtree; the shard is reconciled with
+the store, so pages it is missing are indexed even when unchanged.
+
+Usage:
+  python scripts/cursor_docs_downloader.py --max-pages 500
+  python scripts/cursor_docs_downloader.py --start-url https://docs.cursor.com/ja/ --lang ja
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthos_core.agents_cursor import CURSOR_DOCS_URL, DEFAULT_DOCS_DIR, DEFAULT_INDEX_DIR, DEFAULT_LANG, sync_docs  # noqa: E402
+from synthos_core.downloader import DEFAULT_MAX_CONCURRENCY  # noqa: E402
+from synthos_core.textindex import InvertedIndex  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-url", default=CURSOR_DOCS_URL, help="Page to start crawling from")
+    parser.add_argument("--prefix", default=None, help="Only follow links under this URL prefix (default: the start page's directory)")
+    parser.add_argument("--docs-dir", default=DEFAULT_DOCS_DIR, help="Page store directory (one subdirectory per --lang)")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help="Full-text index directory")
+    parser.add_argument("--lang", default=DEFAULT_LANG, help="Docs language: its page store subdirectory and index shard")
+    parser.add_argument("--max-pages", type=int, default=None, help="Stop discovering pages after this many")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    index = InvertedIndex(args.index_dir)
+    try:
+        _, summary = sync_docs(
+            args.docs_dir,
+            index,
+            args.start_url,
+            args.lang,
+            prefix=args.prefix,
+            max_pages=args.max_pages,
+            max_concurrency=args.max_concurrency,
+        )
+    finally:
+        index.close()
+    print(json.dumps({key: len(value) if isinstance(value, list) else value for key, value in summary.items()}, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+"""
+Look a topic up in the Cursor docs index built by
+scripts/cursor_docs_downloader.py (the same index the cursor agent uses).
+
+Only the index is read: each lookup touches the postings of the query
+terms, never the saved pages.
+
+Usage:
+  python scripts/topic_lookup.py "keyboard shortcuts"
+  python scripts/topic_lookup.py "モデル" --lang ja --limit 20 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthos_core.agents_cursor import DEFAULT_INDEX_DIR, DEFAULT_LANG, DEFAULT_MAX_PAGES  # noqa: E402
+from synthos_core.textindex import InvertedIndex  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("query", help="Words to look up")
+    parser.add_argument("--lang", default=DEFAULT_LANG, help="Index shard to search")
+    parser.add_argument("--limit", type=int, default=DEFAULT_MAX_PAGES, help="Number of pages to list")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help="Full-text index directory")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    index = InvertedIndex(args.index_dir)
+    try:
+        hits = index.search(args.query, args.lang, args.limit)
+    finally:
+        index.close()
+    if args.json:
+        print(json.dumps([{"url": url, "score": round(score, 4)} for url, score in hits], indent=2))
+    else:
+        for url, score in hits:
+            print(f"{score:8.3f}  {url}")
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
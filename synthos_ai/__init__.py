@@ -11,15 +11,33 @@ __version__ = "1.0.0"
 __author__ = "Synthverse Labs"
 __description__ = "AI Assistant for Synthverse Labs Business Operations"
 
+import threading
+
 from .core.identity import SynthosIdentity
 from .memory.context import SynthosMemory
 from .protocols.activation import ActivationProtocol
 
-# Initialize Synthos when imported
-identity = SynthosIdentity()
-memory = SynthosMemory()
-activation = ActivationProtocol()
+# Importing the memory subpackage binds the name 'memory'; free it for the singleton
+del memory
+
+# Module-level singletons are created on first access (or by activate()), so
+# importing e.g. synthos_ai.integrations does not read the memory files.
+_SINGLETONS = {
+    "identity": SynthosIdentity,
+    "memory": SynthosMemory,
+    "activation": ActivationProtocol,
+}
+_singleton_lock = threading.Lock()
+
+def __getattr__(name):
+    factory = _SINGLETONS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _singleton_lock:
+        if name not in globals():
+            globals()[name] = factory()
+    return globals()[name]
 
 def activate():
     """Activate Synthos AI assistant"""
-    return activation.initialize(identity, memory)
+    return __getattr__("activation").initialize(__getattr__("identity"), __getattr__("memory"))
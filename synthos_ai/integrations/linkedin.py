@@ -3,11 +3,12 @@ Synthos LinkedIn Integration - Complete control over LinkedIn operations
 """
 
 import os
-import requests
 import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .session import REQUEST_TIMEOUT, get_session
+
 class LinkedInIntegration:
     """Complete LinkedIn integration for Synthos with full control"""
     
@@ -16,6 +17,9 @@ class LinkedInIntegration:
         self.client_secret = os.getenv('LINKEDIN_CLIENT_SECRET')
         self.access_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
         self.base_url = "https://api.linkedin.com/v2"
+        # Shared keep-alive session: repeated API calls skip the TCP+TLS handshake
+        self.session = get_session()
+        self.timeout = REQUEST_TIMEOUT
         
     def setup_credentials(self, client_id: str, client_secret: str):
         """Set up LinkedIn API credentials"""
@@ -70,7 +74,7 @@ class LinkedInIntegration:
             'client_secret': self.client_secret
         }
         
-        response = requests.post(token_url, data=data)
+        response = self.session.post(token_url, data=data, timeout=self.timeout)
         
         if response.status_code == 200:
             token_data = response.json()
@@ -101,14 +105,14 @@ class LinkedInIntegration:
         
         # Get basic profile
         profile_url = f"{self.base_url}/people/~"
-        response = requests.get(profile_url, headers=headers)
+        response = self.session.get(profile_url, headers=headers, timeout=self.timeout)
         
         if response.status_code == 200:
             profile_data = response.json()
             
             # Get email
             email_url = f"{self.base_url}/emailAddress?q=members&projection=(elements*(handle~))"
-            email_response = requests.get(email_url, headers=headers)
+            email_response = self.session.get(email_url, headers=headers, timeout=self.timeout)
             
             if email_response.status_code == 200:
                 email_data = email_response.json()
@@ -135,7 +139,7 @@ class LinkedInIntegration:
         }
         
         connections_url = f"{self.base_url}/people/~/connections"
-        response = requests.get(connections_url, headers=headers)
+        response = self.session.get(connections_url, headers=headers, timeout=self.timeout)
         
         if response.status_code == 200:
             return {
@@ -183,7 +187,7 @@ class LinkedInIntegration:
         }
         
         share_url = f"{self.base_url}/ugcPosts"
-        response = requests.post(share_url, headers=headers, json=share_data)
+        response = self.session.post(share_url, headers=headers, json=share_data, timeout=self.timeout)
         
         if response.status_code == 201:
             return {
@@ -208,7 +212,7 @@ class LinkedInIntegration:
         }
         
         updates_url = f"{self.base_url}/organizations/{company_id}/updates"
-        response = requests.get(updates_url, headers=headers)
+        response = self.session.get(updates_url, headers=headers, timeout=self.timeout)
         
         if response.status_code == 200:
             return {
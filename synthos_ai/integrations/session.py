@@ -0,0 +1,45 @@
+"""
+Synthos Integrations Session - Shared keep-alive HTTP session for external APIs
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of hosts to keep connection pools for, and connections kept per host
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+REQUEST_TIMEOUT = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+def _new_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def configure_session(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """Create (or replace) the shared session with the given pool sizes"""
+    global _session
+    session = _new_session(pool_connections, pool_maxsize)
+    with _session_lock:
+        old, _session = _session, session
+    if old is not None:
+        old.close()
+    return session
+
+def get_session() -> requests.Session:
+    """Return the session shared by all integrations, creating it on first use"""
+    global _session
+    # Double-checked: the lock is only taken until the session exists
+    session = _session
+    if session is not None:
+        return session
+    with _session_lock:
+        if _session is None:
+            _session = _new_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+        return _session
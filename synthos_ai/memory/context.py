@@ -1,40 +1,378 @@
 """
 Synthos Memory - Persistent context and relationship memory
+
+Several Synthos processes can share one directory (root=... or $SYNTHOS_HOME,
+else the working directory): changes are appended to per-file journals under
+an exclusive file lock, readers never take the lock, and each named session
+(SynthosMemory(session=...) or $SYNTHOS_SESSION) keeps its own files under
+.synthos_sessions/. Loading creates no memory files (they appear on the first
+change); it only leaves a pre-parsed <file>.cache next to a file it has read.
 """
 
 import json
+import logging
+import marshal
 import os
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): writers are only serialized within a process
+    fcntl = None
+
+# Suffix of the pre-parsed (marshal) copy kept next to each JSON file
+CACHE_SUFFIX = ".cache"
+# Suffix an unreadable snapshot is moved to instead of being overwritten
+CORRUPT_SUFFIX = ".corrupt"
+# Suffix of the append-only change log kept next to each snapshot
+JOURNAL_SUFFIX = ".journal"
+# Fold the journal into the snapshot after this many records
+COMPACT_EVERY = 500
+# Snapshot key holding the last journal sequence number it includes
+SEQ_KEY = "_journal_seq"
+# Directory holding the files of named sessions
+SESSIONS_DIR = ".synthos_sessions"
+# Environment variable naming the session when none is passed in
+SESSION_ENV = "SYNTHOS_SESSION"
+# Environment variable naming the directory for all memory files when none is passed in
+ROOT_ENV = "SYNTHOS_HOME"
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_record(data: Dict[str, Any], record: Dict[str, Any]):
+    """Apply one journal record to a document"""
+    if record["op"] == "append":
+        data.setdefault(record["key"], []).append(record["value"])
+    elif record["op"] == "set":
+        data[record["key"]] = record["value"]
+
+
+def _write_snapshot(path: str, data: Dict[str, Any], seq: int):
+    """Atomically replace a snapshot, stamped with the journal position it covers"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(data, **{SEQ_KEY: seq}), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    """Read all complete journal records"""
+    records = []
+    try:
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn line from an interrupted or in-progress append
+                    pass
+    except OSError:
+        pass
+    return records
+
+
+def _snapshot_version(path: str) -> Optional[tuple]:
+    """Identify the snapshot file currently at path (changes whenever it is replaced)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class _FileLock:
+    """Exclusive lock shared by the threads of this process and, via flock, other processes"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+    
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; returns False if non-blocking and it is held elsewhere"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if fcntl is None:
+            return True
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._thread_lock.release()
+            if blocking:
+                raise
+            return False
+        return True
+    
+    def release(self):
+        """Release the lock"""
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+    
+    def locked(self) -> bool:
+        """Whether a thread of this process holds the lock"""
+        return self._thread_lock.locked()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Journal:
+    """
+    Append-only change log for one JSON snapshot, shared between processes.
+    
+    Appends hold the journal lock just long enough to apply records other
+    processes wrote since our last look and write one line, so concurrent
+    updates merge instead of overwriting each other. Compaction folds the
+    journal into the snapshot in the background under a separate lock and
+    replaces both files atomically; readers take no lock and simply retry
+    if the snapshot was replaced while they were reading.
+    """
+    
+    def __init__(self, snapshot_path: str, read_snapshot: Callable[[], Dict[str, Any]]):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + JOURNAL_SUFFIX
+        self.seq = 0
+        self.pending = 0
+        self._read_snapshot = read_snapshot
+        self._default: Callable[[], Dict[str, Any]] = dict
+        self._inode = None
+        self._offset = 0
+        self._lock = _FileLock(self.path + ".lock")
+        self._compact_lock = _FileLock(snapshot_path + ".compact.lock")
+    
+    def _read_new(self) -> List[Dict[str, Any]]:
+        """Read records newer than self.seq that this process has not seen yet"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            self._inode, self._offset, self.pending = None, 0, 0
+            return []
+        records = []
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                # The journal was compacted: read the (short) new file from the start
+                self._inode, self._offset, self.pending = st.st_ino, 0, 0
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # An append still in progress
+                    break
+                self._offset += len(line)
+                self.pending += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record["seq"] > self.seq:
+                    records.append(record)
+        return records
+    
+    def _reload(self, data: Dict[str, Any]):
+        """Replace data with the current snapshot plus journal"""
+        while True:
+            version = _snapshot_version(self.snapshot_path)
+            fresh = self._read_snapshot()
+            if not isinstance(fresh, dict):
+                raise ValueError("snapshot is not a JSON object")
+            self.seq = fresh.pop(SEQ_KEY, 0)
+            self._inode = None
+            for record in self._read_new():
+                _apply_record(fresh, record)
+                self.seq = record["seq"]
+            if _snapshot_version(self.snapshot_path) == version:
+                break
+        data.clear()
+        data.update(fresh)
+    
+    def catch_up(self, data: Dict[str, Any]):
+        """Apply changes made by other processes since this one last looked"""
+        records = self._read_new()
+        if records and (records[0]["op"] == "mark" or records[0]["seq"] > self.seq + 1):
+            # Compacted past us while we were idle (a mark newer than our
+            # position stands for records now only in the snapshot): start over
+            self._reload(data)
+            return
+        for record in records:
+            _apply_record(data, record)
+            self.seq = record["seq"]
+    
+    def load(self, default: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Load snapshot plus journal, starting from default if there is no readable snapshot (nothing is written)"""
+        self._default = default
+        data: Dict[str, Any] = {}
+        try:
+            self._reload(data)
+        except FileNotFoundError:
+            data = self._salvage(default)
+        except ValueError as exc:
+            # Never write over a snapshot we cannot read: keep it for recovery
+            corrupt_path = f"{self.snapshot_path}.{datetime.now():%Y%m%dT%H%M%S%f}{CORRUPT_SUFFIX}"
+            os.replace(self.snapshot_path, corrupt_path)
+            logger.warning("Unreadable %s (%s); moved to %s and started from defaults", self.snapshot_path, exc, corrupt_path)
+            data = self._salvage(default)
+        return data
+    
+    def _salvage(self, default: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Start from default, replaying any journal left without a readable snapshot"""
+        data = default()
+        self.seq, self._inode = 0, None
+        for record in self._read_new():
+            _apply_record(data, record)
+            self.seq = record["seq"]
+        return data
+    
+    def append(self, data: Dict[str, Any], op: str, key: str, value: Any):
+        """Apply one change to data and record it"""
+        self._ensure_dir()
+        with self._lock:
+            self.catch_up(data)
+            self.seq += 1
+            record = {"seq": self.seq, "op": op, "key": key, "value": value}
+            _apply_record(data, record)
+            line = (json.dumps(record) + "\n").encode()
+            with open(self.path, 'ab') as f:
+                if f.tell() > self._offset and self._inode == os.fstat(f.fileno()).st_ino:
+                    # Seal a line torn by a writer that died mid-append
+                    line = b"\n" + line
+                f.write(line)
+                self._inode = os.fstat(f.fileno()).st_ino
+                self._offset = f.tell()
+            self.pending += 1
+            if self.pending < COMPACT_EVERY or self._compact_lock.locked():
+                return
+        threading.Thread(target=self.compact, daemon=True).start()
+    
+    def compact(self):
+        """Fold the journal into the snapshot, working from disk so writers are not held up"""
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                # Never saved yet: the journal applies to the defaults
+                data = self._default()
+            seq = data.pop(SEQ_KEY, 0)
+            for record in _read_records(self.path):
+                if record["seq"] > seq:
+                    _apply_record(data, record)
+                    seq = record["seq"]
+            _write_snapshot(self.snapshot_path, data, seq)
+            with self._lock:
+                self._truncate_locked(seq)
+        except:
+            pass
+        finally:
+            self._compact_lock.release()
+    
+    def save(self, data: Dict[str, Any]):
+        """Merge in other processes' changes, then write a full snapshot and reset the journal"""
+        self._ensure_dir()
+        with self._compact_lock:
+            with self._lock:
+                self.catch_up(data)
+                _write_snapshot(self.snapshot_path, data, self.seq)
+                self._truncate_locked(self.seq)
+    
+    def _ensure_dir(self):
+        """Create the snapshot's directory; lock and journal files live next to the snapshot"""
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def _truncate_locked(self, seq: int):
+        """Drop journal records already covered by the snapshot"""
+        tail = [r for r in _read_records(self.path) if r["seq"] > seq]
+        if not tail:
+            # Keep the position so other processes can tell they were compacted past
+            tail = [{"seq": seq, "op": "mark"}]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            for record in tail:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+
 
 class SynthosMemory:
     """Manages persistent memory and context for Synthos"""
     
-    def __init__(self):
-        self.memory_file = ".synthos_memory.json"
-        self.session_file = ".synthos_session.json"
+    def __init__(self, session: Optional[str] = None, root: Optional[str] = None):
+        session = session or os.environ.get(SESSION_ENV)
+        root = root or os.environ.get(ROOT_ENV) or "."
+        self.memory_file = os.path.join(root, ".synthos_memory.json")
+        if session:
+            self.session_file = os.path.join(root, SESSIONS_DIR, f"{session}.json")
+        else:
+            self.session_file = os.path.join(root, ".synthos_session.json")
+        self.memory_journal = _Journal(self.memory_file, lambda: self._load_json_cached(self.memory_file))
+        self.session_journal = _Journal(self.session_file, lambda: self._load_json_cached(self.session_file))
         self.context = self._load_memory()
         self.session = self._load_session()
     
     def _load_memory(self) -> Dict[str, Any]:
-        """Load persistent memory from file"""
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return self._create_default_memory()
+        """Load persistent memory: snapshot plus journal tail"""
+        return self.memory_journal.load(self._create_default_memory)
     
     def _load_session(self) -> Dict[str, Any]:
-        """Load current session data"""
-        if os.path.exists(self.session_file):
-            try:
-                with open(self.session_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return self._create_default_session()
+        """Load current session data: snapshot plus journal tail"""
+        return self.session_journal.load(self._create_default_session)
+    
+    def _load_json_cached(self, path: str) -> Any:
+        """Load a JSON file, using its pre-parsed cache while the file is unchanged"""
+        stamp = self._file_stamp(path)
+        try:
+            with open(path + CACHE_SUFFIX, 'rb') as f:
+                cached_stamp, data = marshal.load(f)
+            if cached_stamp == stamp:
+                return data
+        except:
+            pass
+        with open(path, 'r') as f:
+            before = self._stat_stamp(os.fstat(f.fileno()))
+            data = json.load(f)
+            after = self._stat_stamp(os.fstat(f.fileno()))
+        # Only cache what was read if the file at path is still that version: a snapshot
+        # replaced or rewritten meanwhile must not get the old data under its stamp
+        if before == after == self._file_stamp(path):
+            self._write_cache(path, data, before)
+        return data
+    
+    def _write_cache(self, path: str, data: Any, stamp: tuple):
+        """Store a pre-parsed copy of a JSON file, stamped with the version it was parsed from"""
+        try:
+            tmp_path = f"{path}{CACHE_SUFFIX}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((stamp, data), f)
+            os.replace(tmp_path, path + CACHE_SUFFIX)
+        except:
+            pass
+    
+    @staticmethod
+    def _stat_stamp(st: os.stat_result) -> tuple:
+        """Identify a file version by inode, modification time and size"""
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    @classmethod
+    def _file_stamp(cls, path: str) -> Optional[tuple]:
+        try:
+            return cls._stat_stamp(os.stat(path))
+        except OSError:
+            return None
     
     def _create_default_memory(self) -> Dict[str, Any]:
         """Create default memory structure"""
@@ -90,22 +428,24 @@ class SynthosMemory:
         }
     
     def save_memory(self):
-        """Save memory to persistent storage"""
-        with open(self.memory_file, 'w') as f:
-            json.dump(self.context, f, indent=2)
+        """Save a full memory snapshot (only needed after editing self.context directly)"""
+        self.memory_journal.save(self.context)
     
     def save_session(self):
-        """Save current session"""
-        with open(self.session_file, 'w') as f:
-            json.dump(self.session, f, indent=2)
+        """Save a full session snapshot (only needed after editing self.session directly)"""
+        self.session_journal.save(self.session)
+    
+    def set_memory(self, key: str, value: Any):
+        """Set a top-level memory entry, persisted through the journal"""
+        self.memory_journal.append(self.context, "set", key, value)
     
     def add_context_note(self, note: str):
         """Add a context note to current session"""
-        self.session["context_notes"].append({
+        entry = {
             "timestamp": datetime.now().isoformat(),
             "note": note
-        })
-        self.save_session()
+        }
+        self.session_journal.append(self.session, "append", "context_notes", entry)
     
     def get_activation_context(self) -> Dict[str, Any]:
         """Get context needed for activation"""
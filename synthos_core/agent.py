@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+
+class BaseAgent:
+    """
+    Base class for agents.
+
+    A subclass implements run(task_input) and returns a JSON-serialisable
+    dict; a failure is reported as {"error": "..."} (or by raising, which the
+    Orchestrator turns into an error result). config holds the instance's
+    settings from the task. close() releases whatever the agent holds and is
+    called once the agent is no longer needed.
+
+    Optional class-level declarations read by the CLI:
+      - CACHE_TTL_SECONDS or a cache_ttl(task_input) classmethod: results may
+        be served from the result cache for that long (see resultcache)
+      - EXECUTION ("inline", "thread" or "process") and TIMEOUT_SECONDS, or an
+        execution(task_input) classmethod returning both (see execution)
+    """
+
+    def __init__(self, name: str, config: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.config: Dict[str, Any] = dict(config or {})
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
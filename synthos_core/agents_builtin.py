@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import subprocess
+from typing import Any, Dict
+
+from .agent import BaseAgent
+from .httpclient import HTTPError, get_client
+
+
+DEFAULT_SHELL_TIMEOUT = 60.0
+# Bytes of a fetched body returned as text by WebGetAgent
+DEFAULT_MAX_TEXT_BYTES = 64 * 1024
+
+
+class EchoAgent(BaseAgent):
+    """Returns its input unchanged; useful to check a task pipeline end to end."""
+
+    # Pure function of the input, so a cached result is as good as a new one
+    CACHE_TTL_SECONDS = 3600.0
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        return {"echo": task_input}
+
+
+class ShellAgent(BaseAgent):
+    """
+    Runs input.command (a shell command line) and returns its exit code and
+    output. input.timeout (default 60 s) bounds the run; input.cwd sets the
+    working directory.
+    """
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        command = task_input.get("command")
+        if not command:
+            return {"error": "missing 'command'"}
+        timeout = float(task_input.get("timeout") or DEFAULT_SHELL_TIMEOUT)
+        try:
+            proc = subprocess.run(
+                command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                cwd=task_input.get("cwd"),
+            )
+        except subprocess.TimeoutExpired:
+            return {"command": command, "error": f"timed out after {timeout:g}s"}
+        return {"command": command, "returncode": proc.returncode, "stdout": proc.stdout, "stderr": proc.stderr}
+
+
+class WebGetAgent(BaseAgent):
+    """
+    Fetches input.url through the shared HTTP client and returns the status,
+    content type, body size and the first input.max_bytes (default 64 KiB)
+    of the body decoded as text.
+    """
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        url = task_input.get("url")
+        if not url:
+            return {"error": "missing 'url'"}
+        max_bytes = int(task_input.get("max_bytes") or DEFAULT_MAX_TEXT_BYTES)
+        try:
+            with get_client().get(url) as resp:
+                resp.raise_for_status()
+                body = resp.read()
+                content_type = resp.headers.get("Content-Type")
+                status = resp.status
+        except (HTTPError, OSError, ValueError) as exc:
+            return {"url": url, "error": str(exc)}
+        return {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "bytes": len(body),
+            "text": body[:max_bytes].decode("utf-8", errors="replace"),
+        }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent import BaseAgent
+from .docsync import PageStore, language_store, sync
+from .textindex import InvertedIndex
+
+
+CURSOR_DOCS_URL = "https://docs.cursor.com/"
+DEFAULT_DOCS_DIR = ".data/cursor_docs"
+DEFAULT_INDEX_DIR = ".data/text_index"
+DEFAULT_LANG = "en"
+DEFAULT_MAX_PAGES = 5
+# Docs languages served under <site root>/<code>/; DEFAULT_LANG lives at the root itself
+DOCS_LANGS = ("en", "ja", "zh", "ko", "es", "fr", "de", "pt", "ru")
+
+
+def language_prefixes(start_url: str, lang: str) -> List[str]:
+    """URL prefixes of the docs languages other than lang, kept out of its crawl."""
+    root = urllib.parse.urljoin(start_url, "/")
+    return [urllib.parse.urljoin(root, f"{code}/") for code in DOCS_LANGS if code not in (lang, DEFAULT_LANG)]
+
+
+def sync_docs(
+    docs_dir: str,
+    index: InvertedIndex,
+    start_url: str = CURSOR_DOCS_URL,
+    lang: str = DEFAULT_LANG,
+    **options: Any,
+) -> Tuple[PageStore, Dict[str, Any]]:
+    """
+    Sync one docs language into its own store (docs_dir/<lang>/) and index
+    shard, leaving the other languages' subtrees to their own syncs.
+    """
+    store = language_store(docs_dir, lang)
+    summary = sync(start_url, store, index=index, lang=lang, exclude=language_prefixes(start_url, lang), **options)
+    return store, summary
+
+
+def markdown_report(query: str, hits: List[Dict[str, Any]]) -> str:
+    lines = [f"# Cursor docs: {query}", ""]
+    if not hits:
+        lines.append("No matching pages.")
+    for rank, hit in enumerate(hits, 1):
+        lines.append(f"{rank}. [{hit['url']}]({hit['url']}) (score {hit['score']})")
+    return "\n".join(lines) + "\n"
+
+
+class CursorLookupAgent(BaseAgent):
+    """
+    Looks topics up in the Cursor docs through a persistent BM25 index.
+
+    Modes (input.action):
+      - "lookup" (default): requires input.query; returns the input.max_pages
+        (default 5) best-matching pages of the input.lang (default "en")
+        shard, scored from the index alone. input.markdown=true adds a
+        markdown report.
+      - "sync": brings the saved input.lang docs (config.docs_dir/<lang>,
+        default .data/cursor_docs/en) up to date from config.start_url and
+        reconciles that language's index shard with them, like
+        scripts/cursor_docs_downloader.py; input.max_pages caps the pages
+        crawled.
+
+    The index lives in config.index_dir (default .data/text_index), shared
+    with scripts/topic_lookup.py.
+    """
+
+    def __init__(self, name: str, config: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(name, config)
+        self.docs_dir = self.config.get("docs_dir", DEFAULT_DOCS_DIR)
+        self.index = InvertedIndex(self.config.get("index_dir", DEFAULT_INDEX_DIR))
+
+    def close(self) -> None:
+        self.index.close()
+
+    def lookup(self, query: str, lang: str = DEFAULT_LANG, limit: int = DEFAULT_MAX_PAGES) -> List[Dict[str, Any]]:
+        return [{"url": url, "score": round(score, 4)} for url, score in self.index.search(query, lang, limit)]
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        action = task_input.get("action", "lookup")
+        lang = task_input.get("lang") or DEFAULT_LANG
+        if action == "lookup":
+            query = task_input.get("query")
+            if not query:
+                return {"error": "missing 'query'"}
+            hits = self.lookup(query, lang, int(task_input.get("max_pages") or DEFAULT_MAX_PAGES))
+            result: Dict[str, Any] = {"query": query, "lang": lang, "count": len(hits), "results": hits}
+            if task_input.get("markdown"):
+                result["markdown"] = markdown_report(query, hits)
+            return result
+
+        if action == "sync":
+            max_pages = task_input.get("max_pages")
+            store, summary = sync_docs(
+                self.docs_dir,
+                self.index,
+                self.config.get("start_url", CURSOR_DOCS_URL),
+                lang,
+                max_pages=int(max_pages) if max_pages else None,
+            )
+            return {"docs_dir": str(store.root), "pages": len(store.pages), **summary}
+
+        return {"error": f"unknown action: {action}"}
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import posixpath
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .agents_trekcore import AUDIO_EXTENSIONS, TrekCoreAgent, _category_slug, numpy_missing
+from .frontier import CrawlFrontier
+from .links import LinkFilter, iter_links, same_origin, under_prefix, with_extension
+
+
+# Links followed as pages; anything else that is not audio (images, archives) is ignored
+PAGE_SUFFIXES = ("", ".htm", ".html", ".shtml", ".php", ".asp", ".aspx")
+# Actions built on NumPy, an optional dependency only they need
+NUMPY_ACTIONS = ("analyze", "query", "dedupe", "transcode")
+# CPU-bound actions, run in a worker process (see execution) with these timeouts in seconds
+PROCESS_ACTION_TIMEOUTS = {"analyze": 3600.0, "query": 600.0, "dedupe": 600.0, "transcode": 3600.0}
+
+
+def _is_page(link: str) -> bool:
+    return posixpath.splitext(urllib.parse.urlsplit(link).path)[1].lower() in PAGE_SUFFIXES
+
+
+def _clip_directory(base_url: str, directory_url: str) -> str:
+    # Storage subdirectory of a clip directory: its path below base_url's directory, or
+    # host and full path when outside it; clips right in that directory use its slug
+    base = urllib.parse.urljoin(base_url, ".")
+    if directory_url.startswith(base):
+        relative = directory_url[len(base):]
+    else:
+        parts = urllib.parse.urlsplit(directory_url)
+        relative = parts.netloc + parts.path
+    segments = [p for p in relative.split("/") if p not in ("", ".", "..")]
+    return "/".join(segments) or _category_slug(base)
+
+
+class _AudioSet:
+    """Audio URLs found by a crawl, appended to an NDJSON file so later runs see them without refetching."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.urls: Set[str] = set()
+        if path.exists():
+            with path.open("r") as f:
+                for line in f:
+                    try:
+                        self.urls.add(json.loads(line)["u"])
+                    except (ValueError, KeyError):
+                        continue
+
+    def add_all(self, urls: List[str]) -> int:
+        new = [u for u in urls if u not in self.urls]
+        if new:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write("".join(json.dumps({"u": u}) + "\n" for u in new))
+            self.urls.update(new)
+        return len(new)
+
+
+class SoundEffectsAgent(TrekCoreAgent):
+    """
+    Crawls a sound-effects site for audio links and downloads them.
+
+    Modes (input.action):
+      - "crawl" (default): requires input.base_url. Walks the pages under
+        base_url through a persistent CrawlFrontier
+        (storage_dir/.frontier/<hash of base_url>.ndjson), fetching at most
+        input.max_pages pages per run (0 or absent: no limit). An interrupted
+        crawl resumes where it stopped, and a page is only fetched again once
+        its revisit time, adapted to how often it changed, is due. Audio links
+        are kept next to the frontier, so the result lists every clip found
+        so far. input.same_origin_only (default true) drops audio hosted on
+        other origins. Unless input.list_only is true, the clips are then
+        downloaded like TrekCoreAgent's "download", into
+        storage_dir/<directory of the clip below base_url's directory>/
+        (host and full path for clips outside it).
+      - "analyze": brings the feature table (config.features_dir, default
+        storage_dir/.features) up to date with every clip under storage_dir,
+        analysing new and changed clips on input.workers processes.
+      - "query": requires input.clip, a path from the feature table
+        (relative to storage_dir) or any audio file; returns the input.k
+        (default 10) most similar analysed clips. input.approximate=true
+        scores only random-projection bucket neighbours.
+      - "dedupe": groups of analysed clips whose similarity reaches
+        input.threshold (default 0.995), byte-identical ones included;
+        input.approximate=true compares bucket neighbours only.
+      - "transcode": mirrors every clip under storage_dir into
+        config.transcode_dir (default storage_dir/.transcoded) as
+        loudness-normalised PCM WAV, skipping outputs still current.
+        A crawl that downloads also does this when transcode_dir is set.
+
+    Pages, downloads and storage are shared with TrekCoreAgent (same config).
+    The analysis actions need NumPy (pip install numpy), and ffmpeg for
+    formats other than WAV and AIFF; without NumPy they return an error.
+    They are CPU-bound and run in a worker process under the CLI, with a
+    timeout per action (PROCESS_ACTION_TIMEOUTS).
+    """
+
+    @classmethod
+    def cache_ttl(cls, task_input: Dict[str, Any]) -> Optional[float]:
+        # Every action reads or advances on-disk state
+        return None
+
+    @classmethod
+    def execution(cls, task_input: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+        timeout = PROCESS_ACTION_TIMEOUTS.get(task_input.get("action", "crawl"))
+        return ("process", timeout) if timeout is not None else ("inline", None)
+
+    def _crawl_state(self, base_url: str) -> Tuple[CrawlFrontier, _AudioSet]:
+        key = hashlib.sha1(base_url.encode()).hexdigest()[:16]
+        directory = self.storage_dir / ".frontier"
+        return CrawlFrontier(directory / f"{key}.ndjson"), _AudioSet(directory / f"{key}.audio.ndjson")
+
+    @property
+    def features_dir(self) -> Path:
+        return Path(self.config.get("features_dir", self.storage_dir / ".features"))
+
+    def crawl(self, base_url: str, max_pages: int = 0, same_origin_only: bool = True) -> Dict[str, Any]:
+        frontier, audio = self._crawl_state(base_url)
+        frontier.add(base_url)
+        follow = under_prefix(urllib.parse.urljoin(base_url, "."))
+        is_audio = with_extension(AUDIO_EXTENSIONS)
+        keep_audio: Optional[LinkFilter] = same_origin(base_url) if same_origin_only else None
+        fetched = 0
+        failed: List[str] = []
+        found = 0
+        while not max_pages or fetched < max_pages:
+            item = frontier.pop()
+            if item is None:
+                break
+            url, depth = item
+            try:
+                body = self._fetch_page(url)
+            except Exception:
+                # Left un-completed, so the next run tries it again
+                failed.append(url)
+                continue
+            fetched += 1
+            clips: List[str] = []
+            for link in iter_links([body], url):
+                if is_audio(link):
+                    if keep_audio is None or keep_audio(link):
+                        clips.append(link)
+                elif follow(link) and _is_page(link):
+                    frontier.add(urllib.parse.urldefrag(link)[0], depth + 1)
+            found += audio.add_all(clips)
+            frontier.complete(url, hashlib.sha1(body).hexdigest())
+        return {
+            "base_url": base_url,
+            "pages_fetched": fetched,
+            "pages_failed": failed,
+            "pages_known": len(frontier),
+            "next_due": frontier.next_due(),
+            "new_audio_count": found,
+            "audio_urls": sorted(audio.urls),
+        }
+
+    def analyze(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        from .audiofeatures import build_feature_table
+
+        return build_feature_table(str(self.storage_dir), str(self.features_dir), workers=workers)
+
+    def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        action = task_input.get("action", "crawl")
+        missing = numpy_missing(action) if action in NUMPY_ACTIONS else None
+        if missing:
+            return missing
+        if action == "crawl":
+            base_url = task_input.get("base_url")
+            if not base_url:
+                return {"error": "missing 'base_url'"}
+            result = self.crawl(
+                base_url,
+                max_pages=int(task_input.get("max_pages") or 0),
+                same_origin_only=bool(task_input.get("same_origin_only", True)),
+            )
+            result["count"] = len(result["audio_urls"])
+            if task_input.get("list_only"):
+                return result
+            by_directory: Dict[str, List[str]] = {}
+            for url in result["audio_urls"]:
+                by_directory.setdefault(urllib.parse.urljoin(url, "."), []).append(url)
+            files: List[str] = []
+            errors: List[Dict[str, str]] = []
+            downloaded = skipped = 0
+            for directory, urls in sorted(by_directory.items()):
+                outcome = self._download_all(urls, directory, _clip_directory(base_url, directory))
+                downloaded += outcome["downloaded_count"]
+                skipped += outcome["skipped_count"]
+                files += outcome["files"]
+                errors += outcome["errors"]
+            result = {
+                **result,
+                "downloaded_count": downloaded,
+                "skipped_count": skipped,
+                "failed_count": len(errors),
+                "files": files,
+                "errors": errors,
+            }
+            if self.config.get("transcode_dir"):
+                result["transcode"] = self.transcode()
+            return result
+
+        if action == "analyze":
+            workers = task_input.get("workers")
+            return {"features_dir": str(self.features_dir), **self.analyze(int(workers) if workers else None)}
+
+        if action == "transcode":
+            workers = task_input.get("workers")
+            return self.transcode(workers=int(workers) if workers else None)
+
+        if action in ("query", "dedupe"):
+            from .audioindex import DEFAULT_DUPLICATE_THRESHOLD, DEFAULT_TOP_K, AudioIndex
+
+            index = AudioIndex.load(str(self.features_dir))
+            if not len(index):
+                return {"error": "no analysed clips: run the 'analyze' action first"}
+            approximate = bool(task_input.get("approximate", False))
+            if action == "query":
+                clip = task_input.get("clip")
+                if not clip:
+                    return {"error": "missing 'clip'"}
+                matches = index.query(clip, k=int(task_input.get("k", DEFAULT_TOP_K)), approximate=approximate)
+                return {"clip": clip, "matches": matches}
+            threshold = float(task_input.get("threshold", DEFAULT_DUPLICATE_THRESHOLD))
+            groups = index.near_duplicates(threshold, approximate=approximate)
+            return {"group_count": len(groups), "groups": groups}
+
+        return {"error": f"unknown action: {action}"}
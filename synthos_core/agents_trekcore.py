@@ -1,49 +1,42 @@
 from __future__ import annotations
 
-import re
-import time
+import hashlib
+import importlib.util
 import urllib.parse
-import urllib.request
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .agent import BaseAgent
+from .blobstore import BlobStore
+from .downloader import DEFAULT_MAX_CONCURRENCY, DownloadEngine, DownloadIndex, download_file
+from .httpcache import HTTPCache
+from .httpclient import get_client
+from .links import iter_links, under_prefix, with_extension
 from .memory import AgentMemory
 
 
 USER_AGENT = "SynthosTrekCoreAgent/0.1 (+https://github.com/Syntvherse-Labs/synthos)"
-REQUEST_TIMEOUT_SECONDS = 15
+# Politeness budget: one request per REQUEST_DELAY_SECONDS per host, however many are in flight
 REQUEST_DELAY_SECONDS = 0.25
 TREKCORE_AUDIO_ROOT = "https://www.trekcore.com/audio/"
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".aiff", ".m4a", ".ogg")
+# Result cache lifetime per read-only action; downloads have side effects and are never cached
+CACHE_TTL_BY_ACTION = {"list_categories": 24 * 3600.0, "list_audio": 6 * 3600.0}
 
 
 def _http_get(url: str) -> bytes:
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_SECONDS) as resp:
+    with get_client().get(url, headers={"User-Agent": USER_AGENT}) as resp:
+        resp.raise_for_status()
         return resp.read()
 
 
-def _extract_links(html_bytes: bytes, base_url: str) -> List[str]:
-    html_text = html_bytes.decode(errors="replace")
-    links: List[str] = []
-    for m in re.finditer(r"href=\"([^\"]+)\"|href='([^']+)'", html_text, flags=re.I):
-        href = m.group(1) or m.group(2)
-        if not href:
-            continue
-        links.append(urllib.parse.urljoin(base_url, href))
-    return links
-
-
-def _list_categories() -> List[Tuple[str, str]]:
+def _list_categories(fetch: Callable[[str], bytes] = _http_get) -> List[Tuple[str, str]]:
     # Returns list of (name, url) derived from any link under /audio/<category>/...
     root = TREKCORE_AUDIO_ROOT
-    html_bytes = _http_get(root)
-    links = _extract_links(html_bytes, root)
     categories = set()
     root_path = urllib.parse.urlparse(root).path
-    for l in links:
-        if not l.startswith(root):
-            continue
+    for l in iter_links([fetch(root)], root, under_prefix(root)):
         path = urllib.parse.urlparse(l).path
         if not path.startswith(root_path):
             continue
@@ -64,17 +57,37 @@ def _list_categories() -> List[Tuple[str, str]]:
     return out
 
 
-def _list_category_audio(category_url: str) -> List[str]:
+def _list_category_audio(category_url: str, fetch: Callable[[str], bytes] = _http_get) -> List[str]:
     # Crawl given category page for audio links
-    html_bytes = _http_get(category_url)
-    links = _extract_links(html_bytes, category_url)
-    audio_exts = [".mp3", ".wav", ".aiff", ".m4a", ".ogg"]
-    audio: List[str] = []
-    for l in links:
-        path = urllib.parse.urlparse(l).path.lower()
-        if any(path.endswith(e) for e in audio_exts):
-            audio.append(l)
-    return sorted(set(audio))
+    return sorted(iter_links([fetch(category_url)], category_url, with_extension(AUDIO_EXTENSIONS)))
+
+
+def _basename(url: str) -> str:
+    return Path(urllib.parse.urlparse(url).path).name or "audio.bin"
+
+
+def _hashed_name(url: str) -> str:
+    # Basename plus a short hash of the URL: the same for a URL whatever else is listed with it
+    name = Path(_basename(url))
+    return f"{name.stem}-{hashlib.sha1(url.encode()).hexdigest()[:8]}{name.suffix}"
+
+
+def _view_names(urls: List[str]) -> Dict[str, str]:
+    # File name per URL: its basename, or _hashed_name() for every URL sharing that basename
+    counts = Counter(_basename(url) for url in urls)
+    return {url: _basename(url) if counts[_basename(url)] == 1 else _hashed_name(url) for url in urls}
+
+
+def numpy_missing(action: str) -> Optional[Dict[str, Any]]:
+    # NumPy is optional: only the audio analysis and transcode stages need it
+    if importlib.util.find_spec("numpy") is None:
+        return {"error": f"action {action!r} needs numpy: pip install numpy"}
+    return None
+
+
+def _category_slug(category_url: str) -> str:
+    parts = [p for p in urllib.parse.urlparse(category_url).path.split("/") if p]
+    return parts[-1] if parts else "uncategorized"
 
 
 class TrekCoreAgent(BaseAgent):
@@ -84,18 +97,121 @@ class TrekCoreAgent(BaseAgent):
     Modes (input.action):
       - "list_categories": returns available major categories
       - "list_audio": requires input.category_url; returns audio links
-      - "download": requires input.category_url; downloads audio to storage_dir
+      - "download": requires input.category_url; downloads audio to
+        storage_dir/<category>/, resuming partial files and skipping ones
+        that are still current; clips that could not be fetched are counted
+        in failed_count and listed in errors ({url, error}). URLs sharing a
+        file name, and new URLs whose name is already taken, get a short hash
+        of the URL appended to it; a URL keeps the file name it was first
+        stored under. Content is stored once in a SHA-256 blob store
+        (storage_dir/.blobs) and category files are hardlinks to it.
+        With config.transcode_dir set, the category is then mirrored there
+        as loudness-normalised PCM WAV (needs NumPy; outputs still current
+        are skipped).
+
+    Index pages go through an on-disk HTTP cache (config.http_cache_dir,
+    default .data/http_cache); config.offline=true serves them from cache only.
     """
 
     def __init__(self, name: str, config: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(name, config)
         self.memory = AgentMemory()
         self.storage_dir = Path(self.config.get("storage_dir", ".data/trekcore"))
+        self.blobs = BlobStore(self.storage_dir / ".blobs")
+        self.page_cache = HTTPCache(
+            root=self.config.get("http_cache_dir", ".data/http_cache"),
+            offline=bool(self.config.get("offline", False)),
+        )
+
+    @classmethod
+    def cache_ttl(cls, task_input: Dict[str, Any]) -> Optional[float]:
+        return CACHE_TTL_BY_ACTION.get(task_input.get("action", "list_categories"))
+
+    def close(self) -> None:
+        self.memory.close()
+
+    def _fetch_page(self, url: str) -> bytes:
+        return self.page_cache.get(url, headers={"User-Agent": USER_AGENT})
+
+    def _view_path(self, url: str, category: str, name: str, entry: Optional[Dict[str, Any]]) -> Path:
+        # A URL keeps the file it was first stored under, and a new URL never takes over another's
+        directory = self.storage_dir / category
+        if entry and entry.get("path") and Path(entry["path"]).parent == directory:
+            return Path(entry["path"])
+        view_path = directory / name
+        if view_path.exists():
+            view_path = directory / _hashed_name(url)
+        return view_path
+
+    def _download_one(self, url: str, category: str, name: str, index: DownloadIndex) -> Tuple[Path, Optional[Dict[str, Any]]]:
+        # Returns (path, info); info is None when the stored content is still current
+        entry = index.get(url)
+        view_path = self._view_path(url, category, name, entry)
+        known = entry if entry and self.blobs.has(entry.get("sha256", "")) else None
+        # Streamed to a per-URL incoming file so an interrupted transfer resumes next run
+        incoming = self.storage_dir / ".incoming" / hashlib.sha1(url.encode()).hexdigest()
+        incoming.parent.mkdir(parents=True, exist_ok=True)
+        info = download_file(url, incoming, headers={"User-Agent": USER_AGENT}, known=known)
+        if info is None:
+            self.blobs.link(known["sha256"], view_path)
+            return view_path, None
+        self.blobs.add(incoming, info["sha256"], url=url)
+        self.blobs.link(info["sha256"], view_path)
+        return view_path, info
+
+    def _download_all(self, audio: List[str], category_url: str, category: Optional[str] = None) -> Dict[str, Any]:
+        # Download audio into storage_dir/<category>/ (default: slug of category_url) and record each new file
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        index = DownloadIndex(self.memory, self.name, legacy_path=self.storage_dir / ".downloads.ndjson")
+        category = category or _category_slug(category_url)
+        names = _view_names(audio)
+        engine = DownloadEngine(
+            lambda url: self._download_one(url, category, names[url], index),
+            rate_per_host=1.0 / REQUEST_DELAY_SECONDS,
+            max_concurrency=int(self.config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)),
+        )
+        saved: Dict[str, Path] = {}
+        errors: Dict[str, str] = {}
+        skipped = 0
+        for a, result, exc in engine.run(audio):
+            if exc is not None:
+                errors[a] = f"{type(exc).__name__}: {exc}"
+                continue
+            out_path, info = result
+            saved[a] = out_path
+            if info is None:
+                skipped += 1
+                continue
+            index.record({"url": a, "category": category_url, "filename": out_path.name, "path": str(out_path), **info})
+        downloaded = [str(saved[a]) for a in audio if a in saved]
+        return {
+            "downloaded_count": len(downloaded),
+            "skipped_count": skipped,
+            "failed_count": len(errors),
+            "files": downloaded,
+            "errors": [{"url": a, "error": errors[a]} for a in audio if a in errors],
+        }
+
+    @property
+    def transcode_dir(self) -> Path:
+        return Path(self.config.get("transcode_dir", self.storage_dir / ".transcoded"))
+
+    def transcode(self, category: Optional[str] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+        # Mirrors storage_dir (or one category of it) into transcode_dir
+        missing = numpy_missing("transcode")
+        if missing:
+            return missing
+        from .transcode import transcode_library
+
+        source, target = self.storage_dir, self.transcode_dir
+        if category:
+            source, target = source / category, target / category
+        return {"output_dir": str(target), **transcode_library(str(source), str(target), workers=workers)}
 
     def run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
         action = task_input.get("action", "list_categories")
         if action == "list_categories":
-            cats = _list_categories()
+            cats = _list_categories(self._fetch_page)
             # Remember category list snapshot
             self.memory.remember(self.name, key="trekcore_categories", value=str(len(cats)), tags="trekcore")
             return {"categories": [{"name": n, "url": u} for n, u in cats]}
@@ -104,28 +220,18 @@ class TrekCoreAgent(BaseAgent):
             category_url = task_input.get("category_url")
             if not category_url:
                 return {"error": "missing 'category_url'"}
-            audio = _list_category_audio(category_url)
+            audio = _list_category_audio(category_url, self._fetch_page)
             return {"category_url": category_url, "count": len(audio), "audio_urls": audio}
 
         if action == "download":
             category_url = task_input.get("category_url")
             if not category_url:
                 return {"error": "missing 'category_url'"}
-            self.storage_dir.mkdir(parents=True, exist_ok=True)
-            audio = _list_category_audio(category_url)
-            downloaded: List[str] = []
-            for a in audio:
-                try:
-                    data = _http_get(a)
-                    name = Path(urllib.parse.urlparse(a).path).name or "audio.bin"
-                    out_path = self.storage_dir / name
-                    out_path.write_bytes(data)
-                    downloaded.append(str(out_path))
-                    self.memory.record_download(agent=self.name, url=a, category=category_url, filename=name, path=str(out_path))
-                    time.sleep(REQUEST_DELAY_SECONDS)
-                except Exception:
-                    continue
-            return {"category_url": category_url, "downloaded_count": len(downloaded), "files": downloaded}
+            audio = _list_category_audio(category_url, self._fetch_page)
+            result = {"category_url": category_url, **self._download_all(audio, category_url)}
+            if self.config.get("transcode_dir"):
+                result["transcode"] = self.transcode(_category_slug(category_url))
+            return result
 
         return {"error": f"unknown action: {action}"}
 
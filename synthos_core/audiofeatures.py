@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import time
+import warnings
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import aifc
+except ImportError:
+    # Removed in Python 3.13; AIFF then goes through ffmpeg like the other formats
+    aifc = None
+
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".aif", ".aiff", ".m4a", ".ogg")
+BLOCK_FRAMES = 1 << 16
+FFT_SIZE = 2048
+HOP_SIZE = 1024
+N_MELS = 40
+N_MFCC = 13
+ROLLOFF_FRACTION = 0.85
+# Formats without a stdlib reader are decoded by ffmpeg at this rate
+DECODE_SAMPLE_RATE = 22050
+# Frames with less spectral energy than this are treated as silence
+SILENCE_POWER = 1e-10
+HASH_CHUNK = 1 << 20
+
+SCALAR_FEATURES = ("duration", "rms", "peak", "zcr", "centroid_mean", "centroid_std", "rolloff_mean", "rolloff_std")
+VECTOR_FEATURES = ("mfcc_mean", "mfcc_std")
+FEATURE_NAMES = SCALAR_FEATURES + tuple(f"{name}_{i}" for name in VECTOR_FEATURES for i in range(N_MFCC))
+
+
+def _to_float(raw: bytes, sampwidth: int, channels: int, big_endian: bool) -> np.ndarray:
+    # Interleaved integer PCM -> mono float32 in [-1, 1)
+    if sampwidth == 1:
+        if big_endian:
+            data = np.frombuffer(raw, dtype=np.int8).astype(np.float32) / 128.0
+        else:
+            # 8-bit WAV is unsigned
+            data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        if big_endian:
+            b = b[:, ::-1]
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        data = ints.astype(np.float32) / float(1 << 23)
+    else:
+        dtype = np.dtype(f"{'>' if big_endian else '<'}i{sampwidth}")
+        data = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(1 << (8 * sampwidth - 1))
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return data
+
+
+class PcmReader:
+    """
+    Mono float32 PCM from an audio file, one block at a time.
+
+    WAV and AIFF are read with the standard library at their native rate;
+    anything else (or a WAV flavour wave cannot parse, such as float PCM)
+    is streamed through ffmpeg at decode_rate. Memory use is bounded
+    by block_frames regardless of clip length.
+    """
+
+    def __init__(self, path: str, block_frames: int = BLOCK_FRAMES, decode_rate: int = DECODE_SAMPLE_RATE) -> None:
+        self.path = str(path)
+        self.block_frames = block_frames
+        self.decode_rate = decode_rate
+        self._file: Any = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._big_endian = False
+        suffix = Path(self.path).suffix.lower()
+        try:
+            if suffix == ".wav":
+                self._file = wave.open(self.path, "rb")
+            elif suffix in (".aif", ".aiff") and aifc is not None:
+                self._file = aifc.open(self.path, "rb")
+                self._big_endian = True
+        except (wave.Error, EOFError) + ((aifc.Error,) if aifc is not None else ()):
+            self._file = None
+        if self._file is not None:
+            self.sample_rate = self._file.getframerate()
+            self._channels = self._file.getnchannels()
+            self._sampwidth = self._file.getsampwidth()
+        else:
+            self.sample_rate = decode_rate
+            self._proc = self._spawn_ffmpeg()
+
+    def _spawn_ffmpeg(self) -> subprocess.Popen:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError(f"no decoder for {self.path}: install ffmpeg")
+        cmd = [ffmpeg, "-v", "error", "-nostdin", "-i", self.path, "-f", "f32le", "-ac", "1", "-ar", str(self.decode_rate), "-"]
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        if self._file is not None:
+            while True:
+                raw = self._file.readframes(self.block_frames)
+                if not raw:
+                    return
+                yield _to_float(raw, self._sampwidth, self._channels, self._big_endian)
+        proc = self._proc
+        while True:
+            raw = proc.stdout.read(self.block_frames * 4)
+            if not raw:
+                break
+            # A short read can split a sample; keep whole floats only
+            whole = len(raw) - len(raw) % 4
+            if whole < len(raw):
+                raw += proc.stdout.read(4 - len(raw) % 4)
+                whole = len(raw) - len(raw) % 4
+            yield np.frombuffer(raw[:whole], dtype="<f4")
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed on {self.path}: {proc.stderr.read().decode(errors='replace').strip()}")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.wait()
+            self._proc.stdout.close()
+            self._proc.stderr.close()
+
+    def __enter__(self) -> "PcmReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int) -> np.ndarray:
+    # (N_MELS, FFT_SIZE // 2 + 1) triangular filters on the HTK mel scale
+    top = 2595.0 * np.log10(1.0 + (sample_rate / 2.0) / 700.0)
+    hz = 700.0 * (10.0 ** (np.linspace(0.0, top, N_MELS + 2) / 2595.0) - 1.0)
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+    lower, center, upper = hz[:-2, None], hz[1:-1, None], hz[2:, None]
+    rising = (freqs - lower) / (center - lower)
+    falling = (upper - freqs) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=1)
+def _dct_matrix() -> np.ndarray:
+    # Orthonormal DCT-II, (N_MFCC, N_MELS)
+    k = np.arange(N_MFCC)[:, None]
+    n = np.arange(N_MELS)[None, :]
+    m = np.cos(np.pi / N_MELS * (n + 0.5) * k) * np.sqrt(2.0 / N_MELS)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+class _FeatureAccumulator:
+    """Running clip statistics, updated block by block with whole-block NumPy operations."""
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate).astype(np.float32)
+        self.mel = _mel_filterbank(sample_rate)
+        self.dct = _dct_matrix()
+        self.samples = 0
+        self.sum_sq = 0.0
+        self.peak = 0.0
+        self.crossings = 0
+        self.last_negative: Optional[bool] = None
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.frames = 0
+        self.voiced = 0
+        # centroid, centroid^2, rolloff, rolloff^2 over non-silent frames
+        self.spectral = np.zeros(4)
+        self.mfcc_sum = np.zeros(N_MFCC)
+        self.mfcc_sq = np.zeros(N_MFCC)
+
+    def add(self, block: np.ndarray) -> None:
+        if not len(block):
+            return
+        self.samples += len(block)
+        self.sum_sq += float(np.dot(block, block))
+        self.peak = max(self.peak, float(np.abs(block).max()))
+        negative = np.signbit(block)
+        self.crossings += int(np.count_nonzero(negative[1:] != negative[:-1]))
+        if self.last_negative is not None and negative[0] != self.last_negative:
+            self.crossings += 1
+        self.last_negative = bool(negative[-1])
+        buf = np.concatenate((self.tail, block)) if len(self.tail) else block
+        if len(buf) < FFT_SIZE:
+            self.tail = buf.copy()
+            return
+        count = 1 + (len(buf) - FFT_SIZE) // HOP_SIZE
+        frames = np.lib.stride_tricks.sliding_window_view(buf, FFT_SIZE)[::HOP_SIZE][:count]
+        self._add_frames(frames * self.window)
+        self.tail = buf[count * HOP_SIZE:].copy()
+
+    def _add_frames(self, frames: np.ndarray) -> None:
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        total = power.sum(axis=1)
+        mfcc = np.log(power @ self.mel.T + SILENCE_POWER) @ self.dct.T
+        self.frames += len(frames)
+        self.mfcc_sum += mfcc.sum(axis=0)
+        self.mfcc_sq += (mfcc ** 2).sum(axis=0)
+        voiced = total > SILENCE_POWER
+        if not voiced.any():
+            return
+        power, total = power[voiced], total[voiced]
+        centroid = (power @ self.freqs) / total
+        rolloff = self.freqs[np.argmax(np.cumsum(power, axis=1) >= ROLLOFF_FRACTION * total[:, None], axis=1)]
+        self.voiced += len(power)
+        self.spectral += (centroid.sum(), (centroid ** 2).sum(), rolloff.sum(), (rolloff ** 2).sum())
+
+    def result(self) -> Dict[str, Any]:
+        if self.frames == 0 and len(self.tail):
+            # Clip shorter than one analysis frame: zero-pad it
+            self._add_frames((np.pad(self.tail, (0, FFT_SIZE - len(self.tail))) * self.window)[None, :])
+        n = max(self.samples, 1)
+        voiced = max(self.voiced, 1)
+        frames = max(self.frames, 1)
+        c_mean, c_sq, r_mean, r_sq = self.spectral / voiced
+        mfcc_mean = self.mfcc_sum / frames
+        return {
+            "duration": self.samples / self.sample_rate,
+            "rms": float(np.sqrt(self.sum_sq / n)),
+            "peak": self.peak,
+            "zcr": self.crossings / n,
+            "centroid_mean": c_mean,
+            "centroid_std": float(np.sqrt(max(c_sq - c_mean ** 2, 0.0))),
+            "rolloff_mean": r_mean,
+            "rolloff_std": float(np.sqrt(max(r_sq - r_mean ** 2, 0.0))),
+            "mfcc_mean": mfcc_mean.astype(np.float32),
+            "mfcc_std": np.sqrt(np.maximum(self.mfcc_sq / frames - mfcc_mean ** 2, 0.0)).astype(np.float32),
+        }
+
+
+def analyze_file(path: str, block_frames: int = BLOCK_FRAMES) -> Dict[str, Any]:
+    """Features of one clip (see SCALAR_FEATURES / VECTOR_FEATURES), streamed in PCM blocks."""
+    with PcmReader(path, block_frames) as reader:
+        acc = _FeatureAccumulator(reader.sample_rate)
+        for block in reader.blocks():
+            acc.add(block)
+    return acc.result()
+
+
+def file_sha256(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _analyze_or_error(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        return {**analyze_file(path), "sha256": file_sha256(path)}, None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+class FeatureTable:
+    """
+    Columnar on-disk table of per-clip features.
+
+    root/CURRENT names the live version directory, which holds one .npy
+    file per column (memory-mapped on load), paths.json with the clip
+    path of each row, relative to the library, and failed.json with the
+    clips that could not be decoded. Rows are sorted by path; the sha256
+    column holds each clip's raw file digest.
+    write() builds a new version and switches CURRENT atomically, so
+    readers never see a half-written table.
+    """
+
+    COLUMNS = SCALAR_FEATURES + VECTOR_FEATURES + ("size", "mtime_ns", "sha256")
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.version: Optional[str] = None
+        self.paths: List[str] = []
+        self.columns: Dict[str, np.ndarray] = {}
+        # path -> [size, mtime_ns, error]
+        self.failed: Dict[str, List[Any]] = {}
+        current = self.root / "CURRENT"
+        if current.exists():
+            self.version = current.read_text().strip()
+            directory = self.root / self.version
+            self.paths = json.loads((directory / "paths.json").read_text())
+            self.columns = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in self.COLUMNS
+                if (directory / f"{name}.npy").exists()
+            }
+            failed = directory / "failed.json"
+            if failed.exists():
+                self.failed = json.loads(failed.read_text())
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def feature_matrix(self) -> np.ndarray:
+        """(rows, len(FEATURE_NAMES)) float32 matrix of all features, in FEATURE_NAMES order."""
+        if not self.paths:
+            return np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+        parts = [np.asarray(self.columns[name], dtype=np.float32)[:, None] for name in SCALAR_FEATURES]
+        parts += [np.asarray(self.columns[name], dtype=np.float32) for name in VECTOR_FEATURES]
+        return np.hstack(parts)
+
+    def write(self, paths: List[str], columns: Dict[str, np.ndarray], failed: Optional[Dict[str, List[Any]]] = None) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        number = int(self.version[1:]) + 1 if self.version else 1
+        version = f"v{number:06d}"
+        directory = self.root / version
+        directory.mkdir()
+        for name in self.COLUMNS:
+            np.save(directory / f"{name}.npy", columns[name])
+        (directory / "paths.json").write_text(json.dumps(paths))
+        (directory / "failed.json").write_text(json.dumps(failed or {}))
+        tmp = self.root / "CURRENT.tmp"
+        tmp.write_text(version)
+        os.replace(tmp, self.root / "CURRENT")
+        for old in self.root.glob("v[0-9]*"):
+            if old.name != version:
+                shutil.rmtree(old, ignore_errors=True)
+        self.__init__(str(self.root))
+
+
+def scan_library(library: Path, extensions: Tuple[str, ...]) -> Dict[str, os.stat_result]:
+    found: Dict[str, os.stat_result] = {}
+    for dirpath, dirnames, filenames in os.walk(library):
+        # Skip bookkeeping directories such as .blobs and .incoming
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in filenames:
+            if filename.lower().endswith(extensions) and not filename.startswith("."):
+                full = os.path.join(dirpath, filename)
+                found[os.path.relpath(full, library)] = os.stat(full)
+    return found
+
+
+def build_feature_table(
+    library: str,
+    table_root: str,
+    workers: Optional[int] = None,
+    extensions: Tuple[str, ...] = AUDIO_EXTENSIONS,
+    chunksize: int = 8,
+) -> Dict[str, Any]:
+    """
+    Bring the feature table at table_root up to date with the clips under library.
+
+    Rows whose file size and mtime are unchanged are carried over as-is;
+    new and modified clips are analysed in parallel on a process pool, and
+    clips that are hardlinks of one another (e.g. one blob in several
+    categories) are analysed once. Deleted clips are dropped. Clips that
+    failed to decode are not retried until their size or mtime changes.
+    """
+    started = time.time()
+    library_path = Path(library)
+    table = FeatureTable(table_root)
+    found = scan_library(library_path, extensions)
+    # A table written before a column existed is rebuilt rather than carried over
+    complete = set(FeatureTable.COLUMNS) <= set(table.columns)
+    old_rows = {path: i for i, path in enumerate(table.paths)} if complete else {}
+
+    reuse: Dict[str, int] = {}
+    failed: Dict[str, List[Any]] = {}
+    todo: Dict[Tuple[int, int], List[str]] = {}
+    for path in sorted(found):
+        st = found[path]
+        i = old_rows.get(path)
+        known_failure = table.failed.get(path)
+        if i is not None and int(table.columns["size"][i]) == st.st_size and int(table.columns["mtime_ns"][i]) == st.st_mtime_ns:
+            reuse[path] = i
+        elif known_failure is not None and known_failure[:2] == [st.st_size, st.st_mtime_ns]:
+            failed[path] = known_failure
+        else:
+            todo.setdefault((st.st_dev, st.st_ino), []).append(path)
+
+    removed = [path for path in table.paths if path not in found]
+    if not todo and not removed and len(failed) == len(table.failed):
+        return {
+            "rows": len(table),
+            "analyzed": 0,
+            "reused": len(reuse),
+            "removed": 0,
+            "failed": {path: entry[2] for path, entry in failed.items()},
+            "seconds": round(time.time() - started, 3),
+        }
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    groups = list(todo.values())
+    sources = [str(library_path / group[0]) for group in groups]
+    if sources:
+        # Spawned, not forked: the calling agent may hold threads, sockets and locks
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for group, (features, error) in zip(groups, pool.map(_analyze_or_error, sources, chunksize=chunksize)):
+                for path in group:
+                    if error is None:
+                        fresh[path] = features
+                    else:
+                        failed[path] = [found[path].st_size, found[path].st_mtime_ns, error]
+
+    paths = sorted(list(reuse) + list(fresh))
+    old_index = np.array([reuse.get(p, -1) for p in paths], dtype=np.int64)
+    from_old = old_index >= 0
+    columns: Dict[str, np.ndarray] = {}
+    for name in FeatureTable.COLUMNS:
+        if name in ("size", "mtime_ns"):
+            dtype, shape = np.int64, ()
+        elif name == "sha256":
+            dtype, shape = np.dtype("S32"), ()
+        else:
+            dtype, shape = np.float32, ((N_MFCC,) if name in VECTOR_FEATURES else ())
+        column = np.zeros((len(paths),) + shape, dtype=dtype)
+        if from_old.any():
+            column[from_old] = np.asarray(table.columns[name])[old_index[from_old]]
+        for row, path in enumerate(paths):
+            if not from_old[row]:
+                if name == "size":
+                    column[row] = found[path].st_size
+                elif name == "mtime_ns":
+                    column[row] = found[path].st_mtime_ns
+                else:
+                    column[row] = fresh[path][name]
+        columns[name] = column
+    table.write(paths, columns, failed)
+    return {
+        "rows": len(paths),
+        "analyzed": len(sources),
+        "reused": len(reuse),
+        "removed": len(removed),
+        "failed": {path: entry[2] for path, entry in failed.items()},
+        "seconds": round(time.time() - started, 3),
+    }
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .audiofeatures import FEATURE_NAMES, SCALAR_FEATURES, VECTOR_FEATURES, FeatureTable, analyze_file
+
+
+DEFAULT_TOP_K = 10
+# Rows per matrix product when scoring many queries or scanning for duplicates
+BATCH_ROWS = 2048
+DEFAULT_DUPLICATE_THRESHOLD = 0.995
+LSH_PLANES = 12
+LSH_TABLES = 8
+
+
+def _feature_vector(features: Dict[str, Any]) -> np.ndarray:
+    # Same layout as FeatureTable.feature_matrix()
+    parts = [np.atleast_1d(np.asarray(features[name], dtype=np.float32)) for name in SCALAR_FEATURES + VECTOR_FEATURES]
+    return np.concatenate(parts)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Indices of the k largest scores, best first, per row
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class RandomProjectionLSH:
+    """
+    Random-hyperplane buckets for approximate cosine search.
+
+    Each of n_tables tables hashes a vector to the sign pattern of its
+    projection onto n_planes random hyperplanes. A query's candidates are
+    the rows sharing its bucket in any table, plus the buckets one bit
+    away when probe is set; candidates are then scored exactly.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_planes: int = LSH_PLANES, n_tables: int = LSH_TABLES, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, vectors.shape[1], n_planes)).astype(np.float32)
+        self.weights = (1 << np.arange(n_planes)).astype(np.int64)
+        self.codes = self._hash(vectors)
+        # Per table: row order sorted by code, for searchsorted bucket lookups
+        self.order = np.argsort(self.codes, axis=1, kind="stable")
+        self.sorted_codes = np.take_along_axis(self.codes, self.order, axis=1)
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        # (n_tables, rows) bucket codes
+        bits = np.einsum("nd,tdp->tnp", vectors, self.planes) > 0
+        return bits.astype(np.int64) @ self.weights
+
+    def candidates(self, query: np.ndarray, probe: bool = True) -> np.ndarray:
+        codes = self._hash(query[None, :])[:, 0]
+        found: List[np.ndarray] = []
+        for t, code in enumerate(codes):
+            wanted = [code]
+            if probe:
+                wanted += [code ^ int(w) for w in self.weights]
+            for c in wanted:
+                lo, hi = np.searchsorted(self.sorted_codes[t], [c, c + 1])
+                if hi > lo:
+                    found.append(self.order[t, lo:hi])
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def buckets(self) -> List[np.ndarray]:
+        """Row groups sharing a bucket in some table (groups of one are left out)."""
+        groups: List[np.ndarray] = []
+        for t in range(len(self.codes)):
+            sorted_codes = self.sorted_codes[t]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            for group in np.split(self.order[t], bounds):
+                if len(group) > 1:
+                    groups.append(group)
+        return groups
+
+
+class AudioIndex:
+    """
+    Similarity index over the clips of a FeatureTable.
+
+    Each clip's features are standardised (z-scored per feature over the
+    library) and L2-normalised, so similarity is the cosine of two rows and
+    a whole library is scored with one matrix-vector product. query() is
+    exact by default; approximate=True restricts scoring to the clips a
+    RandomProjectionLSH puts near the query, built on first use.
+    """
+
+    def __init__(self, table: FeatureTable) -> None:
+        self.paths = list(table.paths)
+        self._row = {path: i for i, path in enumerate(self.paths)}
+        matrix = table.feature_matrix()
+        self.mean = matrix.mean(axis=0) if len(matrix) else np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+        std = matrix.std(axis=0) if len(matrix) else np.ones(len(FEATURE_NAMES), dtype=np.float32)
+        # Constant features carry no information; keep them from dividing by zero
+        self.std = np.where(std > 1e-9, std, 1.0).astype(np.float32)
+        self.vectors = np.ascontiguousarray(self._normalise(matrix))
+        # Raw content digest per row (memory-mapped), None for tables written without one
+        self.hashes: Optional[np.ndarray] = table.columns.get("sha256")
+        self._lsh: Optional[RandomProjectionLSH] = None
+
+    @classmethod
+    def load(cls, table_root: str) -> "AudioIndex":
+        return cls(FeatureTable(table_root))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _normalise(self, matrix: np.ndarray) -> np.ndarray:
+        z = (matrix - self.mean) / self.std
+        norms = np.linalg.norm(z, axis=-1, keepdims=True)
+        return (z / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+    @property
+    def lsh(self) -> RandomProjectionLSH:
+        if self._lsh is None:
+            self._lsh = RandomProjectionLSH(self.vectors)
+        return self._lsh
+
+    def vector_for(self, clip: Union[str, Dict[str, Any]]) -> np.ndarray:
+        """Normalised vector of a library path, an audio file on disk, or an analyze_file() result."""
+        if isinstance(clip, dict):
+            return self._normalise(_feature_vector(clip))
+        row = self._row.get(clip)
+        if row is not None:
+            return self.vectors[row]
+        return self._normalise(_feature_vector(analyze_file(clip)))
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        return [{"path": self.paths[r], "score": round(float(s), 6)} for r, s in zip(rows, scores)]
+
+    def query(
+        self,
+        clip: Union[str, Dict[str, Any]],
+        k: int = DEFAULT_TOP_K,
+        approximate: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """The k clips most similar to clip, best first; a library clip is not returned for itself."""
+        q = self.vector_for(clip)
+        exclude = self._row.get(clip) if isinstance(clip, str) else None
+        if approximate:
+            rows = self.lsh.candidates(q)
+            scores = self.vectors[rows] @ q
+        else:
+            rows = None
+            scores = self.vectors @ q
+        if exclude is not None:
+            if rows is None:
+                scores[exclude] = -np.inf
+            else:
+                scores = np.where(rows == exclude, -np.inf, scores)
+        best = _top_k(scores, k)
+        best = best[np.isfinite(scores[best])]
+        return self._hits(best if rows is None else rows[best], scores[best])
+
+    def query_many(self, clips: Sequence[Union[str, Dict[str, Any]]], k: int = DEFAULT_TOP_K) -> List[List[Dict[str, Any]]]:
+        """Exact top-k for several clips, scored BATCH_ROWS queries per matrix product."""
+        queries = np.stack([self.vector_for(c) for c in clips]) if clips else np.zeros((0, self.vectors.shape[1]), dtype=np.float32)
+        results: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(queries), BATCH_ROWS):
+            scores = queries[start:start + BATCH_ROWS] @ self.vectors.T
+            for offset, clip in enumerate(clips[start:start + BATCH_ROWS]):
+                row = self._row.get(clip) if isinstance(clip, str) else None
+                if row is not None:
+                    scores[offset, row] = -np.inf
+            best = _top_k(scores, k)
+            for row_scores, row_best in zip(scores, best):
+                row_best = row_best[np.isfinite(row_scores[row_best])]
+                results.append(self._hits(row_best, row_scores[row_best]))
+        return results
+
+    def _identical(self, uf: _UnionFind) -> np.ndarray:
+        # Links byte-identical clips by content hash, one row at a time and holding only
+        # the hashes; returns the first row of each distinct content
+        if self.hashes is None:
+            return np.arange(len(self.paths))
+        first: Dict[bytes, int] = {}
+        keep: List[int] = []
+        for row, digest in enumerate(self.hashes):
+            seen = first.setdefault(bytes(digest), row)
+            if seen == row:
+                keep.append(row)
+            else:
+                uf.union(seen, row)
+        return np.array(keep, dtype=np.int64)
+
+    def _exact_pairs(self, threshold: float, uf: _UnionFind, rows: np.ndarray) -> None:
+        vectors = self.vectors if len(rows) == len(self.vectors) else self.vectors[rows]
+        for start in range(0, len(vectors), BATCH_ROWS):
+            block = vectors[start:start + BATCH_ROWS]
+            # Only columns after each row, so every pair is scored once
+            scores = block @ vectors[start:].T
+            hits, cols = np.nonzero(np.triu(scores, k=1) >= threshold)
+            for r, c in zip(hits.tolist(), cols.tolist()):
+                uf.union(int(rows[start + r]), int(rows[start + c]))
+
+    def _bucket_pairs(self, threshold: float, uf: _UnionFind) -> None:
+        for group in self.lsh.buckets():
+            vectors = self.vectors[group]
+            rows, cols = np.nonzero(np.triu(vectors @ vectors.T, k=1) >= threshold)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                uf.union(int(group[r]), int(group[c]))
+
+    def near_duplicates(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD, approximate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Groups of clips whose pairwise similarity reaches threshold (linked
+        transitively), largest first. Each group lists its paths, whether
+        it spans more than one category (the first path component) and
+        whether its clips are byte-identical. Identical clips are grouped by
+        content hash first, so only one of each enters the similarity scan.
+        """
+        uf = _UnionFind()
+        distinct = self._identical(uf)
+        if approximate:
+            self._bucket_pairs(threshold, uf)
+        else:
+            self._exact_pairs(threshold, uf, distinct)
+        members: Dict[int, List[int]] = {}
+        for row in list(uf.parent):
+            members.setdefault(uf.find(row), []).append(row)
+        groups = []
+        for rows in members.values():
+            paths = sorted(self.paths[r] for r in rows)
+            categories = {p.split("/", 1)[0] for p in paths if "/" in p}
+            identical = self.hashes is not None and len({bytes(self.hashes[r]) for r in rows}) == 1
+            groups.append({"paths": paths, "categories": sorted(categories), "cross_category": len(categories) > 1, "identical": identical})
+        groups.sort(key=lambda g: (-len(g["paths"]), g["paths"][0]))
+        return groups
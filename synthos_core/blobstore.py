@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class BlobStore:
+    """
+    Content-addressed file store keyed by SHA-256.
+
+    Each distinct content is kept once under blobs/<aa>/<sha256>; named views
+    (e.g. <storage_dir>/<category>/<file>) are hardlinks to the blob, so the
+    same clip in several categories or runs occupies disk space once. Views
+    share the blob's data: edit a copy, not a view. manifest.ndjson gets one
+    line per newly stored blob (sha256, size, source url, time).
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.ndjson"
+        self._lock = threading.Lock()
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / "blobs" / sha256[:2] / sha256
+
+    def has(self, sha256: str) -> bool:
+        return bool(sha256) and self.path_for(sha256).exists()
+
+    def add(self, src: Path, sha256: str, url: Optional[str] = None) -> Path:
+        """Move src into the store under sha256; if the content is already stored, src is dropped."""
+        blob = self.path_for(sha256)
+        with self._lock:
+            if blob.exists():
+                src.unlink()
+                return blob
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(src, blob)
+            entry = {"sha256": sha256, "size": blob.stat().st_size, "url": url, "stored_at": time.time()}
+            with self.manifest_path.open("a") as f:
+                f.write(json.dumps(entry) + "\n")
+        return blob
+
+    def link(self, sha256: str, view_path: Path) -> Path:
+        """Point view_path at the blob, replacing whatever was there atomically."""
+        blob = self.path_for(sha256)
+        view_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if os.path.samefile(blob, view_path):
+                return view_path
+        except OSError:
+            pass
+        tmp = view_path.with_name(f".{view_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            # Filesystems without hardlinks get a plain copy
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, view_path)
+        return view_path
@@ -1,31 +1,101 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib
 import json
 import shlex
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TextIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
 
-from .agents_builtin import EchoAgent, ShellAgent, WebGetAgent
-from .agents_cursor import CursorLookupAgent
-from .agents_media import SoundEffectsAgent
-from .agents_trekcore import TrekCoreAgent
 from .orchestrator import Orchestrator, Task
+from .pool import AgentPool
 from .registry import AgentRegistry
+from .resultcache import DEFAULT_CACHE_DIR, ResultCache, agent_cache_ttl
+from .taskfile import iter_json_array
 
 
-def build_default_registry() -> AgentRegistry:
+# agent_type -> "module:Class". Agent modules are imported on first use of their
+# agent_type, so e.g. 'agent echo' never pays for urllib/http imports of crawlers.
+AGENT_MANIFEST: Dict[str, str] = {
+    "echo": "synthos_core.agents_builtin:EchoAgent",
+    "shell": "synthos_core.agents_builtin:ShellAgent",
+    "webget": "synthos_core.agents_builtin:WebGetAgent",
+    "cursor": "synthos_core.agents_cursor:CursorLookupAgent",
+    "sfx": "synthos_core.agents_media:SoundEffectsAgent",
+    "trekcore": "synthos_core.agents_trekcore:TrekCoreAgent",
+}
+
+# Agents safe to share between concurrent tasks (see AgentPool)
+POOLED_AGENT_TYPES = {"trekcore"}
+
+
+@functools.lru_cache(maxsize=None)
+def load_agent_class(agent_type: str) -> type:
+    module_name, _, class_name = AGENT_MANIFEST[agent_type].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _lazy_agent_factory(agent_type: str) -> Callable[..., Any]:
+    def factory(name: Optional[str], config: Optional[Dict[str, Any]] = None) -> Any:
+        return load_agent_class(agent_type)(name, config)
+
+    return factory
+
+
+def build_default_registry(pool: Optional[AgentPool] = None) -> AgentRegistry:
     registry = AgentRegistry()
-    registry.register("echo", lambda name, config=None: EchoAgent(name, config))
-    registry.register("shell", lambda name, config=None: ShellAgent(name, config))
-    registry.register("webget", lambda name, config=None: WebGetAgent(name, config))
-    registry.register("cursor", lambda name, config=None: CursorLookupAgent(name, config))
-    registry.register("sfx", lambda name, config=None: SoundEffectsAgent(name, config))
-    registry.register("trekcore", lambda name, config=None: TrekCoreAgent(name, config))
+    for agent_type in AGENT_MANIFEST:
+        factory = _lazy_agent_factory(agent_type)
+        pooled = pool is not None and agent_type in POOLED_AGENT_TYPES
+        if pooled:
+            factory = pool.wrap(agent_type, factory)
+        registry.register(agent_type, factory, shared=pooled, release=pool.release if pooled else None)
     return registry
 
 
+def _result_ttl(agent_type: str, task_input: Dict[str, Any]) -> Optional[float]:
+    if agent_type not in AGENT_MANIFEST:
+        return None
+    return agent_cache_ttl(load_agent_class(agent_type), task_input)
+
+
+def _execution_policy(agent_type: str, task_input: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    if agent_type not in AGENT_MANIFEST:
+        return "inline", None
+    from .execution import agent_execution
+
+    return agent_execution(load_agent_class(agent_type), task_input)
+
+
+def _process_worker_runner() -> Callable[[Task], Dict[str, Any]]:
+    # Runs in each worker process: a private registry and orchestrator, executing tasks in-process
+    return Orchestrator(build_default_registry()).run_task
+
+
+def _build_runner(args: argparse.Namespace, orch: Orchestrator) -> Tuple[Callable[[Task], Dict[str, Any]], Optional[ResultCache], Any]:
+    # Returns (run_task, result cache or None, execution router to close)
+    from .execution import ExecutionRouter, ProcessWorkerPool
+
+    router = ExecutionRouter(
+        orch.run_task,
+        _execution_policy,
+        lambda: ProcessWorkerPool(_process_worker_runner, args.process_workers, args.tasks_per_worker),
+        default_timeout=args.task_timeout,
+    )
+    if args.no_cache:
+        return router.run_task, None, router
+    # Cache in front of the router, so hits never wait for a worker
+    cache = ResultCache(args.cache_dir)
+    return cache.wrap(router.run_task, _result_ttl), cache, router
+
+
+def _report_cache(cache: Optional[ResultCache]) -> None:
+    if cache is not None and (cache.hits or cache.misses):
+        print(f"result cache: {cache.hits} hit(s), {cache.misses} miss(es)", file=sys.stderr)
+
+
 def _notify_macos(title: str, message: str) -> None:
     if sys.platform != "darwin":
         return
@@ -61,55 +131,180 @@ def _parse_tasks_from_stream(stream: TextIO) -> List[Dict[str, Any]]:
         return tasks
 
 
-def _load_tasks(path: Optional[str], stdin_fallback: bool) -> List[Task]:
-    raw_items: List[Dict[str, Any]] = []
+def _load_task_items(path: Optional[str], stdin_fallback: bool) -> List[Dict[str, Any]]:
     if path and path != "-":
-        raw_items = json.loads(Path(path).read_text())
-    else:
-        if stdin_fallback or not sys.stdin.isatty():
-            raw_items = _parse_tasks_from_stream(sys.stdin)
+        try:
+            return list(iter_json_array(path))
+        except json.JSONDecodeError as exc:
+            raise SystemExit(f"Invalid task file {path}: {exc}")
+    if stdin_fallback or not sys.stdin.isatty():
+        return _parse_tasks_from_stream(sys.stdin)
+    raise SystemExit("No tasks provided. Use --tasks PATH or pipe JSON to stdin or pass --stdin.")
+
+
+def _task_from_item(item: Dict[str, Any]) -> Task:
+    return Task(
+        id=str(item.get("id", "")),
+        agent_type=item["agent_type"],
+        input=item.get("input", {}),
+        name=item.get("name"),
+        config=item.get("config"),
+    )
+
+
+def _load_tasks(path: Optional[str], stdin_fallback: bool) -> List[Task]:
+    return [_task_from_item(item) for item in _load_task_items(path, stdin_fallback)]
+
+
+def _stream_task_from_item(item: Dict[str, Any]) -> Task:
+    if item.get("depends_on"):
+        raise ValueError("'depends_on' is not supported with --stream")
+    return _task_from_item(item)
+
+
+def _iter_ndjson_tasks(stream: TextIO) -> Iterator[Task]:
+    # Lazily parse one task per line; bad lines are reported and skipped so the stream keeps flowing
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            task = _stream_task_from_item(json.loads(line))
+        except (ValueError, KeyError, AttributeError) as exc:
+            print(f"warning: skipping line {lineno}: {exc}", file=sys.stderr)
+            continue
+        yield task
+
+
+def _iter_array_file_tasks(path: str) -> Iterator[Task]:
+    for index, item in enumerate(iter_json_array(path), 1):
+        try:
+            task = _stream_task_from_item(item)
+        except (ValueError, KeyError, AttributeError) as exc:
+            print(f"warning: skipping task #{index}: {exc}", file=sys.stderr)
+            continue
+        yield task
+
+
+def _is_json_array_file(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4096).lstrip().startswith(b"[")
+
+
+def _json_default(value: Any) -> Any:
+    # Binary result fields (inline or PayloadRef from a worker process) are emitted as base64
+    view = getattr(value, "view", None)
+    data = view() if callable(view) else value
+    try:
+        raw = memoryview(data).cast("B")
+    except TypeError:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable") from None
+    import base64
+
+    return {"encoding": "base64", "data": base64.b64encode(raw).decode("ascii")}
+
+
+def _dumps(value: Any, indent: Optional[int] = None) -> str:
+    return json.dumps(value, indent=indent, default=_json_default)
+
+
+def _write_result_file(out_dir: Path, item: Dict[str, Any], pretty: bool) -> None:
+    task_id = item.get("task_id", "task")
+    out_path = out_dir / f"{task_id}.json"
+    out_path.write_text(_dumps(item, indent=2 if pretty else None))
+
+
+def _run_stream(args: argparse.Namespace, run_task: Callable[[Task], Dict[str, Any]], release_result: Callable[[Any], None]) -> int:
+    stream: Optional[TextIO] = None
+    if args.tasks and args.tasks != "-":
+        if _is_json_array_file(args.tasks):
+            tasks = _iter_array_file_tasks(args.tasks)
         else:
-            raise SystemExit("No tasks provided. Use --tasks PATH or pipe JSON to stdin or pass --stdin.")
-
-    tasks: List[Task] = []
-    for item in raw_items:
-        tasks.append(
-            Task(
-                id=str(item.get("id", "")),
-                agent_type=item["agent_type"],
-                input=item.get("input", {}),
-                name=item.get("name"),
-                config=item.get("config"),
-            )
-        )
-    return tasks
+            stream = open(args.tasks, "r")
+            tasks = _iter_ndjson_tasks(stream)
+    elif args.stdin or not sys.stdin.isatty():
+        tasks = _iter_ndjson_tasks(sys.stdin)
+    else:
+        raise SystemExit("No tasks provided. Use --tasks PATH or pipe NDJSON to stdin or pass --stdin.")
+    from .scheduler import TaskScheduler
+
+    out_dir = Path(args.output_dir) if args.output_dir else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    scheduler = TaskScheduler(run_task, max_workers=args.max_workers, per_agent_limit=args.per_agent_limit)
+    count = 0
+    try:
+        for result in scheduler.run_stream(tasks):
+            if out_dir:
+                _write_result_file(out_dir, result, pretty=False)
+            sys.stdout.write(_dumps(result) + "\n")
+            sys.stdout.flush()
+            # Written out: its payloads (from a worker process) are no longer needed
+            release_result(result)
+            count += 1
+    finally:
+        if stream is not None:
+            stream.close()
+    if args.notify:
+        _notify_macos("Synthos", f"Completed {count} task(s)")
+    return 0
 
 
 def _run_subcommand(args: argparse.Namespace) -> int:
-    registry = build_default_registry()
+    pool = AgentPool()
+    registry = build_default_registry(pool)
     orch = Orchestrator(registry)
+    run_task, cache, router = _build_runner(args, orch)
     try:
-        tasks = _load_tasks(args.tasks, args.stdin)
-        results = orch.run_tasks(tasks)
+        if args.stream:
+            return _run_stream(args, run_task, router.release_result)
+        raw_items = _load_task_items(args.tasks, args.stdin)
+        tasks = [_task_from_item(item) for item in raw_items]
+        depends_on = [[str(d) for d in item.get("depends_on") or []] for item in raw_items]
+        if args.max_workers > 1 or any(depends_on):
+            # Imported here: concurrent.futures pulls in logging, which single-agent runs never need
+            from .scheduler import TaskScheduler
+
+            scheduler = TaskScheduler(run_task, max_workers=args.max_workers, per_agent_limit=args.per_agent_limit)
+            try:
+                results = scheduler.run(tasks, depends_on)
+            except ValueError as exc:
+                raise SystemExit(f"Invalid tasks: {exc}")
+        else:
+            results = [run_task(task) for task in tasks]
         # Optional per-task file outputs
         if args.output_dir:
             out_dir = Path(args.output_dir)
             out_dir.mkdir(parents=True, exist_ok=True)
             for item in results:
-                task_id = item.get("task_id", "task")
-                out_path = out_dir / f"{task_id}.json"
-                out_path.write_text(json.dumps(item, indent=None if args.no_pretty else 2))
-        print(json.dumps(results, indent=None if args.no_pretty else 2))
+                _write_result_file(out_dir, item, pretty=not args.no_pretty)
+        print(_dumps(results, indent=None if args.no_pretty else 2))
+        router.release_result(results)
         if args.notify:
             _notify_macos("Synthos", f"Completed {len(results)} task(s)")
         return 0
     finally:
+        _report_cache(cache)
+        router.close()
         orch.shutdown()
+        pool.close()
+
+
+def _apply_cursor_flags(args: argparse.Namespace, payload: Dict[str, Any]) -> None:
+    # The --cursor-* flags fill in input fields the JSON payload left out
+    if args.cursor_lang is not None:
+        payload.setdefault("lang", args.cursor_lang)
+    if args.cursor_max_pages is not None:
+        payload.setdefault("max_pages", args.cursor_max_pages)
+    if args.cursor_markdown:
+        payload.setdefault("markdown", True)
 
 
 def _agent_subcommand(args: argparse.Namespace) -> int:
-    registry = build_default_registry()
+    pool = AgentPool()
+    registry = build_default_registry(pool)
     orch = Orchestrator(registry)
+    run_task, cache, router = _build_runner(args, orch)
     try:
         # Build a single Task
         if args.input == "-":
@@ -117,6 +312,8 @@ def _agent_subcommand(args: argparse.Namespace) -> int:
         else:
             input_payload = json.loads(args.input)
         config_payload = json.loads(args.config) if args.config else None
+        if args.agent_type == "cursor":
+            _apply_cursor_flags(args, input_payload)
         task = Task(
             id="single",
             agent_type=args.agent_type,
@@ -124,23 +321,28 @@ def _agent_subcommand(args: argparse.Namespace) -> int:
             name=args.name,
             config=config_payload,
         )
-        result = orch.run_task(task)
+        result = run_task(task)
         if args.output:
             out_path = Path(args.output)
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            out_path.write_text(json.dumps(result, indent=None if args.no_pretty else 2))
-        print(json.dumps(result, indent=None if args.no_pretty else 2))
+            out_path.write_text(_dumps(result, indent=None if args.no_pretty else 2))
+        print(_dumps(result, indent=None if args.no_pretty else 2))
+        router.release_result(result)
         if args.notify:
             _notify_macos("Synthos", f"{args.agent_type} done")
         return 0
     finally:
+        _report_cache(cache)
+        router.close()
         orch.shutdown()
+        pool.close()
 
 
 def _repl_subcommand(args: argparse.Namespace) -> int:
     print("Synthos REPL. Enter lines like: 'echo {\"message\": \"hi\"}'")
     print("Commands: :q to quit, :help for help")
-    registry = build_default_registry()
+    pool = AgentPool()
+    registry = build_default_registry(pool)
     orch = Orchestrator(registry)
     try:
         while True:
@@ -175,6 +377,13 @@ def _repl_subcommand(args: argparse.Namespace) -> int:
         return 0
     finally:
         orch.shutdown()
+        pool.close()
+
+
+def _add_execution_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--task-timeout", type=float, default=None, help="Seconds before a thread- or process-class task is abandoned (agents may set their own)")
+    parser.add_argument("--process-workers", type=int, default=None, help="Worker processes for process-class agents (default: CPU count)")
+    parser.add_argument("--tasks-per-worker", type=int, default=100, help="Restart a worker process after this many tasks")
 
 
 def main() -> None:
@@ -187,6 +396,12 @@ def main() -> None:
     p_run.add_argument("--notify", action="store_true", help="macOS notification when done")
     p_run.add_argument("--no-pretty", action="store_true", help="Compact JSON output")
     p_run.add_argument("--output-dir", default=None, help="Directory to write per-task JSON results")
+    p_run.add_argument("--max-workers", type=int, default=1, help="Run up to N tasks concurrently (honors 'depends_on')")
+    p_run.add_argument("--per-agent-limit", type=int, default=None, help="Cap concurrent tasks per agent_type")
+    p_run.add_argument("--stream", action="store_true", help="Read tasks lazily (NDJSON, or a JSON array file via mmap) and emit one NDJSON result line per task as it completes")
+    p_run.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the on-disk result cache")
+    p_run.add_argument("--no-cache", action="store_true", help="Always run agents, ignoring and not filling the result cache")
+    _add_execution_args(p_run)
     p_run.set_defaults(func=_run_subcommand)
 
     p_agent = sub.add_parser("agent", help="Run a single agent once")
@@ -197,12 +412,15 @@ def main() -> None:
     p_agent.add_argument("--notify", action="store_true", help="macOS notification when done")
     p_agent.add_argument("--no-pretty", action="store_true", help="Compact JSON output")
     p_agent.add_argument("--output", default=None, help="Write the single result JSON to this file path")
+    p_agent.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the on-disk result cache")
+    p_agent.add_argument("--no-cache", action="store_true", help="Always run the agent, ignoring and not filling the result cache")
+    _add_execution_args(p_agent)
     p_agent.set_defaults(func=_agent_subcommand)
 
     # Convenience flags for cursor agent (optional sugar; still takes JSON input)
     # Example: synthos_core.cli agent cursor --input '{"query":"..."}' --cursor-lang en --cursor-max-pages 3 --cursor-markdown
     p_agent.add_argument("--cursor-lang", default=None, help="Convenience: language code for cursor agent")
-    p_agent.add_argument("--cursor-max-pages", type=int, default=None, help="Convenience: max pages to scan")
+    p_agent.add_argument("--cursor-max-pages", type=int, default=None, help="Convenience: max pages to return")
     p_agent.add_argument("--cursor-markdown", action="store_true", help="Convenience: include markdown report in result")
 
     p_repl = sub.add_parser("repl", help="Interactive REPL for ad-hoc runs")
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import html.parser
+import json
+import os
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .downloader import DEFAULT_MAX_CONCURRENCY, DownloadEngine
+from .httpclient import HTTPError, get_client
+from .links import LinkFilter, all_of, iter_links, same_origin, under_prefix
+from .textindex import InvertedIndex
+
+
+USER_AGENT = "SynthosDocsSync/0.1 (+https://github.com/Syntvherse-Labs/synthos)"
+DEFAULT_RATE_PER_HOST = 4.0
+
+
+class _TextExtractor(html.parser.HTMLParser):
+    """Visible text of an HTML page, for indexing."""
+
+    SKIP = {"script", "style", "noscript", "template"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag in self.SKIP:
+            self._skipping += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def page_text(body: bytes) -> str:
+    parser = _TextExtractor()
+    parser.feed(body.decode("utf-8", errors="replace"))
+    parser.close()
+    return " ".join(" ".join(parser.parts).split())
+
+
+class PageStore:
+    """
+    Gzip-compressed page bodies plus a manifest of what each page was.
+
+    The manifest maps URL -> {etag, last_modified, sha256, html, file,
+    links, fetched_at}; keeping a page's outgoing links there lets a sync walk
+    unchanged pages without decompressing or re-parsing them. Every sync
+    appends one line to changes.ndjson listing added, changed and removed
+    URLs. Keep one store per crawl (e.g. per docs language, see
+    language_store()): a sync prunes the pages of its store that it no
+    longer reaches.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.pages_dir = self.root / "pages"
+        self.manifest_path = self.root / "manifest.json"
+        self.changes_path = self.root / "changes.ndjson"
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        if self.manifest_path.exists():
+            self.pages = json.loads(self.manifest_path.read_text())
+
+    def read(self, url: str) -> bytes:
+        with gzip.open(self.root / self.pages[url]["file"], "rb") as f:
+            return f.read()
+
+    def write(self, url: str, body: bytes, entry: Dict[str, Any]) -> None:
+        name = hashlib.sha1(url.encode()).hexdigest() + ".html.gz"
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.pages_dir / (name + ".tmp")
+        with gzip.open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, self.pages_dir / name)
+        self.pages[url] = {**entry, "file": f"pages/{name}"}
+
+    def remove(self, url: str) -> None:
+        entry = self.pages.pop(url, None)
+        if entry:
+            try:
+                (self.root / entry["file"]).unlink()
+            except OSError:
+                pass
+
+    def commit(self, changes: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.pages))
+        os.replace(tmp, self.manifest_path)
+        with self.changes_path.open("a") as f:
+            f.write(json.dumps(changes) + "\n")
+
+
+def language_store(docs_dir: str, lang: str) -> PageStore:
+    """The page store of one docs language: docs_dir/<lang>/."""
+    return PageStore(os.path.join(docs_dir, lang))
+
+
+def _fetch_page(url: str, known: Optional[Dict[str, Any]]) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    # (None, {}) means 304 Not Modified
+    headers = {"User-Agent": USER_AGENT}
+    if known:
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+    with get_client().get(url, headers=headers) as resp:
+        if resp.status == 304:
+            resp.read()
+            return None, {}
+        resp.raise_for_status()
+        body = resp.read()
+        return body, {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "html": "html" in (resp.headers.get("Content-Type") or "text/html"),
+        }
+
+
+def sync(
+    start_url: str,
+    store: PageStore,
+    prefix: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    rate_per_host: float = DEFAULT_RATE_PER_HOST,
+    index: Optional[InvertedIndex] = None,
+    lang: str = "en",
+    exclude: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Crawl start_url (same origin, under prefix, outside every exclude
+    prefix) and bring store up to date.
+
+    Pages are requested conditionally with their stored validators, in
+    parallel up to max_concurrency and at most rate_per_host requests per
+    second. Only pages whose body hash changed are rewritten; unchanged
+    pages contribute their stored links, so a sync where little changed
+    costs mostly 304s. Pages answering 404/410 are dropped, as are pages
+    within the crawl's scope no longer linked when the crawl was neither cut
+    short by max_pages nor hit by a failed fetch (whose stored links are
+    followed instead). When an index is given, its lang shard is reconciled
+    with the store: pages it lacks or holds an older version of (by body
+    hash) are indexed, and documents without a stored page are dropped.
+    """
+    started = time.time()
+    excluded = tuple(exclude)
+    # By default stay within the start page's directory
+    accept = all_of(
+        same_origin(start_url),
+        under_prefix(prefix or urllib.parse.urljoin(start_url, ".")),
+        lambda link: not link.startswith(excluded),
+    )
+    seen = {start_url}
+    frontier = [start_url]
+    added: List[str] = []
+    changed: List[str] = []
+    failed: List[str] = []
+    gone: List[str] = []
+    unchanged = 0
+    truncated = False
+
+    def fetch(url: str) -> Tuple[Optional[bytes], Dict[str, Any]]:
+        return _fetch_page(url, store.pages.get(url))
+
+    while frontier:
+        engine = DownloadEngine(fetch, rate_per_host=rate_per_host, max_concurrency=max_concurrency)
+        next_level: List[str] = []
+        for url, result, exc in engine.run(frontier):
+            if isinstance(exc, HTTPError) and exc.status in (404, 410):
+                gone.append(url)
+                continue
+            known = store.pages.get(url)
+            if exc is not None or result is None:
+                failed.append(url)
+                # Walk on through the stored copy so a transient error does not hide its subtree
+                links = known["links"] if known else []
+            else:
+                body, meta = result
+                digest = hashlib.sha256(body).hexdigest() if body is not None else None
+                if body is None or (known and known.get("sha256") == digest):
+                    unchanged += 1
+                    links = known["links"]
+                    if body is not None:
+                        # Same content under new validators: keep them for the next conditional request
+                        known.update(etag=meta["etag"], last_modified=meta["last_modified"])
+                else:
+                    links = []
+                    if meta["html"]:
+                        links = [urllib.parse.urldefrag(l)[0] for l in iter_links([body], url, accept)]
+                    (changed if known else added).append(url)
+                    store.write(url, body, {
+                        "etag": meta["etag"],
+                        "last_modified": meta["last_modified"],
+                        "sha256": digest,
+                        "html": meta["html"],
+                        "links": sorted(set(links)),
+                        "fetched_at": time.time(),
+                    })
+            for link in links:
+                # Stored links predate this crawl's scope (e.g. a newly excluded language)
+                if link in seen or not accept(link):
+                    continue
+                if max_pages is not None and len(seen) >= max_pages:
+                    truncated = True
+                    break
+                seen.add(link)
+                next_level.append(link)
+        frontier = next_level
+
+    # Failed fetches keep their previous copy rather than counting as removed,
+    # and after any failure an unseen page is no proof that it was unlinked
+    removed = [u for u in gone if u in store.pages]
+    if not truncated and not failed:
+        # Only pages this crawl could have reached: a store shared with other crawls keeps theirs
+        removed += [u for u in store.pages if u not in seen and accept(u)]
+    for url in removed:
+        store.remove(url)
+
+    def in_scope(url: str) -> bool:
+        return url == start_url or accept(url)
+
+    indexed = _reconcile_index(index, lang, store, in_scope) if index is not None else 0
+    summary = {
+        "synced_at": started,
+        "seconds": round(time.time() - started, 3),
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "failed": failed,
+        "unchanged_count": unchanged,
+        "indexed_count": indexed,
+    }
+    store.commit(summary)
+    return summary
+
+
+def _reconcile_index(index: InvertedIndex, lang: str, store: PageStore, in_scope: LinkFilter) -> int:
+    # Index the crawl's stored pages the shard lacks or has an older version of, whatever
+    # this sync fetched (e.g. a new or wiped shard), and drop documents with no such page
+    current = index.versions(lang)
+    stale = {
+        url: entry["sha256"]
+        for url, entry in store.pages.items()
+        if entry.get("html", True) and in_scope(url) and current.get(url) != entry["sha256"]
+    }
+    extra = [url for url in current if url not in store.pages or not in_scope(url)]
+    if not stale and not extra:
+        return 0
+    docs = ((url, page_text(store.read(url))) for url in stale)
+    return index.update(lang, docs, removed=extra, versions=stale)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from .httpclient import HTTPClient, HTTPError, get_client
+from .memory import AgentMemory
+
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_INITIAL_CONCURRENCY = 2
+# A completion slower than this multiple of the running average counts as congestion
+LATENCY_CONGESTION_FACTOR = 2.0
+
+T = TypeVar("T")
+
+
+def _is_congestion(exc: BaseException) -> bool:
+    # A 404 says nothing about server load; 429, 5xx and network failures do
+    if isinstance(exc, HTTPError):
+        return exc.status == 429 or exc.status >= 500
+    return True
+
+
+class TokenBucket:
+    """Blocking token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_for = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit driven by observed latency and errors.
+
+    The limit grows by one after a full window of healthy completions and is
+    halved on an overload error; a completion much slower than the average
+    lowers it by one. Decreases are spaced by one average latency so a burst
+    of failures from the same congested period only counts once.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_CONCURRENCY,
+        minimum: int = 1,
+        maximum: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self._avg_latency: Optional[float] = None
+        self._healthy = 0
+        self._last_decrease = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        avg = self._avg_latency
+        congested = not ok or (avg is not None and latency > avg * LATENCY_CONGESTION_FACTOR)
+        self._avg_latency = latency if avg is None else avg * 0.8 + latency * 0.2
+        if congested:
+            self._healthy = 0
+            if now - self._last_decrease >= (avg or 0.0):
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit // 2 if not ok else self.limit - 1)
+            return
+        self._healthy += 1
+        if self._healthy >= self.limit:
+            self._healthy = 0
+            self.limit = min(self.maximum, self.limit + 1)
+
+
+class DownloadEngine(Generic[T]):
+    """
+    Runs fetch(url) for many URLs with bounded, self-tuning concurrency.
+
+    Every request first takes a token from its host's bucket, so the request
+    rate per host never exceeds rate_per_host regardless of concurrency. The
+    number of requests in flight adapts between 1 and max_concurrency.
+    run() yields (url, result, error) tuples as downloads complete.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], T],
+        rate_per_host: float,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+    ) -> None:
+        self.fetch = fetch
+        self.rate_per_host = rate_per_host
+        self.max_concurrency = max_concurrency
+        self.concurrency = AdaptiveConcurrency(initial=initial_concurrency, maximum=max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate_per_host)
+            return bucket
+
+    def _timed_fetch(self, url: str) -> Tuple[float, T]:
+        self._bucket(url).acquire()
+        start = time.monotonic()
+        result = self.fetch(url)
+        return time.monotonic() - start, result
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[T], Optional[BaseException]]]:
+        pending = iter(urls)
+        exhausted = False
+        in_flight: Dict[Future, Tuple[str, float]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            while True:
+                while not exhausted and len(in_flight) < self.concurrency.limit:
+                    url = next(pending, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    in_flight[pool.submit(self._timed_fetch, url)] = (url, time.monotonic())
+                if not in_flight:
+                    return
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    url, submitted = in_flight.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None:
+                        self.concurrency.record(time.monotonic() - submitted, ok=not _is_congestion(exc))
+                        yield url, None, exc
+                    else:
+                        latency, result = fut.result()
+                        self.concurrency.record(latency, ok=True)
+                        yield url, result, None
+
+
+def _range_validator(headers: Any) -> Optional[str]:
+    # If-Range needs a strong validator; weak ETags cannot be used to resume
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    headers: Optional[Dict[str, str]] = None,
+    known: Optional[Dict[str, Any]] = None,
+    client: Optional[HTTPClient] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Stream url into dest with constant memory and an atomic final rename.
+
+    The body goes to <dest>.part first; an interrupted transfer is resumed
+    with a Range request guarded by If-Range, so a changed file restarts from
+    zero. When `known` holds the ETag / Last-Modified of a copy the caller
+    already has, the request is conditional and None is returned on 304.
+    Otherwise returns {"size", "etag", "last_modified", "sha256"} of the new
+    file; the digest is computed while the body streams in.
+    """
+    client = client or get_client()
+    part = dest.with_name(dest.name + ".part")
+    state_path = dest.with_name(dest.name + ".part.json")
+    request_headers = {**(headers or {}), "Accept-Encoding": "identity"}
+
+    offset = part.stat().st_size if part.exists() else 0
+    if offset:
+        try:
+            validator = json.loads(state_path.read_text()).get("validator")
+        except (OSError, ValueError):
+            validator = None
+        if validator:
+            request_headers["Range"] = f"bytes={offset}-"
+            request_headers["If-Range"] = validator
+        else:
+            offset = 0
+    elif known:
+        if known.get("etag"):
+            request_headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            request_headers["If-Modified-Since"] = known["last_modified"]
+
+    with client.get(url, headers=request_headers) as resp:
+        if resp.status == 304:
+            resp.read()
+            return None
+        if resp.status == 416:
+            # The partial file no longer fits the resource; start over
+            resp.read()
+            part.unlink()
+            return download_file(url, dest, headers=headers, client=client)
+        resp.raise_for_status()
+        resuming = resp.status == 206 and (resp.headers.get("Content-Range") or "").startswith(f"bytes {offset}-")
+        if resp.status == 206 and not resuming:
+            resp.close()
+            part.unlink()
+            return download_file(url, dest, headers=headers, client=client)
+        validator = _range_validator(resp.headers)
+        state_path.write_text(json.dumps({"url": url, "validator": validator}))
+        digest = hashlib.sha256()
+        if resuming:
+            with open(part, "rb") as existing:
+                for block in iter(lambda: existing.read(1 << 20), b""):
+                    digest.update(block)
+        with open(part, "ab" if resuming else "wb") as f:
+            for chunk in resp.iter_content():
+                f.write(chunk)
+                digest.update(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+    os.replace(part, dest)
+    try:
+        state_path.unlink()
+    except OSError:
+        pass
+    return {"size": dest.stat().st_size, "etag": etag, "last_modified": last_modified, "sha256": digest.hexdigest()}
+
+
+class DownloadIndex:
+    """
+    Latest completed download per URL, kept in AgentMemory's downloads table.
+
+    get(url) returns the newest record for url (size, ETag, Last-Modified,
+    sha256, path) for conditional and resumed requests; record() adds one
+    through the memory's batched writer. An NDJSON index left by earlier
+    versions at legacy_path is imported once and renamed to *.imported.
+    """
+
+    def __init__(self, memory: AgentMemory, agent: str, legacy_path: Optional[Path] = None) -> None:
+        self.memory = memory
+        self.agent = agent
+        if legacy_path is not None and legacy_path.exists():
+            self._import_legacy(legacy_path)
+
+    def _import_legacy(self, path: Path) -> None:
+        entries = []
+        with path.open("r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        self.memory.record_downloads(self.agent, entries)
+        self.memory.flush()
+        os.replace(path, path.with_name(path.name + ".imported"))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        rows = self.memory.downloads(url=url, limit=1)
+        return rows[0] if rows else None
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self.memory.record_downloads(self.agent, [entry])
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .orchestrator import Task
+from .payloads import DEFAULT_INLINE_LIMIT, DEFAULT_MAX_BYTES, PayloadArena, PayloadRef, iter_refs
+
+
+EXECUTION_CLASSES = ("inline", "thread", "process")
+DEFAULT_TASKS_PER_WORKER = 100
+# Grace period for a worker asked to stop before it is killed
+WORKER_STOP_TIMEOUT = 2.0
+
+TaskRunner = Callable[[Task], Dict[str, Any]]
+# (agent_type, task input) -> (execution class, timeout in seconds or None)
+ExecutionPolicy = Callable[[str, Dict[str, Any]], Tuple[str, Optional[float]]]
+
+
+def agent_execution(agent_cls: type, task_input: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    """
+    Execution class and timeout an agent class declares for task_input: an
+    execution(task_input) classmethod when they depend on the input (e.g.
+    the action), else EXECUTION and TIMEOUT_SECONDS attributes. Agents
+    declaring neither run inline without a timeout.
+    """
+    execution = getattr(agent_cls, "execution", None)
+    if callable(execution):
+        return execution(task_input)
+    return getattr(agent_cls, "EXECUTION", "inline"), getattr(agent_cls, "TIMEOUT_SECONDS", None)
+
+
+def _error_result(task: Task, message: str) -> Dict[str, Any]:
+    return {"task_id": task.id, "agent_type": task.agent_type, "error": message}
+
+
+def _worker_main(conn: Any, runner_factory: Callable[[], TaskRunner], max_tasks: int, arena_root: str, inline_limit: int, max_bytes: int) -> None:
+    import multiprocessing
+
+    # Daemonic only towards the parent: tasks may start their own process pools (e.g. audio analysis)
+    multiprocessing.current_process().daemon = False
+    run_task = runner_factory()
+    arena = PayloadArena(arena_root, inline_limit, max_bytes)
+    for _ in range(max_tasks):
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        try:
+            # Large byte fields go back as PayloadRef handles rather than through the pipe
+            result = arena.export(run_task(task))
+        except Exception as exc:
+            result = _error_result(task, f"{type(exc).__name__}: {exc}")
+        try:
+            conn.send(result)
+        except Exception as exc:
+            # e.g. an unpicklable result
+            conn.send(_error_result(task, f"result could not be returned: {exc}"))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, runner_factory: Callable[[], TaskRunner], max_tasks: int, arena: PayloadArena) -> None:
+        self.conn, child = ctx.Pipe()
+        args = (child, runner_factory, max_tasks, arena.root, arena.inline_limit, arena.max_bytes)
+        self.process = ctx.Process(target=_worker_main, args=args, daemon=True)
+        self.process.start()
+        child.close()
+        self.remaining = max_tasks
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(WORKER_STOP_TIMEOUT)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessWorkerPool:
+    """
+    Persistent pool of worker processes for CPU-bound tasks.
+
+    Each worker builds its own runner once via runner_factory (a picklable,
+    module-level callable) and then serves tasks one at a time over a pipe,
+    exiting after max_tasks_per_worker tasks so leaks cannot accumulate; a
+    fresh worker is started on demand. A task that exceeds its timeout gets
+    its worker killed, and a worker that dies mid-task, for either reason,
+    yields an error result instead of propagating to the caller.
+
+    Bytes-like values of at least inline_limit bytes in task inputs and
+    results travel through a PayloadArena owned by the pool: only
+    PayloadRef handles cross the pipe, and the receiving side gets views of
+    the same mapped file. A task's input payloads are unlinked as soon as
+    the task is over, whether it succeeded, failed or timed out, unless its
+    result hands them on. Payloads in a result belong to the caller, who
+    hands them back with release_result() once the result is consumed. The
+    arena holds at most arena_max_bytes across the pool and its workers,
+    and is removed by close().
+    """
+
+    def __init__(
+        self,
+        runner_factory: Callable[[], TaskRunner],
+        max_workers: Optional[int] = None,
+        max_tasks_per_worker: int = DEFAULT_TASKS_PER_WORKER,
+        inline_limit: int = DEFAULT_INLINE_LIMIT,
+        arena_max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        # Imported here: multiprocessing is only needed once a process-class task shows up
+        import multiprocessing
+
+        # Workers are spawned, not forked: the parent holds threads, sockets and locks
+        self._ctx = multiprocessing.get_context("spawn")
+        self.runner_factory = runner_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self.arena = PayloadArena(inline_limit=inline_limit, max_bytes=arena_max_bytes)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.runner_factory, self.max_tasks_per_worker, self.arena)
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._spawn()
+
+    def _checkin(self, worker: _Worker) -> None:
+        worker.remaining -= 1
+        if worker.remaining <= 0:
+            # It exits on its own after its last task
+            worker.process.join(WORKER_STOP_TIMEOUT)
+            worker.kill()
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def run_task(self, task: Task, timeout: Optional[float] = None) -> Dict[str, Any]:
+        created: List[PayloadRef] = []
+        task_input = self.arena.export(task.input, created)
+        if task_input is not task.input:
+            task = copy.copy(task)
+            task.input = task_input
+        result: Optional[Dict[str, Any]] = None
+        try:
+            result = self._run_on_worker(task, timeout)
+            return result
+        finally:
+            # The worker has mapped (or will never map) these by now
+            kept = {ref.path for ref in iter_refs(result)}
+            for ref in created:
+                if ref.path not in kept:
+                    self.arena.release(ref)
+
+    def release_result(self, result: Any) -> None:
+        """Unlink the arena payloads result refers to; views already taken stay readable."""
+        for ref in iter_refs(result):
+            if os.path.dirname(ref.path) == self.arena.root:
+                self.arena.release(ref)
+
+    def _run_on_worker(self, task: Task, timeout: Optional[float]) -> Dict[str, Any]:
+        with self._slots:
+            worker = self._checkout()
+            try:
+                try:
+                    worker.conn.send(task)
+                except OSError:
+                    # An idle worker died since its last task; this one never reached it
+                    worker.kill()
+                    worker = self._spawn()
+                    worker.conn.send(task)
+                if not worker.conn.poll(timeout):
+                    worker.kill()
+                    return _error_result(task, f"timed out after {timeout:g}s")
+                result = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                return _error_result(task, f"worker process died (exit code {worker.process.exitcode})")
+            self._checkin(worker)
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+        self.arena.close()
+
+
+class ExecutionRouter:
+    """
+    Runs each task according to the execution class its agent declares.
+
+    - inline: in the calling thread (no timeout can be enforced)
+    - thread: on its own daemon thread; past the timeout an error result is
+      returned and the thread's eventual result is discarded
+    - process: in a ProcessWorkerPool worker, created on first use
+
+    policy(agent_type, task_input) gives the class and the agent's own
+    timeout for the task (see agent_execution), which takes precedence over
+    default_timeout.
+    """
+
+    def __init__(
+        self,
+        run_task: TaskRunner,
+        policy: ExecutionPolicy,
+        pool_factory: Callable[[], ProcessWorkerPool],
+        default_timeout: Optional[float] = None,
+    ) -> None:
+        self._run_inline = run_task
+        self.policy = policy
+        self.pool_factory = pool_factory
+        self.default_timeout = default_timeout
+        self._pool: Optional[ProcessWorkerPool] = None
+        self._lock = threading.Lock()
+
+    def _process_pool(self) -> ProcessWorkerPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self.pool_factory()
+            return self._pool
+
+    def _run_thread(self, task: Task, timeout: Optional[float]) -> Dict[str, Any]:
+        outcome: Dict[str, Any] = {}
+
+        def target() -> None:
+            try:
+                outcome["result"] = self._run_inline(task)
+            except Exception as exc:
+                outcome["result"] = _error_result(task, f"{type(exc).__name__}: {exc}")
+
+        thread = threading.Thread(target=target, name=f"task-{task.id}", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            return _error_result(task, f"timed out after {timeout:g}s")
+        return outcome["result"]
+
+    def run_task(self, task: Task) -> Dict[str, Any]:
+        execution, timeout = self.policy(task.agent_type, task.input or {})
+        if timeout is None:
+            timeout = self.default_timeout
+        if execution not in EXECUTION_CLASSES:
+            return _error_result(task, f"unknown execution class: {execution}")
+        if execution == "process":
+            return self._process_pool().run_task(task, timeout)
+        if execution == "thread":
+            return self._run_thread(task, timeout)
+        return self._run_inline(task)
+
+    def release_result(self, result: Any) -> None:
+        """Free the payloads of a consumed result (see ProcessWorkerPool.release_result)."""
+        with self._lock:
+            pool = self._pool
+        if pool is not None:
+            pool.release_result(result)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
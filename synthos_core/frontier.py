@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_MIN_REVISIT_SECONDS = 3600.0
+DEFAULT_MAX_REVISIT_SECONDS = 30 * 86400.0
+# Rewrite the journal once it holds this many lines per known URL
+COMPACT_RATIO = 4
+
+
+class _PageState:
+    __slots__ = ("depth", "last_fetch", "interval", "digest")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.last_fetch: Optional[float] = None
+        self.interval: Optional[float] = None
+        self.digest: Optional[str] = None
+
+    def due(self) -> float:
+        if self.last_fetch is None:
+            return 0.0
+        return self.last_fetch + (self.interval or 0.0)
+
+
+class CrawlFrontier:
+    """
+    Persistent crawl frontier: pending URLs, visited pages and revisit times.
+
+    Every change is appended to an NDJSON journal, so a crawl interrupted
+    mid-way resumes from the same frontier: pages popped but never completed
+    are simply due again. Unfetched URLs come first, shallowest depth first;
+    fetched pages are revisited on a per-page interval that halves when the
+    page changed since the last fetch and doubles when it did not, bounded by
+    min_revisit / max_revisit.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        min_revisit: float = DEFAULT_MIN_REVISIT_SECONDS,
+        max_revisit: float = DEFAULT_MAX_REVISIT_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.min_revisit = min_revisit
+        self.max_revisit = max_revisit
+        self._pages: Dict[str, _PageState] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._lines = 0
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self._replay()
+        for url, state in self._pages.items():
+            self._heap.append((state.due(), state.depth, url))
+        heapq.heapify(self._heap)
+
+    def _replay(self) -> None:
+        with self.path.open("r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted write
+                    continue
+                self._lines += 1
+                url = event["u"]
+                state = self._pages.get(url)
+                if state is None:
+                    state = self._pages[url] = _PageState(event.get("d", 0))
+                if "t" in event:
+                    state.last_fetch = event["t"]
+                    state.interval = event.get("i")
+                    state.digest = event.get("h")
+
+    def _append(self, event: Dict[str, object]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._lines += 1
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._pages
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """Queue url if it has never been seen; returns whether it was new."""
+        with self._lock:
+            if url in self._pages:
+                return False
+            self._pages[url] = _PageState(depth)
+            heapq.heappush(self._heap, (0.0, depth, url))
+            self._append({"u": url, "d": depth})
+            return True
+
+    def pop(self, now: Optional[float] = None) -> Optional[Tuple[str, int]]:
+        """Return (url, depth) of the next page due for fetching, or None if nothing is due yet."""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap:
+                due, depth, url = self._heap[0]
+                state = self._pages[url]
+                if due != state.due():
+                    # Superseded by a later reschedule
+                    heapq.heappop(self._heap)
+                    continue
+                if due > now:
+                    return None
+                heapq.heappop(self._heap)
+                return url, depth
+            return None
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return min((due for due, _, url in self._heap if due == self._pages[url].due()), default=None)
+
+    def complete(self, url: str, digest: Optional[str], now: Optional[float] = None) -> None:
+        """Record a fetch of url with the digest of its content and schedule its revisit."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._pages.get(url)
+            if state is None:
+                state = self._pages[url] = _PageState(0)
+            if state.interval is None:
+                interval = self.min_revisit
+            elif digest != state.digest:
+                interval = state.interval / 2
+            else:
+                interval = state.interval * 2
+            state.interval = max(self.min_revisit, min(self.max_revisit, interval))
+            state.last_fetch = now
+            state.digest = digest
+            heapq.heappush(self._heap, (state.due(), state.depth, url))
+            self._append({"u": url, "t": now, "i": state.interval, "h": digest})
+            if self._lines > COMPACT_RATIO * len(self._pages):
+                self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w") as f:
+            for url, state in self._pages.items():
+                event: Dict[str, object] = {"u": url, "d": state.depth}
+                if state.last_fetch is not None:
+                    event.update({"t": state.last_fetch, "i": state.interval, "h": state.digest})
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._lines = len(self._pages)
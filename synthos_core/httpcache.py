@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .httpclient import HTTPClient, get_client
+
+
+DEFAULT_CACHE_DIR = ".data/http_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def _age(headers: Any) -> float:
+    # Seconds the response already spent in upstream caches
+    try:
+        return max(0.0, float(headers.get("Age") or 0))
+    except ValueError:
+        return 0.0
+
+
+def _freshness_lifetime(headers: Any, now: float) -> float:
+    # Seconds from now the response stays fresh
+    cc = _parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in cc:
+        return 0.0
+    if cc.get("max-age"):
+        try:
+            return max(0.0, float(cc["max-age"]) - _age(headers))
+        except ValueError:
+            return 0.0
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0.0
+    # No explicit freshness: always revalidate
+    return 0.0
+
+
+class HTTPCache:
+    """
+    Persistent HTTP cache for small, repeatedly fetched pages (e.g. index pages).
+
+    - fresh entries (Cache-Control max-age less the response's Age, or
+      Expires) are served without a request
+    - stale entries are revalidated with If-None-Match / If-Modified-Since; a 304
+      refreshes the entry and serves the cached body, while a 5xx or a
+      connection failure serves the stale body rather than fail
+    - responses marked no-store are never written
+    - total body size is capped at max_bytes; least recently used entries go first
+    - offline=True serves only from cache (stale entries included) and raises
+      CacheMiss otherwise
+
+    Each entry is a <sha256(url)>.body / .meta pair written atomically, so
+    several processes can share one cache directory.
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        offline: bool = False,
+        client: Optional[HTTPClient] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.client = client
+        self._lock = threading.Lock()
+        self._size_estimate: Optional[int] = None
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / f"{key}.meta", self.root / f"{key}.body"
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not body_path.exists():
+            return None
+        return meta
+
+    def _read_body(self, url: str) -> bytes:
+        meta_path, body_path = self._paths(url)
+        # The .meta mtime doubles as the LRU access time
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return body_path.read_bytes()
+
+    def _store(self, url: str, headers: Any, body: Optional[bytes], now: float) -> None:
+        meta_path, body_path = self._paths(url)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            tmp_body = body_path.with_suffix(f".body.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_body.write_bytes(body)
+            os.replace(tmp_body, body_path)
+            size = len(body)
+        else:
+            size = body_path.stat().st_size
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": now,
+            "fresh_for": _freshness_lifetime(headers, now),
+            "size": size,
+        }
+        tmp_meta = meta_path.with_suffix(f".meta.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, meta_path)
+        if body is not None:
+            self._account(size)
+
+    def _account(self, added: int) -> None:
+        with self._lock:
+            if self._size_estimate is None:
+                self._size_estimate = self._scan_size()
+            else:
+                self._size_estimate += added
+            if self._size_estimate > self.max_bytes:
+                self._size_estimate = self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*.body") if p.is_file())
+
+    def _evict(self) -> int:
+        entries = []
+        total = 0
+        for meta_path in self.root.glob("*.meta"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                size = body_path.stat().st_size
+                entries.append((meta_path.stat().st_mtime, meta_path, body_path, size))
+                total += size
+            except OSError:
+                continue
+        entries.sort()
+        for _, meta_path, body_path, size in entries:
+            if total <= self.max_bytes:
+                break
+            for p in (meta_path, body_path):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            total -= size
+        return total
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> bytes:
+        now = time.time()
+        meta = self._load(url)
+        if meta is not None and (self.offline or now < meta["stored_at"] + meta["fresh_for"]):
+            try:
+                return self._read_body(url)
+            except OSError:
+                # Evicted by another process since _load
+                meta = None
+        if self.offline:
+            raise CacheMiss(url)
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+        client = self.client or get_client()
+        try:
+            resp = client.get(url, headers=request_headers)
+        except (OSError, http.client.HTTPException):
+            # Serve stale content rather than fail when the origin is unreachable
+            if meta is not None:
+                return self._read_body(url)
+            raise
+        with resp:
+            if resp.status >= 500 and meta is not None:
+                # Likewise when it is failing
+                return self._read_body(url)
+            if resp.status == 304 and meta is not None:
+                resp.read()
+                self._store(url, _merge_headers(meta, resp.headers), None, now)
+                return self._read_body(url)
+            resp.raise_for_status()
+            body = resp.read()
+            if "no-store" not in _parse_cache_control(resp.headers.get("Cache-Control")):
+                self._store(url, resp.headers, body, now)
+            return body
+
+
+def _merge_headers(meta: Dict[str, Any], headers: Any) -> Dict[str, Optional[str]]:
+    # A 304 may omit validators it did not change; keep the cached ones
+    return {
+        "ETag": headers.get("ETag") or meta.get("etag"),
+        "Last-Modified": headers.get("Last-Modified") or meta.get("last_modified"),
+        "Cache-Control": headers.get("Cache-Control"),
+        "Expires": headers.get("Expires"),
+        "Age": headers.get("Age"),
+    }
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import http.client
+import queue
+import threading
+import time
+import urllib.parse
+import urllib.request
+import weakref
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT_SECONDS = 15.0
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+# How often a request waiting for a free connection checks for abandoned responses
+RECLAIM_INTERVAL_SECONDS = 0.05
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Failures that mean a reused keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+HostKey = Tuple[str, str, int]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, reason: str, url: str) -> None:
+        super().__init__(f"HTTP {status} {reason}: {url}")
+        self.status = status
+        self.reason = reason
+        self.url = url
+
+
+class _HostPool:
+    """
+    Idle keep-alive connections for one (scheme, host, port), capped at
+    max_size in use. A request waits at most timeout seconds for a free
+    connection, then fails with TimeoutError.
+    """
+
+    def __init__(self, key: HostKey, max_size: int, timeout: float) -> None:
+        self.key = key
+        self.timeout = timeout
+        # Resolved once per host: getproxies() consults system settings on macOS
+        self.proxy = _proxy_for(key[0], key[1])
+        self.idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_size)
+        # Connections of responses garbage-collected before being closed; SimpleQueue.put is
+        # safe from finalizers, which may run while this thread holds the semaphore's lock
+        self.abandoned: "queue.SimpleQueue[http.client.HTTPConnection]" = queue.SimpleQueue()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        scheme, host, port = self.key
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if self.proxy is None:
+            return conn_cls(host, port, timeout=self.timeout)
+        proxy_url = urllib.parse.urlsplit(self.proxy)
+        proxy_port = proxy_url.port or (443 if proxy_url.scheme == "https" else 80)
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(proxy_url.hostname, proxy_port, timeout=self.timeout)
+            conn.set_tunnel(host, port)
+            return conn
+        return http.client.HTTPConnection(proxy_url.hostname, proxy_port, timeout=self.timeout)
+
+    def _reclaim(self) -> None:
+        while True:
+            try:
+                conn = self.abandoned.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            self.slots.release()
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        deadline = time.monotonic() + self.timeout
+        self._reclaim()
+        while not self.slots.acquire(timeout=RECLAIM_INTERVAL_SECONDS):
+            self._reclaim()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"no free connection to {self.key[1]}:{self.key[2]} after {self.timeout:g}s")
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        try:
+            return self._connect(), False
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            self.idle.put(conn)
+        else:
+            conn.close()
+        self.slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _proxy_for(scheme: str, host: str) -> Optional[str]:
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return proxy
+
+
+class HTTPResponse:
+    """
+    Response whose body is streamed from the socket.
+
+    The connection goes back to its host pool once the body has been fully
+    read; closing a partially read response discards the connection instead,
+    as does dropping an unclosed one (its pool slot is reclaimed by the next
+    request). gzip and deflate bodies are decoded transparently.
+    """
+
+    def __init__(self, url: str, raw: http.client.HTTPResponse, conn: http.client.HTTPConnection, pool: _HostPool) -> None:
+        self.url = url
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        self._raw = raw
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._pool = pool
+        self._complete = False
+        self._finalizer = weakref.finalize(self, pool.abandoned.put, conn)
+        encoding = (raw.headers.get("Content-Encoding") or "").lower()
+        if encoding in ("gzip", "x-gzip"):
+            self._decoder: Optional[Any] = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decoder = zlib.decompressobj()
+        else:
+            self._decoder = None
+
+    def __enter__(self) -> "HTTPResponse":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            self.close()
+            raise HTTPError(self.status, self.reason, self.url)
+
+    def iter_content(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = self._raw.read1(chunk_size)
+                if not chunk:
+                    self._complete = True
+                    break
+                if self._decoder is not None:
+                    chunk = self._decoder.decompress(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+            if self._decoder is not None:
+                tail = self._decoder.flush()
+                if tail:
+                    yield tail
+        finally:
+            self.close()
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_content())
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._finalizer.detach()
+        # Only a fully drained body leaves the connection positioned at the next response
+        reusable = self._complete and not self._raw.will_close
+        self._raw.close()
+        self._pool.release(conn, reusable)
+
+
+class HTTPClient:
+    """
+    Thread-safe HTTP/1.1 client with keep-alive connection pools per host.
+
+    Agents share one instance via get_client(), so repeated requests to the
+    same host reuse open TCP/TLS connections instead of handshaking each time.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+        self._pools: Dict[HostKey, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: HostKey) -> _HostPool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(key, self.pool_size, self.timeout)
+            return pool
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+    ) -> HTTPResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._send(method, url, {**self.headers, **(headers or {})}, body)
+            location = resp.headers.get("Location")
+            if resp.status not in _REDIRECT_STATUSES or not location:
+                return resp
+            resp.read()
+            url = urllib.parse.urljoin(url, location)
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+        raise HTTPError(resp.status, "too many redirects", url)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+        return self.request("GET", url, headers=headers)
+
+    def _send(self, method: str, url: str, headers: Dict[str, str], body: Optional[bytes]) -> HTTPResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        pool = self._pool((scheme, parts.hostname or "", port))
+        if scheme == "http" and pool.proxy is not None:
+            target = url
+        else:
+            target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        while True:
+            conn, reused = pool.acquire()
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                raw = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                pool.release(conn, reusable=False)
+                if reused and method in ("GET", "HEAD"):
+                    # The server dropped an idle keep-alive connection; retry on a fresh one
+                    continue
+                raise
+            except (OSError, http.client.HTTPException):
+                pool.release(conn, reusable=False)
+                raise
+            return HTTPResponse(url, raw, conn, pool)
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+_default_client: Optional[HTTPClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """Return the process-wide shared client, creating it on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
+
+
+def configure(pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> HTTPClient:
+    """Replace the shared client with one using the given pool size and timeout."""
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = HTTPClient(pool_size=pool_size, timeout=timeout)
+        return _default_client
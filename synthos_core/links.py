@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import codecs
+import html.parser
+import urllib.parse
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+
+
+LinkFilter = Callable[[str], bool]
+
+# Start tags that can carry an href
+_LINK_TAGS = frozenset(("a", "area", "base", "link"))
+
+
+def same_origin(url: str) -> LinkFilter:
+    origin = urllib.parse.urlsplit(url)[:2]
+
+    def accept(link: str) -> bool:
+        return urllib.parse.urlsplit(link)[:2] == origin
+
+    return accept
+
+
+def under_prefix(prefix: str) -> LinkFilter:
+    return lambda link: link.startswith(prefix)
+
+
+def with_extension(extensions: Iterable[str]) -> LinkFilter:
+    suffixes = tuple(e.lower() for e in extensions)
+
+    def accept(link: str) -> bool:
+        return urllib.parse.urlsplit(link).path.lower().endswith(suffixes)
+
+    return accept
+
+
+def all_of(*filters: LinkFilter) -> LinkFilter:
+    return lambda link: all(f(link) for f in filters)
+
+
+class LinkExtractor(html.parser.HTMLParser):
+    """
+    Incremental href extractor fed with raw byte chunks as they arrive.
+
+    Resolves links against <base href> when the page declares one, drops
+    duplicates before resolving them, and applies an optional filter, so
+    only the accepted absolute URLs are ever materialized. Call
+    feed_bytes() per chunk and drain() to collect links found so far.
+    """
+
+    def __init__(self, base_url: str, accept: Optional[LinkFilter] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.accept = accept
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._base_seen = False
+        self._seen_hrefs: Set[str] = set()
+        self._seen_links: Set[str] = set()
+        self._found: List[str] = []
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        self.feed(self._decoder.decode(chunk))
+
+    def close(self) -> None:
+        self.feed(self._decoder.decode(b"", final=True))
+        super().close()
+
+    def drain(self) -> List[str]:
+        found, self._found = self._found, []
+        return found
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag not in _LINK_TAGS:
+            return
+        for name, value in attrs:
+            if name != "href" or not value:
+                continue
+            if tag == "base":
+                # Only the first <base> counts, and only for links after it
+                if not self._base_seen:
+                    self._base_seen = True
+                    self.base_url = urllib.parse.urljoin(self.base_url, value.strip())
+                continue
+            href = value.strip()
+            if href in self._seen_hrefs:
+                continue
+            self._seen_hrefs.add(href)
+            link = urllib.parse.urljoin(self.base_url, href)
+            if link in self._seen_links:
+                continue
+            self._seen_links.add(link)
+            if self.accept is None or self.accept(link):
+                self._found.append(link)
+
+
+def iter_links(chunks: Iterable[bytes], base_url: str, accept: Optional[LinkFilter] = None) -> Iterator[str]:
+    """Yield unique, resolved, accepted links from an HTML byte stream."""
+    parser = LinkExtractor(base_url, accept)
+    for chunk in chunks:
+        parser.feed_bytes(chunk)
+        yield from parser.drain()
+    parser.close()
+    yield from parser.drain()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_DB_PATH = ".data/memory.sqlite3"
+# Buffered rows are written in one transaction once this many are pending...
+BATCH_SIZE = 500
+# ...or once the oldest pending row is this old
+FLUSH_INTERVAL_SECONDS = 1.0
+BUSY_TIMEOUT_MS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    agent TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    tags TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_agent ON memories(agent, created_at);
+CREATE INDEX IF NOT EXISTS idx_memories_key ON memories(key, created_at);
+CREATE INDEX IF NOT EXISTS idx_memories_tags ON memories(tags, created_at);
+CREATE TABLE IF NOT EXISTS downloads (
+    id INTEGER PRIMARY KEY,
+    agent TEXT NOT NULL,
+    url TEXT NOT NULL,
+    category TEXT,
+    filename TEXT,
+    path TEXT,
+    created_at REAL NOT NULL,
+    size INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_agent ON downloads(agent, created_at);
+CREATE INDEX IF NOT EXISTS idx_downloads_url ON downloads(url);
+CREATE INDEX IF NOT EXISTS idx_downloads_category ON downloads(category, created_at);
+"""
+
+_INSERT_MEMORY = "INSERT INTO memories (agent, key, value, tags, created_at) VALUES (?, ?, ?, ?, ?)"
+_INSERT_DOWNLOAD = (
+    "INSERT INTO downloads (agent, url, category, filename, path, created_at, size, etag, last_modified, sha256)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Columns added to downloads after its first release, created on open if missing
+_DOWNLOAD_COLUMNS = {"size": "INTEGER", "etag": "TEXT", "last_modified": "TEXT", "sha256": "TEXT"}
+_DOWNLOAD_FIELDS = ("category", "filename", "path", "created_at", "size", "etag", "last_modified", "sha256")
+# table -> (insert statement, columns of its buffered rows)
+_BUFFERED = {
+    "memories": (_INSERT_MEMORY, ("agent", "key", "value", "tags", "created_at")),
+    "downloads": (_INSERT_DOWNLOAD, ("agent", "url") + _DOWNLOAD_FIELDS),
+}
+
+
+class _WriteBuffer:
+    # Kept apart from AgentMemory so the exit-time flush does not keep the store alive
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.rows: Dict[str, List[Tuple[Any, ...]]] = {_INSERT_MEMORY: [], _INSERT_DOWNLOAD: []}
+        self.pending = 0
+        self.oldest: Optional[float] = None
+        self.timer: Optional[threading.Timer] = None
+        self.closed = False
+
+    def add(self, sql: str, rows: Iterable[Tuple[Any, ...]]) -> None:
+        with self.lock:
+            before = len(self.rows[sql])
+            self.rows[sql].extend(rows)
+            self.pending += len(self.rows[sql]) - before
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            if self.pending >= BATCH_SIZE or time.monotonic() - self.oldest >= FLUSH_INTERVAL_SECONDS:
+                self._flush_locked()
+            elif self.timer is None and self.pending:
+                # Bound the delay even if no further write comes along to trigger the flush
+                self.timer = threading.Timer(FLUSH_INTERVAL_SECONDS, self._timed_flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _timed_flush(self) -> None:
+        with self.lock:
+            self.timer = None
+            if not self.closed:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush_locked()
+
+    def pending_rows(self, table: str) -> List[Dict[str, Any]]:
+        # Caller holds the lock; oldest first, as they will be inserted
+        sql, columns = _BUFFERED[table]
+        return [{"id": None, **dict(zip(columns, row))} for row in self.rows[sql]]
+
+    def _flush_locked(self) -> None:
+        if not self.pending:
+            return
+        with self.conn:
+            for sql, rows in self.rows.items():
+                if rows:
+                    self.conn.executemany(sql, rows)
+        for rows in self.rows.values():
+            rows.clear()
+        self.pending = 0
+        self.oldest = None
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self._flush_locked()
+            finally:
+                self.closed = True
+                self.conn.close()
+
+
+class AgentMemory:
+    """
+    SQLite-backed store of agent memories and download records.
+
+    The database runs in WAL mode so concurrent agents (threads or processes)
+    can read while one writes. remember() and record_download() buffer rows
+    and write them in a single transaction per batch, committed once
+    BATCH_SIZE rows are pending or at most FLUSH_INTERVAL_SECONDS after the
+    first of them; call flush() to force pending rows out, close() when
+    done. Queries see this instance's pending rows (with id None) without
+    flushing them, so reads do not break up batches. Both tables are indexed on the columns queries filter by, and
+    inserts are appends, so write cost stays flat as history grows.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(downloads)")}
+        with conn:
+            for column, kind in _DOWNLOAD_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE downloads ADD COLUMN {column} {kind}")
+        conn.row_factory = sqlite3.Row
+        self._conn = conn
+        self._buffer = _WriteBuffer(conn)
+        self._finalizer = weakref.finalize(self, self._buffer.close)
+
+    def remember(self, agent: str, key: str, value: Any = None, tags: Optional[str] = None) -> None:
+        self._buffer.add(_INSERT_MEMORY, [(agent, key, value, tags, time.time())])
+
+    def remember_many(self, agent: str, items: Iterable[Tuple[str, Any, Optional[str]]]) -> None:
+        """Bulk remember of (key, value, tags) tuples."""
+        now = time.time()
+        self._buffer.add(_INSERT_MEMORY, [(agent, k, v, t, now) for k, v, t in items])
+
+    def record_download(
+        self,
+        agent: str,
+        url: str,
+        category: Optional[str] = None,
+        filename: Optional[str] = None,
+        path: Optional[str] = None,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        sha256: Optional[str] = None,
+    ) -> None:
+        row = (agent, url, category, filename, path, time.time(), size, etag, last_modified, sha256)
+        self._buffer.add(_INSERT_DOWNLOAD, [row])
+
+    def record_downloads(self, agent: str, items: Iterable[Dict[str, Any]]) -> None:
+        """Bulk record_download of dicts with url and any of the other downloads columns."""
+        now = time.time()
+        rows = [(agent, d["url"]) + tuple(d.get(f, now if f == "created_at" else None) for f in _DOWNLOAD_FIELDS) for d in items]
+        self._buffer.add(_INSERT_DOWNLOAD, rows)
+
+    def recall(
+        self,
+        agent: Optional[str] = None,
+        key: Optional[str] = None,
+        tags: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Memories matching every given filter, newest first."""
+        return self._query("memories", {"agent": agent, "key": key, "tags": tags}, None, limit)
+
+    def downloads(
+        self,
+        category: Optional[str] = None,
+        since: Optional[float] = None,
+        agent: Optional[str] = None,
+        url: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Download records matching every given filter (since = unix time), newest first."""
+        return self._query("downloads", {"category": category, "agent": agent, "url": url}, since, limit)
+
+    def _query(self, table: str, equals: Dict[str, Any], since: Optional[float], limit: Optional[int]) -> List[Dict[str, Any]]:
+        clauses = [f"{col} = ?" for col, val in equals.items() if val is not None]
+        params: List[Any] = [val for val in equals.values() if val is not None]
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._buffer.lock:
+            pending = [
+                row
+                for row in self._buffer.pending_rows(table)
+                if all(val is None or row[col] == val for col, val in equals.items())
+                and (since is None or row["created_at"] >= since)
+            ]
+            rows = [dict(row) for row in self._conn.execute(sql, params)]
+        if not pending:
+            return rows
+        # Pending rows are newer than committed ones of the same time; the sort is stable
+        rows = pending[::-1] + rows
+        rows.sort(key=lambda row: row["created_at"], reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+    def flush(self) -> None:
+        self._buffer.flush()
+
+    def close(self) -> None:
+        self._finalizer()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .registry import AgentRegistry
+
+
+@dataclass
+class Task:
+    id: str
+    agent_type: str
+    input: Dict[str, Any] = field(default_factory=dict)
+    # Agent instance name; defaults to agent_type
+    name: Optional[str] = None
+    config: Optional[Dict[str, Any]] = None
+
+
+def _error_result(task: Task, message: str) -> Dict[str, Any]:
+    return {"task_id": task.id, "agent_type": task.agent_type, "error": message}
+
+
+class Orchestrator:
+    """
+    Runs tasks in the calling thread against the agents of a registry.
+
+    run_task() never raises: it returns {"task_id", "agent_type", "result"}
+    with the agent's output, or {"task_id", "agent_type", "error"} when the
+    agent type is unknown or the agent raised. Agents from shared factories
+    are handed back to their owner (AgentRegistry.release) for reuse; any
+    other agent is closed after its task.
+    Concurrency, caching and process isolation wrap run_task (see
+    scheduler, resultcache and execution).
+    """
+
+    def __init__(self, registry: AgentRegistry) -> None:
+        self.registry = registry
+        self._closed = False
+
+    def run_task(self, task: Task) -> Dict[str, Any]:
+        if self._closed:
+            return _error_result(task, "orchestrator is shut down")
+        try:
+            agent = self.registry.create(task.agent_type, task.name or task.agent_type, task.config)
+        except KeyError:
+            return _error_result(task, f"unknown agent_type: {task.agent_type}")
+        except Exception as exc:
+            return _error_result(task, f"{type(exc).__name__}: {exc}")
+        try:
+            output = agent.run(task.input or {})
+        except Exception as exc:
+            return _error_result(task, f"{type(exc).__name__}: {exc}")
+        finally:
+            if self.registry.is_shared(task.agent_type):
+                self.registry.release(task.agent_type, agent)
+            else:
+                agent.close()
+        return {"task_id": task.id, "agent_type": task.agent_type, "result": output}
+
+    def run_tasks(self, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """Run tasks one after another, results in input order."""
+        return [self.run_task(task) for task in tasks]
+
+    def shutdown(self) -> None:
+        """Refuse further tasks; shared agents are closed by whoever owns them (e.g. AgentPool)."""
+        self._closed = True
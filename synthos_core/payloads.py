@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import array
+import contextlib
+import errno
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import Any, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): concurrent allocations in different processes may overshoot max_bytes
+    fcntl = None  # type: ignore[assignment]
+
+
+# Bytes-like values at least this large travel as PayloadRef handles
+DEFAULT_INLINE_LIMIT = 64 * 1024
+# Payload bytes the arena may hold, across all processes using it; past it values stay inline
+DEFAULT_MAX_BYTES = 1 << 30
+# RAM-backed tmpfs where the platform has one
+SHM_DIR = "/dev/shm"
+# Owned arenas are named <prefix><owner pid>-<random>
+ARENA_PREFIX = "synthos-payloads-"
+
+
+def _default_root_dir() -> Optional[str]:
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by someone else
+        return True
+    return True
+
+
+def sweep_stale_arenas(parent: Optional[str] = None) -> List[str]:
+    """Remove arenas under parent whose owner process is gone (e.g. killed before close()); returns their paths."""
+    parent = parent or _default_root_dir() or tempfile.gettempdir()
+    try:
+        names = os.listdir(parent)
+    except OSError:
+        return []
+    removed: List[str] = []
+    for name in names:
+        pid = name[len(ARENA_PREFIX):].split("-", 1)[0]
+        if not name.startswith(ARENA_PREFIX) or not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+        path = os.path.join(parent, name)
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    return removed
+
+
+def iter_refs(value: Any) -> Iterator["PayloadRef"]:
+    """PayloadRefs anywhere inside value's dicts, lists and tuples."""
+    if isinstance(value, PayloadRef):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from iter_refs(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from iter_refs(v)
+
+
+class PayloadRef:
+    """
+    Handle to a binary payload held in a memory-mapped file.
+
+    Pickling sends only the path, size and item format, so a payload
+    crosses process boundaries (and is handed on to further tasks) without
+    being copied; view() maps the file on first use and returns a read-only
+    memoryview in the original format (e.g. "d" for an array of doubles).
+    """
+
+    __slots__ = ("path", "size", "format", "_map")
+
+    def __init__(self, path: str, size: int, format: str = "B") -> None:
+        self.path = path
+        self.size = size
+        self.format = format
+        self._map: Optional[mmap.mmap] = None
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (PayloadRef, (self.path, self.size, self.format))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"PayloadRef({self.path!r}, {self.size})"
+
+    def view(self) -> memoryview:
+        if self.size == 0:
+            return memoryview(b"").cast(self.format)
+        if self._map is None:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ)
+        return memoryview(self._map).cast(self.format)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class PayloadArena:
+    """
+    Directory of payload files shared by the processes of one run.
+
+    The creating process owns the arena and removes it with close(); other
+    processes attach with PayloadArena(root) and only add files. Producers
+    either allocate() a writable mapping and fill it in place, or hand
+    finished values to export(), which swaps every large bytes-like value
+    inside dicts, lists and tuples for a PayloadRef (one copy, into the
+    mapping). release() unlinks a payload nobody will open again. Views
+    already taken stay valid after release() and close() on POSIX.
+
+    The arena holds at most max_bytes of unreleased payloads, whichever
+    processes stored them: the budget is the payload files in the directory,
+    so a release() in any process frees room for all of them. Past it
+    allocate() fails with ENOSPC and export() leaves values inline. Creating
+    an owned arena first removes arenas left behind by owners that died
+    without closing theirs.
+    """
+
+    def __init__(self, root: Optional[str] = None, inline_limit: int = DEFAULT_INLINE_LIMIT, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.owner = root is None
+        if root is None:
+            parent = _default_root_dir()
+            sweep_stale_arenas(parent)
+            root = tempfile.mkdtemp(prefix=f"{ARENA_PREFIX}{os.getpid()}-", dir=parent)
+        self.root = root
+        self.inline_limit = inline_limit
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _new_path(self) -> str:
+        return os.path.join(self.root, uuid.uuid4().hex)
+
+    @property
+    def used(self) -> int:
+        """Bytes of unreleased payloads in the arena, from every process using it."""
+        total = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                try:
+                    total += entry.stat().st_size
+                except FileNotFoundError:
+                    # Released meanwhile
+                    pass
+        return total
+
+    @contextlib.contextmanager
+    def _allocating(self) -> Iterator[None]:
+        # Serialises allocations across the processes sharing the arena by locking its directory
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self.root, os.O_RDONLY)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def allocate(self, size: int, format: str = "B") -> Tuple[PayloadRef, memoryview]:
+        """Create a payload of size bytes; returns its handle and a writable view to fill."""
+        path = self._new_path()
+        with self._allocating():
+            used = self.used
+            if used + size > self.max_bytes:
+                raise OSError(errno.ENOSPC, f"payload arena full ({used} of {self.max_bytes} bytes in use)")
+            # Sized before the lock is let go, so other processes count it
+            f = open(path, "w+b")
+            try:
+                f.truncate(size)
+            except OSError:
+                f.close()
+                os.unlink(path)
+                raise
+        try:
+            with f:
+                if size == 0:
+                    return PayloadRef(path, 0, format), memoryview(bytearray()).cast(format)
+                buffer = mmap.mmap(f.fileno(), size)
+        except OSError:
+            os.unlink(path)
+            raise
+        return PayloadRef(path, size, format), memoryview(buffer).cast(format)
+
+    def store(self, data: Any) -> PayloadRef:
+        source = memoryview(data)
+        ref, target = self.allocate(source.nbytes, source.format)
+        target[:] = source
+        buffer = target.obj
+        target.release()
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        return ref
+
+    def release(self, ref: PayloadRef) -> None:
+        """Unlink a payload of this arena, whoever stored it; mappings already taken stay readable."""
+        try:
+            ref.close()
+        except BufferError:
+            # Views of it are still alive; the mapping goes with the last of them
+            pass
+        try:
+            os.unlink(ref.path)
+        except FileNotFoundError:
+            pass
+
+    def export(self, value: Any, created: Optional[List[PayloadRef]] = None) -> Any:
+        """
+        Return value with large bytes-like members replaced by PayloadRefs
+        (value itself if none are); new handles are appended to created.
+        """
+        if isinstance(value, (bytes, bytearray, memoryview, array.array)):
+            if memoryview(value).nbytes >= self.inline_limit:
+                try:
+                    ref = self.store(value)
+                except OSError:
+                    # Arena full (or tmpfs out of space): send it through the pipe instead
+                    return value
+                if created is not None:
+                    created.append(ref)
+                return ref
+            return value
+        if isinstance(value, dict):
+            items = {k: self.export(v, created) for k, v in value.items()}
+            return value if all(items[k] is value[k] for k in value) else items
+        if isinstance(value, (list, tuple)):
+            items = [self.export(v, created) for v in value]
+            if all(a is b for a, b in zip(items, value)):
+                return value
+            return type(value)(items)
+        return value
+
+    def close(self) -> None:
+        if self.owner:
+            shutil.rmtree(self.root, ignore_errors=True)
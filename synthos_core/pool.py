@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_POOL_SIZE = 32
+
+AgentFactory = Callable[..., Any]
+PoolKey = Tuple[str, Optional[str], str]
+
+
+def config_hash(config: Optional[Dict[str, Any]]) -> str:
+    payload = json.dumps(config or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _close_agent(agent: Any) -> None:
+    close = getattr(agent, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class AgentPool:
+    """
+    LRU pool of warm agent instances keyed by (agent_type, name, config hash).
+
+    wrap() turns a registry factory into one that returns a pooled instance,
+    so repeated tasks with the same agent settings reuse one agent and the
+    resources it holds. Instances are shared, not checked out: only wrap
+    factories whose agents are safe to call from several tasks at once.
+    Every instance handed out is leased until handed back with release()
+    (register the pool's factories with release=pool.release). Evicted and
+    remaining instances are closed via close() if the agent defines one,
+    once their last lease is released. Only instances without a lease
+    expire after idle_timeout, counted from their last release.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE, idle_timeout: Optional[float] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[PoolKey, Tuple[Any, float]]" = OrderedDict()
+        # id(agent) -> open leases, for every instance handed out and not yet released
+        self._leases: Dict[int, int] = {}
+        # Removed from the pool while leased; closed on their last release
+        self._retired: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, agent_type: str, factory: AgentFactory) -> AgentFactory:
+        def pooled(name: Optional[str], config: Optional[Dict[str, Any]] = None) -> Any:
+            return self.get(agent_type, name, config, factory)
+
+        return pooled
+
+    def get(self, agent_type: str, name: Optional[str], config: Optional[Dict[str, Any]], factory: AgentFactory) -> Any:
+        key = (agent_type, name, config_hash(config))
+        with self._lock:
+            now = time.monotonic()
+            expired = self._pop_expired(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries[key] = (entry[0], now)
+                self._entries.move_to_end(key)
+                agent = entry[0]
+                self._lease(agent)
+            else:
+                agent = None
+        for old in expired:
+            _close_agent(old)
+        if agent is not None:
+            return agent
+
+        # Build outside the lock; agent constructors may do I/O
+        agent = factory(name, config)
+        evicted: List[Any] = []
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # Another thread won the race; keep its instance
+                evicted.append(agent)
+                agent = existing[0]
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                self._entries[key] = (agent, time.monotonic())
+                while len(self._entries) > self.max_size:
+                    _, (old, _) = self._entries.popitem(last=False)
+                    evicted.extend(self._retire(old))
+            self._lease(agent)
+        for old in evicted:
+            _close_agent(old)
+        return agent
+
+    def release(self, agent: Any) -> None:
+        """Hand back an instance from get() once its task is done with it."""
+        with self._lock:
+            leases = self._leases.get(id(agent), 0) - 1
+            if leases > 0:
+                self._leases[id(agent)] = leases
+                return
+            self._leases.pop(id(agent), None)
+            retired = self._retired.pop(id(agent), None)
+            if retired is None:
+                # Idle from now on
+                for key, (pooled, _) in self._entries.items():
+                    if pooled is agent:
+                        self._entries[key] = (agent, time.monotonic())
+                        self._entries.move_to_end(key)
+                        break
+        if retired is not None:
+            _close_agent(retired)
+
+    def _lease(self, agent: Any) -> None:
+        self._leases[id(agent)] = self._leases.get(id(agent), 0) + 1
+
+    def _retire(self, agent: Any) -> List[Any]:
+        # Instances to close now: agent unless a task still holds it
+        if self._leases.get(id(agent)):
+            self._retired[id(agent)] = agent
+            return []
+        return [agent]
+
+    def _pop_expired(self, now: float) -> List[Any]:
+        if self.idle_timeout is None:
+            return []
+        expired: List[Any] = []
+        # Entries are kept in order of last get or release, so stale ones sit at the front
+        for key, (agent, last_used) in list(self._entries.items()):
+            if now - last_used < self.idle_timeout:
+                break
+            if self._leases.get(id(agent)):
+                # In use, so not idle
+                continue
+            del self._entries[key]
+            expired.append(agent)
+        return expired
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            agents = [agent for agent, _ in self._entries.values()]
+            self._entries.clear()
+            idle = [old for agent in agents for old in self._retire(agent)]
+        for agent in idle:
+            _close_agent(agent)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+# (name, config) -> agent instance
+AgentFactory = Callable[..., Any]
+
+
+class AgentRegistry:
+    """
+    Maps agent_type names to factories called as factory(name, config).
+
+    A factory registered with shared=True hands out instances that outlive a
+    task (e.g. AgentPool.wrap); the Orchestrator leaves closing those to
+    their owner, handing each back through release(agent) when one is given
+    (e.g. AgentPool.release), and closes every other agent once its task is
+    done.
+    """
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, AgentFactory] = {}
+        self._shared: Set[str] = set()
+        self._release: Dict[str, Callable[[Any], None]] = {}
+
+    def register(
+        self,
+        agent_type: str,
+        factory: AgentFactory,
+        shared: bool = False,
+        release: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self._factories[agent_type] = factory
+        if shared:
+            self._shared.add(agent_type)
+        else:
+            self._shared.discard(agent_type)
+        if shared and release is not None:
+            self._release[agent_type] = release
+        else:
+            self._release.pop(agent_type, None)
+
+    def types(self) -> List[str]:
+        return sorted(self._factories)
+
+    def is_shared(self, agent_type: str) -> bool:
+        return agent_type in self._shared
+
+    def release(self, agent_type: str, agent: Any) -> None:
+        """Hand a shared agent back to its owner once a task is done with it."""
+        release = self._release.get(agent_type)
+        if release is not None:
+            release(agent)
+
+    def create(self, agent_type: str, name: str, config: Optional[Dict[str, Any]] = None) -> Any:
+        factory = self._factories.get(agent_type)
+        if factory is None:
+            raise KeyError(f"unknown agent_type: {agent_type}")
+        return factory(name, config)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import array
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .orchestrator import Task
+from .payloads import PayloadRef
+
+
+DEFAULT_CACHE_DIR = ".data/result_cache"
+DEFAULT_MEMORY_ENTRIES = 256
+
+# agent_type, input -> seconds to keep the result, or None when it must not be cached
+TTLPolicy = Callable[[str, Dict[str, Any]], Optional[float]]
+
+
+def result_key(agent_type: str, task_input: Any, config: Any) -> str:
+    payload = json.dumps([agent_type, task_input, config or {}], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def agent_cache_ttl(agent_cls: type, task_input: Dict[str, Any]) -> Optional[float]:
+    """
+    TTL an agent class declares for task_input: a cache_ttl(task_input)
+    classmethod when the answer depends on the input (e.g. the action),
+    else a CACHE_TTL_SECONDS attribute. Agents declaring neither are not cached.
+    """
+    cache_ttl = getattr(agent_cls, "cache_ttl", None)
+    if callable(cache_ttl):
+        return cache_ttl(task_input)
+    return getattr(agent_cls, "CACHE_TTL_SECONDS", None)
+
+
+def _is_error(result: Dict[str, Any]) -> bool:
+    if result.get("error"):
+        return True
+    return any(isinstance(v, dict) and v.get("error") for v in result.values())
+
+
+def _has_binary(value: Any) -> bool:
+    # Bytes do not survive the JSON entry, and a PayloadRef's file is gone once its task is released
+    if isinstance(value, (bytes, bytearray, memoryview, array.array, PayloadRef)):
+        return True
+    if isinstance(value, dict):
+        return any(_has_binary(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_binary(v) for v in value)
+    return False
+
+
+class ResultCache:
+    """
+    Task result cache: an in-memory LRU in front of a directory of JSON files.
+
+    Entries are keyed by a stable hash of (agent_type, input, config) and
+    expire after the TTL the agent declared. Error results and results
+    carrying binary values (bytes or PayloadRef handles) are never stored.
+    wrap() turns a run_task callable into a caching one that tags each
+    cacheable result with "cache": "hit" or "miss" and keeps counts in
+    .hits / .misses.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MEMORY_ENTRIES) -> None:
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            try:
+                entry = json.loads(self._path(key).read_text())
+            except (OSError, ValueError):
+                return None
+            self._remember(key, entry)
+        if entry["expires_at"] < time.time():
+            with self._lock:
+                self._memory.pop(key, None)
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            return None
+        return entry["result"]
+
+    def put(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        entry = {"expires_at": time.time() + ttl, "result": result}
+        self._remember(key, entry)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry, default=str))
+            os.replace(tmp, path)
+        except OSError:
+            # The memory layer still serves it for this process
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def wrap(self, run_task: Callable[[Task], Dict[str, Any]], ttl_for: TTLPolicy) -> Callable[[Task], Dict[str, Any]]:
+        def cached_run(task: Task) -> Dict[str, Any]:
+            ttl = ttl_for(task.agent_type, task.input or {})
+            if not ttl or ttl <= 0:
+                return run_task(task)
+            key = result_key(task.agent_type, task.input, task.config)
+            result = self.get(key)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return {**result, "task_id": task.id, "cache": "hit"}
+            with self._lock:
+                self.misses += 1
+            result = run_task(task)
+            if isinstance(result, dict) and not _is_error(result) and not _has_binary(result):
+                self.put(key, result, ttl)
+            return {**result, "cache": "miss"} if isinstance(result, dict) else result
+
+        return cached_run
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TypeVar
+
+from .orchestrator import Task
+
+
+DEFAULT_MAX_WORKERS = 4
+# Tasks buffered ahead of the workers in run_stream, per worker
+STREAM_BACKLOG_PER_WORKER = 4
+
+T = TypeVar("T")
+
+
+def _error_result(task: Task, message: str) -> Dict[str, Any]:
+    return {"task_id": task.id, "agent_type": task.agent_type, "error": message}
+
+
+class TaskScheduler:
+    """
+    Runs tasks concurrently on a thread pool while honoring dependencies.
+
+    - depends_on holds, per task and in input order, the ids it must wait for
+    - max_workers caps the number of tasks in flight overall
+    - per_agent_limit caps the number of in-flight tasks of one agent_type
+    - results are returned in input order, regardless of completion order
+
+    A task whose dependency raised is not run; it gets an error result instead.
+    run_stream() is the bounded-memory variant for unbounded inputs: it pulls
+    tasks lazily and yields results in completion order (no depends_on).
+    """
+
+    def __init__(
+        self,
+        run_task: Callable[[Task], Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_agent_limit: Optional[int] = None,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if per_agent_limit is not None and per_agent_limit < 1:
+            raise ValueError("per_agent_limit must be >= 1")
+        self.run_task = run_task
+        self.max_workers = max_workers
+        self.per_agent_limit = per_agent_limit
+
+    def run(self, tasks: Sequence[Task], depends_on: Optional[Sequence[Sequence[str]]] = None) -> List[Dict[str, Any]]:
+        if depends_on is None:
+            depends_on = [[] for _ in tasks]
+        if len(depends_on) != len(tasks):
+            raise ValueError("depends_on must have one entry per task")
+        index_by_id = self._index_ids(tasks, depends_on)
+
+        # pending[i] = number of unfinished dependencies; dependents[i] = tasks waiting on i
+        pending: List[int] = [0] * len(tasks)
+        dependents: List[List[int]] = [[] for _ in tasks]
+        for i in range(len(tasks)):
+            for dep_id in depends_on[i]:
+                dep = index_by_id[dep_id]
+                pending[i] += 1
+                dependents[dep].append(i)
+        self._check_acyclic(tasks, pending, dependents)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        failed: Set[int] = set()
+        ready: Deque[int] = deque(i for i in range(len(tasks)) if pending[i] == 0)
+        running: Dict[str, int] = {}
+        in_flight: Dict[Future, int] = {}
+
+        def finish(i: int) -> None:
+            # Worklist rather than recursion: a failure can cascade down arbitrarily long chains
+            finished = [i]
+            while finished:
+                done_i = finished.pop()
+                for child in dependents[done_i]:
+                    if done_i in failed and child not in failed:
+                        failed.add(child)
+                        dep_id = tasks[done_i].id
+                        results[child] = _error_result(tasks[child], f"dependency failed: {dep_id}")
+                    pending[child] -= 1
+                    if pending[child] == 0:
+                        if child in failed:
+                            finished.append(child)
+                        else:
+                            ready.append(child)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while ready or in_flight:
+                for i in self._take_startable(ready, running, len(in_flight), lambda i: tasks[i].agent_type):
+                    in_flight[pool.submit(self.run_task, tasks[i])] = i
+                if not in_flight:
+                    break
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i = in_flight.pop(fut)
+                    running[tasks[i].agent_type] -= 1
+                    exc = fut.exception()
+                    if exc is not None:
+                        failed.add(i)
+                        results[i] = _error_result(tasks[i], str(exc))
+                    else:
+                        results[i] = fut.result()
+                    finish(i)
+
+        return [r if r is not None else _error_result(tasks[i], "not run") for i, r in enumerate(results)]
+
+    def run_stream(self, tasks: Iterable[Task], backlog: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        backlog = backlog or self.max_workers * STREAM_BACKLOG_PER_WORKER
+        # One queue carries both new tasks (from the reader thread) and finished futures,
+        # so a slow producer never delays results and a slow worker never stalls reading.
+        events: "queue.Queue[tuple]" = queue.Queue()
+        room = threading.Semaphore(backlog)
+
+        def feed() -> None:
+            try:
+                for task in tasks:
+                    room.acquire()
+                    events.put(("task", task))
+            except BaseException as exc:
+                events.put(("error", exc))
+            else:
+                events.put(("eof", None))
+
+        threading.Thread(target=feed, name="synthos-task-reader", daemon=True).start()
+        exhausted = False
+        ready: Deque[Task] = deque()
+        running: Dict[str, int] = {}
+        in_flight: Dict[Future, Task] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not (exhausted and not ready and not in_flight):
+                kind, payload = events.get()
+                if kind == "task":
+                    ready.append(payload)
+                elif kind == "done":
+                    task = in_flight.pop(payload)
+                    running[task.agent_type] -= 1
+                    exc = payload.exception()
+                    yield _error_result(task, str(exc)) if exc is not None else payload.result()
+                elif kind == "eof":
+                    exhausted = True
+                else:
+                    raise payload
+                for task in self._take_startable(ready, running, len(in_flight), lambda t: t.agent_type):
+                    room.release()
+                    fut = pool.submit(self.run_task, task)
+                    in_flight[fut] = task
+                    fut.add_done_callback(lambda f: events.put(("done", f)))
+
+    def _take_startable(self, ready: Deque[T], running: Dict[str, int], in_flight: int, agent_type_of: Callable[[T], str]) -> List[T]:
+        # Skip over tasks whose agent_type is saturated so one busy agent does not block the rest
+        started: List[T] = []
+        skipped: List[T] = []
+        slots = self.max_workers - in_flight
+        while ready and len(started) < slots:
+            item = ready.popleft()
+            agent_type = agent_type_of(item)
+            if self.per_agent_limit is not None and running.get(agent_type, 0) >= self.per_agent_limit:
+                skipped.append(item)
+                continue
+            running[agent_type] = running.get(agent_type, 0) + 1
+            started.append(item)
+        ready.extendleft(reversed(skipped))
+        return started
+
+    @staticmethod
+    def _index_ids(tasks: Sequence[Task], depends_on: Sequence[Sequence[str]]) -> Dict[str, int]:
+        index_by_id: Dict[str, int] = {}
+        duplicates: Set[str] = set()
+        for i, task in enumerate(tasks):
+            if task.id in index_by_id:
+                duplicates.add(task.id)
+            index_by_id.setdefault(task.id, i)
+        for task, deps in zip(tasks, depends_on):
+            task_id = task.id
+            for dep_id in deps:
+                if dep_id not in index_by_id:
+                    raise ValueError(f"task {task_id!r} depends on unknown task {dep_id!r}")
+                if dep_id in duplicates:
+                    raise ValueError(f"task {task_id!r} depends on ambiguous task id {dep_id!r}")
+        return index_by_id
+
+    @staticmethod
+    def _check_acyclic(tasks: Sequence[Task], pending: List[int], dependents: List[List[int]]) -> None:
+        remaining = list(pending)
+        queue = deque(i for i, n in enumerate(remaining) if n == 0)
+        seen = 0
+        while queue:
+            i = queue.popleft()
+            seen += 1
+            for child in dependents[i]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    queue.append(child)
+        if seen != len(tasks):
+            cyclic = sorted({tasks[i].id for i, n in enumerate(remaining) if n > 0})
+            raise ValueError(f"dependency cycle among tasks: {', '.join(cyclic)}")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import codecs
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+
+
+class _MappedText:
+    """Sliding window of decoded text over a memory-mapped UTF-8 file."""
+
+    def __init__(self, mm: mmap.mmap) -> None:
+        self.mm = mm
+        self.read_pos = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+
+    @property
+    def eof(self) -> bool:
+        return self.read_pos >= len(self.mm)
+
+    def fill(self, min_bytes: int = CHUNK_SIZE) -> bool:
+        if self.eof:
+            return False
+        # Drop consumed text so the window only holds the element being parsed
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        end = min(len(self.mm), self.read_pos + max(CHUNK_SIZE, min_bytes))
+        self.buf += self.decoder.decode(self.mm[self.read_pos:end], final=end >= len(self.mm))
+        self.read_pos = end
+        return True
+
+    def peek(self) -> str:
+        # Next non-whitespace character, or "" at end of file
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+
+def _decode_value(text: _MappedText, decoder: json.JSONDecoder) -> Any:
+    text.peek()
+    while True:
+        try:
+            value, end = decoder.raw_decode(text.buf, text.pos)
+        except json.JSONDecodeError:
+            # Incomplete element: grow the window geometrically to keep re-parsing linear
+            if text.fill(len(text.buf) - text.pos):
+                continue
+            raise
+        # A value ending exactly at the window edge may be a truncated number or literal
+        if end == len(text.buf) and text.fill(len(text.buf) - text.pos):
+            continue
+        text.pos = end
+        return value
+
+
+def iter_json_array(path: Union[str, Path]) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    The file is memory-mapped and decoded incrementally, so only the element
+    being parsed is held in memory. A file that does not start with an array
+    is read as a sequence of JSON values (a single object, or NDJSON) and
+    yields each of them; an empty file yields nothing. Anything but
+    whitespace after the array raises JSONDecodeError.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = _MappedText(mm)
+            decoder = json.JSONDecoder()
+            first = text.peek()
+            if not first:
+                return
+            if first != "[":
+                while text.peek():
+                    yield _decode_value(text, decoder)
+                return
+            text.pos += 1
+            if text.peek() != "]":
+                while True:
+                    yield _decode_value(text, decoder)
+                    sep = text.peek()
+                    if sep == "]":
+                        break
+                    if sep != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", text.buf, text.pos)
+                    text.pos += 1
+            text.pos += 1
+            if text.peek():
+                raise json.JSONDecodeError("Extra data", text.buf, text.pos)
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Merge a shard's segments into one once it has more than this many
+MAX_SEGMENTS = 8
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# Lexicon entry: term offset and length in terms.bin, document frequency, first posting index
+_LEXICON_ENTRY = struct.Struct("<IHII")
+_LEXICON_HEADER = struct.Struct("<I")
+# Posting: document number within the segment, term frequency
+_POSTING = struct.Struct("<II")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1]
+
+
+def _map(path: Path) -> bytes:
+    # mmap refuses empty files
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_segment(directory: Path, doc_ids: List[str], lengths: List[int], postings: Dict[str, List[Tuple[int, int]]]) -> None:
+    directory.mkdir(parents=True)
+    terms = sorted(postings, key=lambda t: t.encode())
+    lexicon = bytearray(_LEXICON_HEADER.pack(len(terms)))
+    blob = bytearray()
+    index = 0
+    with open(directory / "postings.bin", "wb") as f:
+        for term in terms:
+            encoded = term.encode()
+            plist = postings[term]
+            lexicon += _LEXICON_ENTRY.pack(len(blob), len(encoded), len(plist), index)
+            blob += encoded
+            f.write(b"".join(_POSTING.pack(d, tf) for d, tf in plist))
+            index += len(plist)
+    (directory / "lexicon.bin").write_bytes(bytes(lexicon))
+    (directory / "terms.bin").write_bytes(bytes(blob))
+    (directory / "docs.json").write_text(json.dumps({"ids": doc_ids, "lengths": lengths}))
+
+
+class _Segment:
+    """Immutable, memory-mapped slice of a shard: sorted lexicon plus posting lists."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        docs = json.loads((directory / "docs.json").read_text())
+        self.doc_ids: List[str] = docs["ids"]
+        self.lengths: List[int] = docs["lengths"]
+        self._lexicon = _map(directory / "lexicon.bin")
+        self._terms = _map(directory / "terms.bin")
+        self._postings = _map(directory / "postings.bin")
+        self.term_count = _LEXICON_HEADER.unpack_from(self._lexicon)[0]
+
+    def _entry(self, i: int) -> Tuple[bytes, int, int]:
+        offset, length, df, first = _LEXICON_ENTRY.unpack_from(self._lexicon, _LEXICON_HEADER.size + i * _LEXICON_ENTRY.size)
+        return self._terms[offset:offset + length], df, first
+
+    def _read_postings(self, df: int, first: int) -> Iterator[Tuple[int, int]]:
+        return _POSTING.iter_unpack(self._postings[first * _POSTING.size:(first + df) * _POSTING.size])
+
+    def postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        key = term.encode()
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, df, first = self._entry(mid)
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return self._read_postings(df, first)
+        return iter(())
+
+    def terms(self) -> Iterator[Tuple[str, Iterator[Tuple[int, int]]]]:
+        for i in range(self.term_count):
+            term, df, first = self._entry(i)
+            yield term.decode(), self._read_postings(df, first)
+
+    def close(self) -> None:
+        for m in (self._lexicon, self._terms, self._postings):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+
+class _Shard:
+    """All segments of one language plus the manifest tying document ids to them."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.manifest_path = directory / "shard.json"
+        manifest = {"next_segment": 0, "segments": [], "docs": {}}
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text())
+        self.next_segment: int = manifest["next_segment"]
+        # doc_id -> [segment name, document number, content hash]
+        self.docs: Dict[str, list] = manifest["docs"]
+        self.segments: Dict[str, _Segment] = {name: _Segment(directory / name) for name in manifest["segments"]}
+        self.stamp = self._stamp()
+        self._refresh_stats()
+
+    def _stamp(self) -> Optional[int]:
+        try:
+            return self.manifest_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_stats(self) -> None:
+        self.live: Dict[str, Set[int]] = {name: set() for name in self.segments}
+        total = 0
+        for name, num, _ in self.docs.values():
+            self.live[name].add(num)
+            total += self.segments[name].lengths[num]
+        self.avg_length = total / len(self.docs) if self.docs else 0.0
+
+    def _save(self) -> None:
+        manifest = {"next_segment": self.next_segment, "segments": list(self.segments), "docs": self.docs}
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.manifest_path)
+        self.stamp = self._stamp()
+
+    def _new_segment_name(self) -> str:
+        self.next_segment += 1
+        return f"seg-{self.next_segment:06d}"
+
+    def apply(self, changed: Dict[str, Tuple[str, str]], removed: Iterable[str]) -> None:
+        # changed: doc_id -> (text, content hash)
+        for doc_id in removed:
+            self.docs.pop(doc_id, None)
+        if changed:
+            doc_ids: List[str] = []
+            lengths: List[int] = []
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            for doc_id, (text, digest) in changed.items():
+                tokens = tokenize(text)
+                num = len(doc_ids)
+                doc_ids.append(doc_id)
+                lengths.append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    postings.setdefault(term, []).append((num, tf))
+            name = self._new_segment_name()
+            _write_segment(self.directory / name, doc_ids, lengths, postings)
+            self.segments[name] = _Segment(self.directory / name)
+            for num, doc_id in enumerate(doc_ids):
+                self.docs[doc_id] = [name, num, changed[doc_id][1]]
+        self._refresh_stats()
+        if len(self.segments) > MAX_SEGMENTS:
+            self._merge()
+            return
+        empty = [name for name, live in self.live.items() if not live]
+        retired = {name: self.segments.pop(name) for name in empty}
+        for name in empty:
+            self.live.pop(name)
+        self._save()
+        self._retire(retired)
+
+    def _retire(self, segments: Dict[str, _Segment]) -> None:
+        # Only called once the manifest no longer references them
+        for name, segment in segments.items():
+            segment.close()
+            shutil.rmtree(self.directory / name, ignore_errors=True)
+
+    def _merge(self) -> None:
+        renumber: Dict[Tuple[str, int], int] = {}
+        doc_ids: List[str] = []
+        lengths: List[int] = []
+        for doc_id, (name, num, _) in self.docs.items():
+            renumber[(name, num)] = len(doc_ids)
+            doc_ids.append(doc_id)
+            lengths.append(self.segments[name].lengths[num])
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for name, segment in self.segments.items():
+            for term, plist in segment.terms():
+                merged = [(renumber[(name, d)], tf) for d, tf in plist if (name, d) in renumber]
+                if merged:
+                    postings.setdefault(term, []).extend(merged)
+        for plist in postings.values():
+            plist.sort()
+        merged_name = self._new_segment_name()
+        _write_segment(self.directory / merged_name, doc_ids, lengths, postings)
+        old = self.segments
+        self.segments = {merged_name: _Segment(self.directory / merged_name)}
+        for new_num, doc_id in enumerate(doc_ids):
+            self.docs[doc_id] = [merged_name, new_num, self.docs[doc_id][2]]
+        self._refresh_stats()
+        self._save()
+        self._retire(old)
+
+    def search(self, terms: List[str], limit: int) -> List[Tuple[str, float]]:
+        n = len(self.docs)
+        if not n:
+            return []
+        scores: Dict[Tuple[str, int], float] = {}
+        for term in set(terms):
+            hits = [
+                (name, d, tf)
+                for name, segment in self.segments.items()
+                for d, tf in segment.postings(term)
+                if d in self.live[name]
+            ]
+            if not hits:
+                continue
+            idf = math.log(1 + (n - len(hits) + 0.5) / (len(hits) + 0.5))
+            for name, d, tf in hits:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.segments[name].lengths[d] / (self.avg_length or 1.0))
+                key = (name, d)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+        return [(self.segments[name].doc_ids[d], score) for (name, d), score in best]
+
+    def close(self) -> None:
+        for segment in self.segments.values():
+            segment.close()
+
+
+class InvertedIndex:
+    """
+    Persistent BM25 full-text index with one shard per language.
+
+    Each shard (root/<lang>/) is a set of immutable segments: a sorted binary
+    lexicon and packed posting lists, memory-mapped and binary-searched at
+    query time, so a lookup touches only the postings of its query terms.
+    update() indexes new and changed documents (by content hash) into a fresh
+    segment and retires their old postings; segments are merged once a
+    shard has more than MAX_SEGMENTS. One writer per shard at a time.
+    """
+
+    def __init__(self, root: str = ".data/text_index") -> None:
+        self.root = Path(root)
+        self._shards: Dict[str, _Shard] = {}
+
+    def _shard(self, lang: str) -> _Shard:
+        shard = self._shards.get(lang)
+        directory = self.root / lang
+        if shard is not None and shard.stamp != shard._stamp():
+            # Another writer updated the shard
+            shard.close()
+            shard = None
+        if shard is None:
+            directory.mkdir(parents=True, exist_ok=True)
+            shard = self._shards[lang] = _Shard(directory)
+        return shard
+
+    def update(
+        self,
+        lang: str,
+        docs: Iterable[Tuple[str, str]],
+        removed: Iterable[str] = (),
+        versions: Optional[Dict[str, str]] = None,
+    ) -> int:
+        """
+        Index (doc_id, text) pairs whose content changed and drop removed ids;
+        returns the number reindexed. A document's version is versions[doc_id]
+        when given (e.g. the hash of the page it was extracted from), else a
+        hash of its text.
+        """
+        shard = self._shard(lang)
+        changed: Dict[str, Tuple[str, str]] = {}
+        for doc_id, text in docs:
+            digest = (versions or {}).get(doc_id) or hashlib.sha1(text.encode()).hexdigest()
+            current = shard.docs.get(doc_id)
+            if current is None or current[2] != digest:
+                changed[doc_id] = (text, digest)
+        removed = [d for d in removed if d in shard.docs]
+        if changed or removed:
+            shard.apply(changed, removed)
+        return len(changed)
+
+    def versions(self, lang: str) -> Dict[str, str]:
+        """doc_id -> version of every document indexed in lang."""
+        return {doc_id: entry[2] for doc_id, entry in self._shard(lang).docs.items()}
+
+    def search(self, query: str, lang: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Best-matching (doc_id, score) pairs for query in lang, highest score first."""
+        return self._shard(lang).search(tokenize(query), limit)
+
+    def close(self) -> None:
+        for shard in self._shards.values():
+            shard.close()
+        self._shards.clear()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .audiofeatures import AUDIO_EXTENSIONS, BLOCK_FRAMES, PcmReader, file_sha256, scan_library
+
+
+TARGET_SAMPLE_RATE = 44100
+TARGET_RMS_DBFS = -20.0
+# Gain is capped so the loudest sample stays below this
+PEAK_CEILING_DBFS = -1.0
+LOWPASS_TAPS = 63
+MANIFEST_NAME = ".transcode.json"
+
+
+def _db_to_amplitude(db: float) -> float:
+    return float(10.0 ** (db / 20.0))
+
+
+class _LowPass:
+    """Streaming windowed-sinc FIR, used before downsampling to keep aliases out."""
+
+    def __init__(self, cutoff: float, taps: int = LOWPASS_TAPS) -> None:
+        # cutoff as a fraction of the source Nyquist frequency
+        n = np.arange(taps) - (taps - 1) / 2.0
+        kernel = cutoff * np.sinc(cutoff * n) * np.hamming(taps)
+        self.kernel = (kernel / kernel.sum()).astype(np.float32)
+        self.history = np.zeros(taps - 1, dtype=np.float32)
+        # Output lags input by this many samples; dropped at the start, flushed at the end
+        self.delay = (taps - 1) // 2
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        buf = np.concatenate((self.history, block))
+        self.history = buf[len(buf) - len(self.history):]
+        out = np.convolve(buf, self.kernel, mode="valid").astype(np.float32)
+        if self.delay:
+            drop = min(self.delay, len(out))
+            self.delay -= drop
+            out = out[drop:]
+        return out
+
+    def flush(self) -> np.ndarray:
+        return self.process(np.zeros((len(self.kernel) - 1) // 2, dtype=np.float32))
+
+
+class _Resampler:
+    """Streaming linear-interpolation resampler, with a low-pass in front when downsampling."""
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        self.step = source_rate / target_rate
+        self.lowpass = _LowPass(0.9 * target_rate / source_rate) if target_rate < source_rate else None
+        # Position of the next output sample, in input samples from the start of carry
+        self.pos = 0.0
+        self.carry = np.zeros(0, dtype=np.float32)
+
+    def _interpolate(self, block: np.ndarray) -> np.ndarray:
+        buf = np.concatenate((self.carry, block)) if len(self.carry) else block
+        last = len(buf) - 1
+        count = int(np.ceil((last - self.pos) / self.step)) if last > self.pos else 0
+        out = np.zeros(0, dtype=np.float32)
+        if count:
+            t = self.pos + self.step * np.arange(count)
+            i = t.astype(np.int64)
+            frac = (t - i).astype(np.float32)
+            out = buf[i] * (1.0 - frac) + buf[i + 1] * frac
+            self.pos += self.step * count
+        # Keep only the samples later outputs still need
+        base = max(0, min(int(self.pos), last))
+        self.carry = buf[base:]
+        self.pos -= base
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.step == 1.0:
+            return block
+        if self.lowpass is not None:
+            block = self.lowpass.process(block)
+        return self._interpolate(block)
+
+    def flush(self) -> np.ndarray:
+        if self.step == 1.0:
+            return np.zeros(0, dtype=np.float32)
+        tail = self.lowpass.flush() if self.lowpass is not None else np.zeros(0, dtype=np.float32)
+        out = self._interpolate(tail)
+        if len(self.carry) and self.pos - (len(self.carry) - 1) < 1e-9:
+            # The final input sample lands exactly on an output sample
+            out = np.concatenate((out, self.carry[-1:]))
+        return out
+
+
+def _measure(path: str, target_rate: int) -> Tuple[float, float]:
+    # First pass: RMS and peak, block by block
+    samples = 0
+    sum_sq = 0.0
+    peak = 0.0
+    with PcmReader(path, BLOCK_FRAMES, decode_rate=target_rate) as reader:
+        for block in reader.blocks():
+            samples += len(block)
+            sum_sq += float(np.dot(block, block))
+            if len(block):
+                peak = max(peak, float(np.abs(block).max()))
+    return (float(np.sqrt(sum_sq / samples)) if samples else 0.0), peak
+
+
+def normalization_gain(rms: float, peak: float, target_rms_dbfs: float = TARGET_RMS_DBFS, peak_ceiling_dbfs: float = PEAK_CEILING_DBFS) -> float:
+    """Gain that brings rms to the target without pushing peak past the ceiling (1.0 for silence)."""
+    if rms <= 0.0 or peak <= 0.0:
+        return 1.0
+    return min(_db_to_amplitude(target_rms_dbfs) / rms, _db_to_amplitude(peak_ceiling_dbfs) / peak)
+
+
+def transcode_file(
+    source: str,
+    target: str,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    target_rms_dbfs: float = TARGET_RMS_DBFS,
+    peak_ceiling_dbfs: float = PEAK_CEILING_DBFS,
+) -> Dict[str, Any]:
+    """
+    Write source as 16-bit mono PCM WAV at sample_rate, loudness-normalised.
+
+    Two streaming passes over the decoded audio: one to measure RMS and
+    peak, one to resample, apply the gain and write. The output appears
+    atomically at target.
+    """
+    rms, peak = _measure(source, sample_rate)
+    gain = normalization_gain(rms, peak, target_rms_dbfs, peak_ceiling_dbfs)
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    frames = 0
+    try:
+        with PcmReader(source, BLOCK_FRAMES, decode_rate=sample_rate) as reader, wave.open(tmp, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+            resampler = _Resampler(reader.sample_rate, sample_rate)
+            for block in reader.blocks():
+                frames += _write_block(out, resampler.process(block), gain)
+            frames += _write_block(out, resampler.flush(), gain)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {"frames": frames, "gain_db": round(20.0 * float(np.log10(gain)), 2)}
+
+
+def _write_block(out: Any, block: np.ndarray, gain: float) -> int:
+    if not len(block):
+        return 0
+    pcm = np.clip(block * (gain * 32767.0), -32768.0, 32767.0)
+    out.writeframes(np.round(pcm).astype("<i2").tobytes())
+    return len(block)
+
+
+def _transcode_job(job: Tuple[str, str, Optional[Dict[str, Any]], Dict[str, Any]]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    # -> (status, manifest record, error); status is "converted", "current" or "failed"
+    source, target, previous, settings = job
+    try:
+        digest = file_sha256(source).hex()
+        if (
+            previous is not None
+            and previous.get("source_sha256") == digest
+            and previous.get("settings") == settings
+            and os.path.exists(target)
+            and os.path.getsize(target) == previous.get("size")
+        ):
+            return "current", previous, None
+        info = transcode_file(source, target, **settings)
+        return "converted", {"source_sha256": digest, "settings": settings, "size": os.path.getsize(target), **info}, None
+    except Exception as exc:
+        return "failed", None, f"{type(exc).__name__}: {exc}"
+
+
+def transcode_library(
+    library: str,
+    output_root: str,
+    workers: Optional[int] = None,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    target_rms_dbfs: float = TARGET_RMS_DBFS,
+    peak_ceiling_dbfs: float = PEAK_CEILING_DBFS,
+    extensions: Tuple[str, ...] = AUDIO_EXTENSIONS,
+) -> Dict[str, Any]:
+    """
+    Mirror every clip under library into output_root as normalised PCM WAV.
+
+    Clips are spread over a process pool (one worker per core by default).
+    Each output's manifest record holds the SHA-256 of the source it was
+    made from and the settings used; when both still match and the output
+    is intact, the clip is skipped. Outputs whose source is gone are left
+    in place.
+    """
+    started = time.time()
+    library_path = Path(library)
+    out_path = Path(output_root)
+    manifest_path = out_path / MANIFEST_NAME
+    try:
+        manifest: Dict[str, Dict[str, Any]] = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    settings = {"sample_rate": sample_rate, "target_rms_dbfs": target_rms_dbfs, "peak_ceiling_dbfs": peak_ceiling_dbfs}
+
+    jobs: List[Tuple[str, str, Optional[Dict[str, Any]], Dict[str, Any]]] = []
+    names: List[str] = []
+    failed: Dict[str, str] = {}
+    claimed: Dict[str, str] = {}
+    for rel in sorted(scan_library(library_path, extensions)):
+        name = str(Path(rel).with_suffix(".wav"))
+        if name in claimed:
+            # e.g. door.mp3 next to door.ogg
+            failed[rel] = f"output {name} already produced from {claimed[name]}"
+            continue
+        claimed[name] = rel
+        names.append(name)
+        jobs.append((str(library_path / rel), str(out_path / name), manifest.get(name), settings))
+
+    counts = {"converted": 0, "current": 0}
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, min(16, len(jobs) // (workers * 8)))
+        # Spawned, not forked: the calling agent may hold threads, sockets and locks
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for name, (status, record, error) in zip(names, pool.map(_transcode_job, jobs, chunksize=chunksize)):
+                if status == "failed":
+                    failed[claimed[name]] = error
+                    continue
+                counts[status] += 1
+                manifest[name] = record
+
+    out_path.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, sort_keys=True))
+    os.replace(tmp, manifest_path)
+    return {**counts, "failed": failed, "seconds": round(time.time() - started, 3)}
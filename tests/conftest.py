@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class _Site:
+    """Routes served by the local test server: path -> (status, headers, body)."""
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.routes: Dict[str, Tuple[int, Dict[str, str], bytes]] = {}
+        self.requests: list = []
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def page(self, path: str, body: str, status: int = 200, **headers: str) -> None:
+        self.routes[path] = (status, {"Content-Type": "text/html", **headers}, body.encode())
+
+    def file(self, path: str, data: bytes, **headers: str) -> None:
+        self.routes[path] = (200, {"Content-Type": "application/octet-stream", **headers}, data)
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    state = _Site(f"http://127.0.0.1:{server.server_address[1]}")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            state.requests.append((self.path, dict(self.headers)))
+            status, headers, body = state.routes.get(self.path, (404, {}, b"not found"))
+            etag = headers.get("ETag")
+            if etag and self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+            elif status == 200 and self.headers.get("Range", "").startswith("bytes="):
+                if self.headers.get("If-Range") in (None, etag):
+                    start = int(self.headers["Range"][len("bytes="):].rstrip("-"))
+                    headers = {**headers, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"}
+                    status, body = 206, body[start:]
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server.RequestHandlerClass = Handler
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def write_wav():
+    """Writes float samples in [-1, 1] as a 16-bit mono WAV file."""
+    np = pytest.importorskip("numpy")
+    import wave
+
+    def write(path: Path, samples, rate: int = 22050) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with wave.open(str(path), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            out.writeframes((np.asarray(samples) * 32767).astype("<i2").tobytes())
+        return path
+
+    return write
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from synthos_core.agents_cursor import CursorLookupAgent, sync_docs
+from synthos_core.textindex import InvertedIndex
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def docs_site(site):
+    site.page("/docs/", '<a href="shortcuts">Shortcuts</a> <a href="models">Models</a>')
+    site.page("/docs/shortcuts", "<h1>Keyboard shortcuts</h1><p>Open the command palette with a shortcut.</p>")
+    site.page("/docs/models", "<h1>Models</h1><p>Pick a model for chat.</p>")
+    return site
+
+
+@pytest.fixture
+def agent(tmp_path, docs_site):
+    config = {"start_url": docs_site.url("/docs/"), "docs_dir": str(tmp_path / "docs"), "index_dir": str(tmp_path / "index")}
+    agent = CursorLookupAgent("cursor", config)
+    yield agent
+    agent.close()
+
+
+def test_lookup_uses_synced_index(agent, docs_site):
+    synced = agent.run({"action": "sync"})
+    assert synced["pages"] == 3 and synced["failed"] == []
+
+    requests_before = len(docs_site.requests)
+    result = agent.run({"query": "keyboard shortcut", "max_pages": 2, "markdown": True})
+
+    assert [hit["url"] for hit in result["results"]] == [docs_site.url("/docs/shortcuts")]
+    assert result["markdown"].startswith("# Cursor docs: keyboard shortcut")
+    assert len(docs_site.requests) == requests_before
+
+
+def test_language_syncs_keep_their_own_store_and_shard(tmp_path, site):
+    site.page("/", '<a href="guide">Guide</a> <a href="ja/">Japanese</a>')
+    site.page("/guide", "<p>keyboard shortcut</p>")
+    site.page("/ja/", '<a href="guide">Guide</a> <a href="/">English</a>')
+    site.page("/ja/guide", "<p>shortcut ja</p>")
+    docs_dir, index = str(tmp_path / "docs"), InvertedIndex(str(tmp_path / "index"))
+
+    en_store, _ = sync_docs(docs_dir, index, site.url("/"), "en", rate_per_host=1000)
+    assert set(en_store.pages) == {site.url("/"), site.url("/guide")}
+    ja_store, ja = sync_docs(docs_dir, index, site.url("/ja/"), "ja", rate_per_host=1000)
+    assert ja["removed"] == [] and set(ja_store.pages) == {site.url("/ja/"), site.url("/ja/guide")}
+    _, en = sync_docs(docs_dir, index, site.url("/"), "en", rate_per_host=1000)
+    assert en["removed"] == []
+
+    assert [url for url, _ in index.search("shortcut", "en")] == [site.url("/guide")]
+    assert [url for url, _ in index.search("shortcut", "ja")] == [site.url("/ja/guide")]
+    index.close()
+
+
+def test_lookup_requires_query(agent):
+    assert agent.run({"lang": "en"}) == {"error": "missing 'query'"}
+
+
+def test_downloader_and_topic_lookup_scripts_share_the_index(tmp_path, docs_site):
+    index_dir, docs_dir = str(tmp_path / "index"), str(tmp_path / "docs")
+    download = [sys.executable, str(ROOT / "scripts" / "cursor_docs_downloader.py"), "--start-url", docs_site.url("/docs/")]
+    subprocess.run(download + ["--docs-dir", docs_dir, "--index-dir", index_dir], check=True, capture_output=True)
+
+    lookup = [sys.executable, str(ROOT / "scripts" / "topic_lookup.py"), "palette", "--index-dir", index_dir]
+    out = subprocess.run(lookup, check=True, capture_output=True, text=True).stdout
+    assert out.split()[-1] == docs_site.url("/docs/shortcuts")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import pytest
+
+from synthos_core.agents_media import SoundEffectsAgent
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = SoundEffectsAgent("sfx", {"storage_dir": str(tmp_path / "store"), "http_cache_dir": str(tmp_path / "http")})
+    yield agent
+    agent.close()
+
+
+def _sfx_site(site):
+    site.page("/sfx/", '<a href="ships/">ships</a> <a href="doors/">doors</a> <a href="/elsewhere/">x</a>')
+    site.page("/sfx/ships/", '<a href="warp.wav">warp</a> <a href="../">up</a> <a href="http://other.example/a.wav">a</a>')
+    site.page("/sfx/doors/", '<a href="open.wav">open</a> <a href="cover.jpg">img</a>')
+    site.file("/sfx/ships/warp.wav", b"RIFFwarp")
+    site.file("/sfx/doors/open.wav", b"RIFFopen")
+
+
+def test_crawl_lists_audio_under_base_url(agent, site):
+    _sfx_site(site)
+    result = agent.run({"base_url": site.url("/sfx/"), "list_only": True})
+
+    assert result["audio_urls"] == [site.url("/sfx/doors/open.wav"), site.url("/sfx/ships/warp.wav")]
+    assert result["pages_fetched"] == 3
+    fetched = [path for path, _ in site.requests]
+    assert "/elsewhere/" not in fetched and "/sfx/doors/cover.jpg" not in fetched
+
+
+def test_interrupted_crawl_resumes_without_refetching(agent, site):
+    _sfx_site(site)
+    first = agent.run({"base_url": site.url("/sfx/"), "list_only": True, "max_pages": 1})
+    assert first["pages_fetched"] == 1 and first["audio_urls"] == []
+
+    second = agent.run({"base_url": site.url("/sfx/"), "list_only": True})
+    assert second["pages_fetched"] == 2
+    assert second["count"] == 2
+    assert [path for path, _ in site.requests].count("/sfx/") == 1
+
+    # Nothing is due again until the revisit interval has passed
+    third = agent.run({"base_url": site.url("/sfx/"), "list_only": True})
+    assert third["pages_fetched"] == 0 and third["count"] == 2
+
+
+def test_crawl_downloads_into_blob_store(agent, site, tmp_path):
+    _sfx_site(site)
+    result = agent.run({"base_url": site.url("/sfx/")})
+
+    assert result["downloaded_count"] == 2
+    assert (tmp_path / "store" / "ships" / "warp.wav").read_bytes() == b"RIFFwarp"
+    assert agent.memory.downloads(url=site.url("/sfx/doors/open.wav"))[0]["sha256"]
+
+
+def test_crawl_keeps_same_named_directories_apart(agent, site, tmp_path):
+    site.page("/", '<a href="a/sfx/">a</a> <a href="b/sfx/">b</a> <a href="top.wav">top</a>')
+    site.page("/a/sfx/", '<a href="warp.wav">warp</a>')
+    site.page("/b/sfx/", '<a href="warp.wav">warp</a>')
+    site.file("/a/sfx/warp.wav", b"RIFFa")
+    site.file("/b/sfx/warp.wav", b"RIFFb")
+    site.file("/top.wav", b"RIFFtop")
+    result = agent.run({"base_url": site.url("/")})
+
+    store = tmp_path / "store"
+    assert result["downloaded_count"] == 3
+    assert (store / "a" / "sfx" / "warp.wav").read_bytes() == b"RIFFa"
+    assert (store / "b" / "sfx" / "warp.wav").read_bytes() == b"RIFFb"
+    assert (store / "uncategorized" / "top.wav").read_bytes() == b"RIFFtop"
+
+
+def test_analyze_builds_feature_table_over_downloads(agent, tmp_path, write_wav):
+    np = pytest.importorskip("numpy")
+    write_wav(tmp_path / "store" / "ships" / "warp.wav", 0.5 * np.sin(np.arange(22050) / 10.0))
+
+    result = agent.run({"action": "analyze", "workers": 1})
+
+    assert result["rows"] == 1
+    assert result["features_dir"] == str(tmp_path / "store" / ".features")
+
+
+def test_analysis_actions_report_missing_numpy(agent, monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+    assert "needs numpy" in agent.run({"action": "analyze"})["error"]
+
+
+def test_query_and_dedupe_over_analysed_clips(agent, tmp_path, write_wav):
+    np = pytest.importorskip("numpy")
+    t = np.arange(22050) / 22050
+    store = tmp_path / "store"
+    write_wav(store / "ships" / "warp.wav", 0.4 * np.sin(2 * np.pi * 220 * t))
+    write_wav(store / "doors" / "warp.wav", 0.4 * np.sin(2 * np.pi * 220 * t))
+    write_wav(store / "doors" / "beep.wav", 0.4 * np.sin(2 * np.pi * 1500 * t))
+
+    assert "analyze" in agent.run({"action": "dedupe"})["error"]
+    agent.run({"action": "analyze", "workers": 1})
+
+    query = agent.run({"action": "query", "clip": "ships/warp.wav", "k": 1})
+    assert query["matches"][0]["path"] == "doors/warp.wav"
+    dedupe = agent.run({"action": "dedupe"})
+    assert dedupe["group_count"] == 1
+    assert dedupe["groups"][0]["identical"]
+
+
+def test_transcode_mirrors_library(agent, tmp_path, write_wav):
+    np = pytest.importorskip("numpy")
+    write_wav(tmp_path / "store" / "ships" / "warp.wav", 0.1 * np.sin(np.arange(22050) / 10.0))
+
+    result = agent.run({"action": "transcode", "workers": 1})
+
+    assert result["converted"] == 1
+    assert (tmp_path / "store" / ".transcoded" / "ships" / "warp.wav").exists()
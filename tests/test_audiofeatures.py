@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from synthos_core.audiofeatures import FeatureTable, analyze_file, build_feature_table  # noqa: E402
+
+
+RATE = 22050
+
+
+def _sine(freq: float, seconds: float = 1.0, amplitude: float = 0.5):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def test_analyze_file_measures_sine(tmp_path, write_wav):
+    features = analyze_file(str(write_wav(tmp_path / "a.wav", _sine(440.0, 2.0))))
+
+    assert features["duration"] == pytest.approx(2.0, abs=1e-3)
+    assert features["peak"] == pytest.approx(0.5, abs=1e-3)
+    assert features["rms"] == pytest.approx(0.5 / np.sqrt(2), abs=1e-3)
+    assert features["centroid_mean"] == pytest.approx(440.0, rel=0.1)
+    assert features["mfcc_mean"].shape == (13,)
+
+
+def test_feature_table_rebuilds_incrementally(tmp_path, write_wav):
+    library, table_root = tmp_path / "lib", tmp_path / "table"
+    write_wav(library / "ships" / "warp.wav", _sine(220.0))
+    write_wav(library / "doors" / "open.wav", _sine(880.0))
+    write_wav(library / ".blobs" / "ignored.wav", _sine(440.0))
+    (library / "doors" / "broken.wav").write_bytes(b"junk")
+    os.link(library / "ships" / "warp.wav", library / "doors" / "warp.wav")
+
+    first = build_feature_table(str(library), str(table_root), workers=2)
+    assert first["rows"] == 3
+    assert first["analyzed"] == 3
+    assert list(first["failed"]) == [os.path.join("doors", "broken.wav")]
+
+    assert build_feature_table(str(library), str(table_root), workers=2)["analyzed"] == 0
+
+    write_wav(library / "ships" / "hail.wav", _sine(330.0))
+    os.remove(library / "doors" / "open.wav")
+    third = build_feature_table(str(library), str(table_root), workers=2)
+    assert (third["analyzed"], third["reused"], third["removed"]) == (1, 2, 1)
+
+    table = FeatureTable(str(table_root))
+    assert table.paths == sorted([os.path.join("doors", "warp.wav"), os.path.join("ships", "hail.wav"), os.path.join("ships", "warp.wav")])
+    assert table.feature_matrix().shape == (3, 34)
+
+
+def test_table_without_a_column_is_rebuilt(tmp_path, write_wav):
+    library, table_root = tmp_path / "lib", tmp_path / "table"
+    write_wav(library / "ships" / "warp.wav", _sine(220.0))
+    build_feature_table(str(library), str(table_root), workers=1)
+    version = (table_root / "CURRENT").read_text().strip()
+    os.remove(table_root / version / "sha256.npy")
+
+    assert build_feature_table(str(library), str(table_root), workers=1)["analyzed"] == 1
+    assert len(FeatureTable(str(table_root)).columns["sha256"]) == 1
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from synthos_core.audiofeatures import build_feature_table  # noqa: E402
+from synthos_core.audioindex import AudioIndex  # noqa: E402
+
+
+RATE = 22050
+
+
+def _tone(freq: float, noise: float = 0.0, seed: int = 0):
+    t = np.arange(RATE) / RATE
+    rng = np.random.default_rng(seed)
+    return 0.4 * np.sin(2 * np.pi * freq * t) + noise * rng.uniform(-1, 1, len(t))
+
+
+@pytest.fixture
+def library(tmp_path, write_wav):
+    lib = tmp_path / "lib"
+    write_wav(lib / "ships" / "warp.wav", _tone(220.0))
+    write_wav(lib / "ships" / "hum.wav", _tone(230.0))
+    write_wav(lib / "doors" / "hiss.wav", _tone(3000.0, noise=0.5, seed=1))
+    write_wav(lib / "alarms" / "beep.wav", _tone(1500.0))
+    # Byte-identical copy in another category, stored as a separate file
+    shutil.copyfile(lib / "ships" / "warp.wav", lib / "doors" / "warp_copy.wav")
+    build_feature_table(str(lib), str(tmp_path / "table"), workers=1)
+    return AudioIndex.load(str(tmp_path / "table"))
+
+
+def test_query_ranks_similar_clips_first(library):
+    matches = library.query("ships/hum.wav", k=3)
+
+    assert len(matches) == 3
+    assert {m["path"] for m in matches[:2]} == {"ships/warp.wav", "doors/warp_copy.wav"}
+    assert all(m["path"] != "ships/hum.wav" for m in matches)
+    assert library.query_many(["ships/hum.wav"], k=3)[0] == matches
+
+
+def test_near_duplicates_groups_identical_content_by_hash(library):
+    groups = library.near_duplicates(threshold=0.9999)
+
+    assert groups == [
+        {
+            "paths": ["doors/warp_copy.wav", "ships/warp.wav"],
+            "categories": ["doors", "ships"],
+            "cross_category": True,
+            "identical": True,
+        }
+    ]
+
+
+def test_identical_clips_skip_the_similarity_scan(library):
+    scanned = []
+    original = library._exact_pairs
+
+    def spy(threshold, uf, rows):
+        scanned.append(len(rows))
+        return original(threshold, uf, rows)
+
+    library._exact_pairs = spy
+    library.near_duplicates()
+    assert scanned == [len(library) - 1]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+from synthos_core.blobstore import BlobStore
+
+
+def _staged(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path, hashlib.sha256(data).hexdigest()
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    first, digest = _staged(tmp_path, "one.part", b"clip")
+    second, _ = _staged(tmp_path, "two.part", b"clip")
+
+    blob = store.add(first, digest, "http://x/a/clip.wav")
+    assert store.add(second, digest, "http://x/b/clip.wav") == blob
+    assert blob.read_bytes() == b"clip" and store.has(digest)
+    assert not first.exists() and not second.exists()
+    lines = store.manifest_path.read_text().splitlines()
+    assert [json.loads(line)["url"] for line in lines] == ["http://x/a/clip.wav"]
+    assert not store.has("") and not store.has("0" * 64)
+
+
+def test_views_are_hardlinks_replaced_atomically(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    old, old_digest = _staged(tmp_path, "old.part", b"old")
+    new, new_digest = _staged(tmp_path, "new.part", b"new")
+    store.add(old, old_digest)
+    store.add(new, new_digest)
+    view = tmp_path / "library" / "ships" / "warp.wav"
+
+    store.link(old_digest, view)
+    assert os.path.samefile(view, store.path_for(old_digest))
+    assert store.link(old_digest, view) == view
+    store.link(new_digest, view)
+    assert view.read_bytes() == b"new"
+    assert sorted(p.name for p in view.parent.iterdir()) == ["warp.wav"]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from synthos_core import cli
+from synthos_core.agents_media import PROCESS_ACTION_TIMEOUTS
+from synthos_core.orchestrator import Orchestrator, Task
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "synthos_core.cli", *args], cwd=ROOT, capture_output=True, text=True)
+
+
+def test_run_executes_every_task_of_an_ndjson_file(tmp_path):
+    tasks = tmp_path / "tasks.ndjson"
+    tasks.write_text('{"id": "1", "agent_type": "echo", "input": {"n": 1}}\n{"id": "2", "agent_type": "echo", "input": {"n": 2}}\n')
+    proc = run_cli("run", "--tasks", str(tasks), "--no-cache")
+    assert proc.returncode == 0, proc.stderr
+    assert [item["result"]["echo"]["n"] for item in json.loads(proc.stdout)] == [1, 2]
+
+
+def test_run_rejects_trailing_data_after_the_task_array(tmp_path):
+    tasks = tmp_path / "tasks.json"
+    tasks.write_text('[{"id": "1", "agent_type": "echo"}]\n{"id": "2", "agent_type": "echo"}\n')
+    proc = run_cli("run", "--tasks", str(tasks), "--no-cache")
+    assert proc.returncode != 0 and "Extra data" in proc.stderr
+
+
+def test_cached_runs_keep_the_output_shape_and_report_counts_on_stderr(tmp_path):
+    tasks = tmp_path / "tasks.json"
+    tasks.write_text('[{"id": "1", "agent_type": "echo", "input": {"n": 1}}]')
+    cache_dir = str(tmp_path / "cache")
+    first = run_cli("run", "--tasks", str(tasks), "--cache-dir", cache_dir)
+    second = run_cli("run", "--tasks", str(tasks), "--cache-dir", cache_dir)
+    assert [item["cache"] for item in json.loads(first.stdout)] == ["miss"]
+    assert [item["cache"] for item in json.loads(second.stdout)] == ["hit"]
+    assert "1 hit(s), 0 miss(es)" in second.stderr
+
+    streamed = run_cli("run", "--tasks", str(tasks), "--cache-dir", cache_dir, "--stream")
+    assert [json.loads(line)["cache"] for line in streamed.stdout.splitlines()] == ["hit"]
+
+    single = run_cli("agent", "echo", "--input", '{"n": 1}', "--cache-dir", cache_dir)
+    assert set(json.loads(single.stdout)) == {"task_id", "agent_type", "result", "cache"}
+
+
+def test_cpu_bound_sfx_actions_run_in_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert cli._execution_policy("sfx", {"action": "dedupe"}) == ("process", PROCESS_ACTION_TIMEOUTS["dedupe"])
+    assert cli._execution_policy("sfx", {"base_url": "http://x/"}) == ("inline", None)
+    assert cli._execution_policy("echo", {}) == ("inline", None)
+
+    args = argparse.Namespace(no_cache=True, process_workers=1, tasks_per_worker=10, task_timeout=None)
+    orch = Orchestrator(cli.build_default_registry())
+    run_task, _, router = cli._build_runner(args, orch)
+    config = {"storage_dir": str(tmp_path / "store")}
+    try:
+        assert run_task(Task(id="crawl", agent_type="sfx", config=config))["result"] == {"error": "missing 'base_url'"}
+        assert router._pool is None
+        analyzed = run_task(Task(id="analyze", agent_type="sfx", input={"action": "analyze", "workers": 2}, config=config))
+        assert router._pool is not None
+        assert "result" in analyzed, analyzed
+    finally:
+        router.close()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from synthos_core.docsync import PageStore, sync
+from synthos_core.textindex import InvertedIndex
+
+
+def _build_site(site) -> None:
+    site.page("/docs/index.html", '<a href="a.html">a</a> <a href="b.html">b</a>')
+    site.page("/docs/a.html", "<p>alpha</p>")
+    site.page("/docs/b.html", "<p>beta</p>")
+
+
+def test_first_sync_stores_every_linked_page(site, tmp_path):
+    _build_site(site)
+    store = PageStore(str(tmp_path))
+    summary = sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+    assert sorted(summary["added"]) == sorted(site.url(f"/docs/{p}") for p in ("index.html", "a.html", "b.html"))
+    assert store.read(site.url("/docs/a.html")) == b"<p>alpha</p>"
+
+
+def test_failed_fetch_never_prunes_stored_pages(site, tmp_path):
+    _build_site(site)
+    store = PageStore(str(tmp_path))
+    sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+
+    site.page("/docs/index.html", "down", status=503)
+    summary = sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+    assert summary["failed"] == [site.url("/docs/index.html")]
+    assert summary["removed"] == []
+    assert set(PageStore(str(tmp_path)).pages) == {site.url(f"/docs/{p}") for p in ("index.html", "a.html", "b.html")}
+
+
+def test_unlinked_and_gone_pages_are_removed(site, tmp_path):
+    _build_site(site)
+    store = PageStore(str(tmp_path))
+    sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+
+    site.page("/docs/index.html", '<a href="a.html">a</a>')
+    del site.routes["/docs/a.html"]
+    summary = sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+    assert sorted(summary["removed"]) == sorted([site.url("/docs/a.html"), site.url("/docs/b.html")])
+    assert summary["changed"] == [site.url("/docs/index.html")]
+
+
+def test_sync_prunes_only_within_its_own_scope(site, tmp_path):
+    site.page("/index.html", '<a href="guide.html">guide</a> <a href="ja/index.html">ja</a>')
+    site.page("/guide.html", "<p>guide</p>")
+    site.page("/ja/index.html", '<a href="../index.html">en</a>')
+    store = PageStore(str(tmp_path))
+    sync(site.url("/ja/index.html"), store, rate_per_host=1000)
+    assert set(store.pages) == {site.url("/ja/index.html")}
+
+    summary = sync(site.url("/index.html"), store, rate_per_host=1000, exclude=[site.url("/ja/")])
+    assert summary["removed"] == []
+    assert set(store.pages) == {site.url(p) for p in ("/index.html", "/guide.html", "/ja/index.html")}
+
+
+def test_index_is_reconciled_with_unchanged_pages(site, tmp_path):
+    _build_site(site)
+    store = PageStore(str(tmp_path / "docs"))
+    sync(site.url("/docs/index.html"), store, rate_per_host=1000)
+
+    # A fresh shard, holding a document the store has no page for
+    index = InvertedIndex(str(tmp_path / "index"))
+    index.update("en", [(site.url("/docs/old.html"), "obsolete")])
+    summary = sync(site.url("/docs/index.html"), store, rate_per_host=1000, index=index)
+    assert summary["added"] == summary["changed"] == [] and summary["indexed_count"] == 3
+    assert set(index.versions("en")) == set(store.pages)
+    assert [url for url, _ in index.search("alpha", "en")] == [site.url("/docs/a.html")]
+
+    assert sync(site.url("/docs/index.html"), store, rate_per_host=1000, index=index)["indexed_count"] == 0
+    index.close()
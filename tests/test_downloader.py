@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+
+from synthos_core.downloader import AdaptiveConcurrency, DownloadEngine, DownloadIndex, TokenBucket, download_file
+from synthos_core.httpclient import HTTPError
+from synthos_core.memory import AgentMemory
+
+
+DATA = bytes(range(256)) * 64
+
+
+def test_download_file_resumes_partial_transfer(site, tmp_path):
+    site.file("/clip.wav", DATA, ETag='"v1"')
+    dest = tmp_path / "clip.wav"
+    dest.with_name("clip.wav.part").write_bytes(DATA[:1000])
+    dest.with_name("clip.wav.part.json").write_text(json.dumps({"validator": '"v1"'}))
+
+    info = download_file(site.url("/clip.wav"), dest)
+
+    assert dest.read_bytes() == DATA
+    assert info["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert site.requests[-1][1]["Range"] == "bytes=1000-"
+    assert not dest.with_name("clip.wav.part.json").exists()
+
+
+def test_download_file_restarts_when_resource_changed(site, tmp_path):
+    site.file("/clip.wav", DATA, ETag='"v2"')
+    dest = tmp_path / "clip.wav"
+    dest.with_name("clip.wav.part").write_bytes(b"x" * 1000)
+    dest.with_name("clip.wav.part.json").write_text(json.dumps({"validator": '"v1"'}))
+
+    download_file(site.url("/clip.wav"), dest)
+
+    assert dest.read_bytes() == DATA
+
+
+def test_download_file_conditional_on_known_copy(site, tmp_path):
+    site.file("/clip.wav", DATA, ETag='"v1"')
+    assert download_file(site.url("/clip.wav"), tmp_path / "clip.wav", known={"etag": '"v1"'}) is None
+
+
+def test_download_index_is_backed_by_agent_memory(tmp_path):
+    memory = AgentMemory(str(tmp_path / "memory.sqlite3"))
+    index = DownloadIndex(memory, "trekcore")
+    index.record({"url": "http://x/a.wav", "path": "a.wav", "size": 1, "etag": '"v1"', "last_modified": None, "sha256": "aa"})
+    index.record({"url": "http://x/a.wav", "path": "a.wav", "size": 2, "etag": '"v2"', "last_modified": None, "sha256": "bb"})
+
+    assert index.get("http://x/a.wav")["etag"] == '"v2"'
+    assert index.get("http://x/missing.wav") is None
+    assert [row["sha256"] for row in memory.downloads(url="http://x/a.wav")] == ["bb", "aa"]
+    memory.close()
+
+
+def test_download_index_imports_legacy_ndjson(tmp_path):
+    legacy = tmp_path / ".downloads.ndjson"
+    legacy.write_text(json.dumps({"url": "http://x/a.wav", "path": "a.wav", "sha256": "aa"}) + "\nnot json\n")
+    memory = AgentMemory(str(tmp_path / "memory.sqlite3"))
+
+    index = DownloadIndex(memory, "trekcore", legacy_path=legacy)
+
+    assert index.get("http://x/a.wav")["sha256"] == "aa"
+    assert not legacy.exists()
+    assert DownloadIndex(memory, "trekcore", legacy_path=legacy).get("http://x/a.wav")["sha256"] == "aa"
+    memory.close()
+
+
+def test_agent_memory_adds_columns_to_old_downloads_table(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "memory.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE downloads (id INTEGER PRIMARY KEY, agent TEXT NOT NULL, url TEXT NOT NULL, category TEXT, filename TEXT, path TEXT, created_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    memory = AgentMemory(str(path))
+    memory.record_download("trekcore", "http://x/a.wav", sha256="aa")
+    assert memory.downloads()[0]["sha256"] == "aa"
+    memory.close()
+
+
+def test_adaptive_concurrency_grows_when_healthy_and_halves_on_overload():
+    limit = AdaptiveConcurrency(initial=2, maximum=4)
+    for _ in range(2 + 3):
+        limit.record(0.01, ok=True)
+    assert limit.limit == 4
+    limit.record(0.01, ok=False)
+    assert limit.limit == 2
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=20)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 4 / 20 * 0.9
+
+
+def test_download_engine_reports_every_url_within_its_concurrency_cap():
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            in_flight.append(url)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(url)
+        if url.endswith("/bad"):
+            raise HTTPError(404, "Not Found", url)
+        return url.upper()
+
+    urls = [f"http://h{i % 3}/{i}" for i in range(30)] + ["http://h0/bad"]
+    engine = DownloadEngine(fetch, rate_per_host=1000, max_concurrency=3)
+    outcomes = {url: (result, error) for url, result, error in engine.run(urls)}
+
+    assert set(outcomes) == set(urls)
+    assert outcomes["http://h1/1"] == ("HTTP://H1/1", None)
+    assert outcomes["http://h0/bad"][1].status == 404
+    assert max(peak) <= 3
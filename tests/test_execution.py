@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from synthos_core.execution import ExecutionRouter, ProcessWorkerPool
+from synthos_core.orchestrator import Task
+from synthos_core.payloads import PayloadRef
+
+
+def _run(task):
+    action = task.input.get("action")
+    if action == "sleep":
+        time.sleep(task.input["seconds"])
+    if action == "crash":
+        os._exit(3)
+    if action == "raise":
+        raise RuntimeError("boom")
+    if action == "blob":
+        return {"task_id": task.id, "data": b"y" * task.input["size"]}
+    return {"task_id": task.id, "pid": os.getpid(), "thread": threading.current_thread().name}
+
+
+def _runner_factory():
+    return _run
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr("synthos_core.payloads._default_root_dir", lambda: str(tmp_path))
+    pool = ProcessWorkerPool(_runner_factory, max_workers=1, max_tasks_per_worker=2)
+    yield pool
+    pool.close()
+
+
+def _task(task_id="t", **task_input):
+    return Task(id=task_id, agent_type="worker", input=task_input)
+
+
+def test_workers_are_reused_then_recycled(pool):
+    pids = [pool.run_task(_task(str(i)))["pid"] for i in range(3)]
+    assert pids[0] == pids[1] != pids[2]
+    assert os.getpid() not in pids
+
+
+def test_failures_become_error_results(pool):
+    assert pool.run_task(_task(action="raise"))["error"] == "RuntimeError: boom"
+    assert "worker process died" in pool.run_task(_task(action="crash"))["error"]
+    assert "timed out" in pool.run_task(_task(action="sleep", seconds=5), timeout=0.5)["error"]
+    assert "error" not in pool.run_task(_task())
+
+
+def test_large_results_come_back_as_payload_refs(pool):
+    result = pool.run_task(_task(action="blob", size=pool.arena.inline_limit))
+    assert isinstance(result["data"], PayloadRef)
+    assert bytes(result["data"].view()) == b"y" * pool.arena.inline_limit
+    assert pool.run_task(_task(action="blob", size=10))["data"] == b"y" * 10
+
+
+def test_router_runs_each_execution_class(pool):
+    policies = {"inline": ("inline", None), "thread": ("thread", 0.5), "process": ("process", None), "odd": ("gpu", None)}
+    router = ExecutionRouter(_run, lambda agent_type, task_input: policies[agent_type], lambda: pool)
+
+    def run(agent_type, **task_input):
+        return router.run_task(Task(id=agent_type, agent_type=agent_type, input=task_input))
+
+    assert run("inline")["thread"] == threading.current_thread().name
+    assert run("thread")["thread"] == "task-thread"
+    assert "timed out after 0.5s" in run("thread", action="sleep", seconds=2)["error"]
+    assert run("process")["pid"] != os.getpid()
+    assert run("odd")["error"] == "unknown execution class: gpu"
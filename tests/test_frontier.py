@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from synthos_core.frontier import CrawlFrontier
+
+
+def test_unfetched_urls_come_first_shallowest_first(tmp_path):
+    frontier = CrawlFrontier(tmp_path / "frontier.ndjson")
+    frontier.add("http://x/deep", depth=2)
+    frontier.add("http://x/", depth=0)
+    frontier.add("http://x/a", depth=1)
+    assert not frontier.add("http://x/a", depth=1)
+
+    assert [frontier.pop(now=0)[0] for _ in range(3)] == ["http://x/", "http://x/a", "http://x/deep"]
+    assert frontier.pop(now=0) is None
+
+
+def test_interrupted_crawl_resumes_from_journal(tmp_path):
+    path = tmp_path / "frontier.ndjson"
+    frontier = CrawlFrontier(path)
+    frontier.add("http://x/")
+    frontier.pop(now=100)
+    frontier.complete("http://x/", "h1", now=100)
+    frontier.add("http://x/a", depth=1)
+    frontier.add("http://x/b", depth=1)
+    frontier.pop(now=100)
+    # Process dies here with /a popped but never completed
+
+    resumed = CrawlFrontier(path)
+    assert len(resumed) == 3
+    assert [resumed.pop(now=101)[0] for _ in range(2)] == ["http://x/a", "http://x/b"]
+    assert resumed.pop(now=101) is None
+
+
+def test_revisit_interval_adapts_to_changes(tmp_path):
+    frontier = CrawlFrontier(tmp_path / "frontier.ndjson", min_revisit=10, max_revisit=1000)
+    frontier.add("http://x/")
+    frontier.complete("http://x/", "h1", now=0)
+    assert frontier.next_due() == 10
+    frontier.complete("http://x/", "h1", now=10)
+    assert frontier.next_due() == 30
+    frontier.complete("http://x/", "h2", now=30)
+    assert frontier.next_due() == 40
+    assert frontier.pop(now=39) is None
+    assert frontier.pop(now=40) == ("http://x/", 0)
+
+
+def test_compaction_keeps_state(tmp_path):
+    path = tmp_path / "frontier.ndjson"
+    frontier = CrawlFrontier(path, min_revisit=10)
+    frontier.add("http://x/")
+    for i in range(20):
+        frontier.complete("http://x/", "same", now=float(i))
+    assert len(path.read_text().splitlines()) <= 4
+
+    resumed = CrawlFrontier(path, min_revisit=10)
+    assert resumed.next_due() == frontier.next_due()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from synthos_core.httpcache import CacheMiss, HTTPCache
+
+
+def _fetches(site, path):
+    return [headers for p, headers in site.requests if p == path]
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path, site):
+    site.page("/index/", "v1", **{"Cache-Control": "max-age=3600"})
+    cache = HTTPCache(str(tmp_path))
+    assert cache.get(site.url("/index/")) == b"v1"
+    site.page("/index/", "v2")
+    assert cache.get(site.url("/index/")) == b"v1"
+    assert len(_fetches(site, "/index/")) == 1
+
+
+def test_stale_entries_are_revalidated(tmp_path, site):
+    site.page("/index/", "v1", ETag='"a"')
+    cache = HTTPCache(str(tmp_path))
+    assert cache.get(site.url("/index/")) == b"v1"
+    assert HTTPCache(str(tmp_path)).get(site.url("/index/")) == b"v1"
+    revalidation = _fetches(site, "/index/")[1]
+    assert revalidation["If-None-Match"] == '"a"'
+
+    site.page("/index/", "v2", ETag='"b"')
+    assert cache.get(site.url("/index/")) == b"v2"
+
+
+def test_age_counts_against_max_age(tmp_path, site):
+    site.page("/young/", "v1", **{"Cache-Control": "max-age=3600", "Age": "60"})
+    site.page("/old/", "v1", **{"Cache-Control": "max-age=3600", "Age": "3600"})
+    cache = HTTPCache(str(tmp_path))
+    for path in ("/young/", "/old/"):
+        cache.get(site.url(path))
+        cache.get(site.url(path))
+    assert len(_fetches(site, "/young/")) == 1
+    assert len(_fetches(site, "/old/")) == 2
+
+
+def test_stale_entry_is_served_when_revalidation_fails(tmp_path, site):
+    site.page("/index/", "v1", ETag='"a"')
+    cache = HTTPCache(str(tmp_path))
+    assert cache.get(site.url("/index/")) == b"v1"
+
+    site.page("/index/", "down", status=503)
+    assert cache.get(site.url("/index/")) == b"v1"
+    assert len(_fetches(site, "/index/")) == 2
+
+
+def test_stale_entry_is_served_when_the_origin_is_unreachable(tmp_path, site):
+    class _Unreachable:
+        def get(self, url, headers=None):
+            raise ConnectionRefusedError(url)
+
+    site.page("/index/", "v1")
+    cache = HTTPCache(str(tmp_path))
+    assert cache.get(site.url("/index/")) == b"v1"
+    cache.client = _Unreachable()
+    assert cache.get(site.url("/index/")) == b"v1"
+    with pytest.raises(ConnectionRefusedError):
+        cache.get(site.url("/other/"))
+
+
+def test_no_store_responses_are_not_written(tmp_path, site):
+    site.page("/index/", "secret", **{"Cache-Control": "no-store"})
+    cache = HTTPCache(str(tmp_path))
+    assert cache.get(site.url("/index/")) == b"secret"
+    assert not list(tmp_path.glob("*.body"))
+
+
+def test_offline_serves_stale_entries_only(tmp_path, site):
+    site.page("/index/", "v1")
+    HTTPCache(str(tmp_path)).get(site.url("/index/"))
+    offline = HTTPCache(str(tmp_path), offline=True)
+    assert offline.get(site.url("/index/")) == b"v1"
+    with pytest.raises(CacheMiss):
+        offline.get(site.url("/other/"))
+    assert len(site.requests) == 1
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path, site):
+    cache = HTTPCache(str(tmp_path), max_bytes=250)
+    for name in "abc":
+        site.page(f"/{name}/", name * 100)
+        cache.get(site.url(f"/{name}/"))
+    offline = HTTPCache(str(tmp_path), offline=True)
+    with pytest.raises(CacheMiss):
+        offline.get(site.url("/a/"))
+    assert offline.get(site.url("/c/")) == b"c" * 100
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.body")) <= 250
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import gc
+import gzip
+
+import pytest
+
+from synthos_core.httpclient import HTTPClient, HTTPError
+
+
+@pytest.fixture
+def client():
+    client = HTTPClient(pool_size=2, timeout=5)
+    yield client
+    client.close()
+
+
+def _idle(client):
+    return sum(pool.idle.qsize() for pool in client._pools.values())
+
+
+def test_connections_are_kept_alive_and_reused(client, site):
+    site.page("/a", "a")
+    site.page("/b", "b")
+    assert client.get(site.url("/a")).read() == b"a"
+    assert client.get(site.url("/b")).read() == b"b"
+    # Both requests went over one connection, now idle again
+    assert _idle(client) == 1
+
+
+def test_partially_read_response_discards_its_connection(client, site):
+    site.file("/big", b"x" * 200_000)
+    resp = client.get(site.url("/big"))
+    next(resp.iter_content(1024))
+    resp.close()
+    assert _idle(client) == 0
+    assert client.get(site.url("/big")).read() == b"x" * 200_000
+
+
+def test_gzip_bodies_are_decoded(client, site):
+    site.file("/gz", gzip.compress(b"hello" * 1000), **{"Content-Encoding": "gzip"})
+    assert client.get(site.url("/gz")).read() == b"hello" * 1000
+    assert site.requests[0][1]["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_redirects_are_followed_and_errors_raised(client, site):
+    site.page("/old", "", status=301, Location="/new")
+    site.page("/new", "moved here")
+    resp = client.get(site.url("/old"))
+    assert (resp.url, resp.read()) == (site.url("/new"), b"moved here")
+
+    with pytest.raises(HTTPError) as err:
+        client.get(site.url("/missing")).raise_for_status()
+    assert err.value.status == 404
+
+
+def test_dropped_unread_response_gives_its_slot_back(site):
+    client = HTTPClient(pool_size=1, timeout=5)
+    site.page("/a", "a")
+    resp = client.get(site.url("/a"))
+    del resp
+    gc.collect()
+    assert client.get(site.url("/a")).read() == b"a"
+    client.close()
+
+
+def test_waiting_for_a_connection_times_out(site):
+    client = HTTPClient(pool_size=1, timeout=0.3)
+    site.page("/a", "a")
+    held = client.get(site.url("/a"))
+    with pytest.raises(TimeoutError):
+        client.get(site.url("/a"))
+    held.close()
+    assert client.get(site.url("/a")).read() == b"a"
+    client.close()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from synthos_core.links import LinkExtractor, all_of, iter_links, same_origin, under_prefix, with_extension
+
+
+BASE = "http://x/audio/ships/"
+
+
+def _chunks(page: str, size: int):
+    data = page.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_links_are_resolved_deduplicated_and_filtered():
+    page = (
+        '<a href="warp.wav">1</a><a href=warp.wav>again</a><a href="./warp.wav">same link</a>'
+        "<a href='/audio/hail.MP3'>2</a><a href=\"door&amp;bell.wav\">3</a>"
+        '<a href="http://elsewhere/x.wav">4</a><a href="notes.txt">5</a><img src="pic.wav">'
+    )
+    accept = all_of(same_origin(BASE), with_extension([".wav", ".mp3"]))
+    assert list(iter_links([page.encode()], BASE, accept)) == [
+        "http://x/audio/ships/warp.wav",
+        "http://x/audio/hail.MP3",
+        "http://x/audio/ships/door&bell.wav",
+    ]
+    assert list(iter_links([page.encode()], BASE, under_prefix("http://x/audio/ships/"))) == [
+        "http://x/audio/ships/warp.wav",
+        "http://x/audio/ships/door&bell.wav",
+        "http://x/audio/ships/notes.txt",
+    ]
+
+
+def test_first_base_href_applies_to_later_links():
+    page = '<a href="a.wav"></a><base href="/mirror/"><base href="/ignored/"><a href="b.wav"></a>'
+    assert list(iter_links([page.encode()], BASE)) == ["http://x/audio/ships/a.wav", "http://x/mirror/b.wav"]
+
+
+def test_chunk_boundaries_and_raw_text_do_not_change_the_result():
+    page = (
+        '<script>var s = "<a href=\'fake.wav\'>";</script>'
+        '<a href="café.wav">x</a><!-- <a href="commented.wav"> --><a href="end.wav">y</a>'
+    )
+    whole = list(iter_links([page.encode()], BASE))
+    assert whole == ["http://x/audio/ships/café.wav", "http://x/audio/ships/end.wav"]
+    for size in (1, 2, 3, 7):
+        assert list(iter_links(_chunks(page, size), BASE)) == whole
+
+
+def test_drain_returns_only_new_links():
+    parser = LinkExtractor(BASE)
+    parser.feed_bytes(b'<a href="a.wav"></a><a hr')
+    assert parser.drain() == ["http://x/audio/ships/a.wav"]
+    parser.feed_bytes(b'ef="b.wav"></a><a href="a.wav"></a>')
+    parser.close()
+    assert parser.drain() == ["http://x/audio/ships/b.wav"]
+    assert parser.drain() == []
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+from synthos_core import memory as memory_module
+from synthos_core.memory import AgentMemory
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_downloads_filtered_by_category_and_time(tmp_path):
+    memory = AgentMemory(str(tmp_path / "m.sqlite3"))
+    memory.record_download("trekcore", "http://x/a.mp3", category="ships", filename="a.mp3")
+    cutoff = time.time()
+    memory.record_downloads("trekcore", [{"url": "http://x/b.mp3", "category": "ships"}, {"url": "http://x/c.mp3", "category": "aliens"}])
+    assert [d["url"] for d in memory.downloads(category="ships")] == ["http://x/b.mp3", "http://x/a.mp3"]
+    assert [d["url"] for d in memory.downloads(category="ships", since=cutoff)] == ["http://x/b.mp3"]
+    memory.close()
+
+
+def test_batched_writes_are_committed_within_the_flush_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_module, "FLUSH_INTERVAL_SECONDS", 0.1)
+    db = tmp_path / "m.sqlite3"
+    memory = AgentMemory(str(db))
+    memory.remember("agent", "k", "v")
+    time.sleep(0.5)
+    # A second connection only sees committed rows
+    other = AgentMemory(str(db))
+    assert [m["value"] for m in other.recall(agent="agent")] == ["v"]
+    memory.close()
+    other.close()
+
+
+def test_queries_see_pending_rows_without_flushing(tmp_path):
+    db = tmp_path / "m.sqlite3"
+    memory = AgentMemory(str(db))
+    memory.record_download("agent", "http://x/a.mp3", category="c", size=1)
+    memory.flush()
+    memory.record_downloads("agent", [{"url": "http://x/b.mp3", "category": "c"}, {"url": "http://x/a.mp3", "size": 2}])
+    memory.remember("agent", "k", "v")
+
+    assert [d["size"] for d in memory.downloads(url="http://x/a.mp3", limit=1)] == [2]
+    assert [d["url"] for d in memory.downloads(category="c")] == ["http://x/b.mp3", "http://x/a.mp3"]
+    assert [m["value"] for m in memory.recall(key="k")] == ["v"]
+    # Nothing was committed by the reads
+    other = AgentMemory(str(db))
+    assert [d["size"] for d in other.downloads(agent="agent")] == [1]
+    assert other.recall() == []
+    memory.close()
+    other.close()
+
+
+def test_idle_writer_killed_after_flush_interval_keeps_its_rows(tmp_path):
+    db = tmp_path / "m.sqlite3"
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {str(ROOT)!r})
+        from synthos_core.memory import AgentMemory, FLUSH_INTERVAL_SECONDS
+        memory = AgentMemory({str(db)!r})
+        memory.remember("agent", "first", "1")
+        memory.record_download("agent", "http://x/a.mp3", category="c")
+        print("written", flush=True)
+        time.sleep(60)
+    """)
+    proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+    assert proc.stdout.readline().strip() == "written"
+    time.sleep(memory_module.FLUSH_INTERVAL_SECONDS + 1.0)
+    os.kill(proc.pid, signal.SIGKILL)
+    proc.wait()
+    memory = AgentMemory(str(db))
+    assert [m["key"] for m in memory.recall(agent="agent")] == ["first"]
+    assert [d["url"] for d in memory.downloads(agent="agent")] == ["http://x/a.mp3"]
+    memory.close()
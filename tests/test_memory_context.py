@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from synthos_ai.memory.context import _Journal
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _journal(path: Path) -> _Journal:
+    return _Journal(str(path), lambda: json.loads(path.read_text()))
+
+
+def _other_process(path: Path, script: str) -> None:
+    # Runs script with `journal` and `data` bound to a fresh load of path in a separate interpreter
+    prelude = textwrap.dedent(f"""
+        import json, sys
+        sys.path.insert(0, {str(ROOT)!r})
+        from pathlib import Path
+        from synthos_ai.memory.context import _Journal
+        path = Path({str(path)!r})
+        journal = _Journal(str(path), lambda: json.loads(path.read_text()))
+        data = journal.load(lambda: {{"notes": []}})
+    """)
+    subprocess.run([sys.executable, "-c", prelude + textwrap.dedent(script)], check=True)
+
+
+def test_append_survives_compaction_and_save_by_another_process(tmp_path):
+    path = tmp_path / "memory.json"
+    journal = _journal(path)
+    data = journal.load(lambda: {"notes": []})
+    journal.save(data)
+    journal.append(data, "append", "notes", "a")
+
+    _other_process(path, """
+        journal.compact()
+        journal.append(data, "append", "notes", "b")
+        journal.save(data)
+    """)
+
+    journal.append(data, "append", "notes", "c")
+    assert data["notes"] == ["a", "b", "c"]
+    journal.save(data)
+    assert _journal(path).load(dict)["notes"] == ["a", "b", "c"]
+
+
+def test_concurrent_appends_merge(tmp_path):
+    path = tmp_path / "memory.json"
+    journal = _journal(path)
+    data = journal.load(lambda: {"notes": []})
+    journal.save(data)
+
+    _other_process(path, """
+        for i in range(20):
+            journal.append(data, "append", "notes", f"other-{i}")
+    """)
+    journal.append(data, "append", "notes", "mine")
+    fresh = _journal(path).load(dict)
+    assert fresh["notes"] == [f"other-{i}" for i in range(20)] + ["mine"]
+    assert fresh == data
+
+
+def test_missing_snapshot_starts_from_default(tmp_path):
+    path = tmp_path / "memory.json"
+    assert _journal(path).load(lambda: {"notes": ["default"]}) == {"notes": ["default"]}
+
+
+def test_corrupt_snapshot_is_moved_aside_not_overwritten(tmp_path, caplog):
+    path = tmp_path / "memory.json"
+    path.write_text('{"notes": ["precious"')
+    data = _journal(path).load(lambda: {"notes": []})
+    assert data == {"notes": []}
+    corrupt = list(tmp_path.glob("memory.json.*.corrupt"))
+    assert len(corrupt) == 1
+    assert corrupt[0].read_text() == '{"notes": ["precious"'
+    assert "Unreadable" in caplog.text
+
+
+def test_loading_memory_creates_no_files(tmp_path, monkeypatch):
+    from synthos_ai.memory.context import SynthosMemory
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SYNTHOS_HOME", raising=False)
+    memory = SynthosMemory(session="demo")
+    assert memory.context["identity"]["name"] == "Synthos"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_memory_files_live_under_root(tmp_path, monkeypatch):
+    from synthos_ai.memory.context import SynthosMemory
+
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "home"
+    memory = SynthosMemory(session="demo", root=str(root))
+    memory.add_context_note("hello")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["home"]
+    assert SynthosMemory(session="demo", root=str(root)).session["context_notes"][-1]["note"] == "hello"
+    assert (root / ".synthos_sessions" / "demo.json.journal").exists()
+
+
+def test_compaction_without_a_saved_snapshot(tmp_path):
+    path = tmp_path / "memory.json"
+    journal = _journal(path)
+    data = journal.load(lambda: {"notes": ["default"]})
+    journal.append(data, "append", "notes", "a")
+    journal.compact()
+    assert json.loads(path.read_text())["notes"] == ["default", "a"]
+    assert _journal(path).load(dict)["notes"] == ["default", "a"]
+
+
+def test_parsed_copy_is_used_until_the_file_changes(tmp_path):
+    from synthos_ai.memory.context import CACHE_SUFFIX, SynthosMemory
+
+    path = tmp_path / ".synthos_memory.json"
+    path.write_text(json.dumps({"identity": {"name": "First"}}))
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "First"
+    cache = Path(str(path) + CACHE_SUFFIX)
+    assert cache.exists()
+
+    path.write_text(json.dumps({"identity": {"name": "Second one"}}))
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "Second one"
+    cache.write_bytes(b"not marshal data")
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "Second one"
+
+
+def test_package_singletons_are_created_on_first_access(tmp_path):
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {str(ROOT)!r})
+        os.chdir({str(tmp_path)!r})
+        import synthos_ai
+        assert "memory" not in vars(synthos_ai) and "identity" not in vars(synthos_ai)
+        memory = synthos_ai.memory
+        assert synthos_ai.memory is memory and "identity" not in vars(synthos_ai)
+    """)
+    env = {k: v for k, v in os.environ.items() if k != "SYNTHOS_HOME"}
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_snapshot_replaced_while_parsing_is_not_cached_as_the_new_version(tmp_path, monkeypatch):
+    from synthos_ai.memory import context
+    from synthos_ai.memory.context import CACHE_SUFFIX, SynthosMemory
+
+    path = tmp_path / ".synthos_memory.json"
+    path.write_text(json.dumps({"identity": {"name": "Old"}}))
+    parse = json.load
+    replaced = []
+
+    def replaced_mid_parse(f):
+        data = parse(f)
+        if replaced:
+            return data
+        # Another process compacts or saves between the read and the cache write
+        replaced.append(True)
+        tmp = tmp_path / "new.tmp"
+        tmp.write_text(json.dumps({"identity": {"name": "New"}}))
+        os.replace(tmp, path)
+        return data
+
+    monkeypatch.setattr(context.json, "load", replaced_mid_parse)
+    # The load notices the new snapshot and reads it again
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "New"
+    monkeypatch.setattr(context.json, "load", parse)
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "New"
+    assert SynthosMemory(root=str(tmp_path)).context["identity"]["name"] == "New"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+
+from synthos_core.agent import BaseAgent
+from synthos_core.agents_builtin import EchoAgent, ShellAgent
+from synthos_core.orchestrator import Orchestrator, Task
+from synthos_core.registry import AgentRegistry
+
+
+class _Recorder(BaseAgent):
+    instances: list = []
+
+    def __init__(self, name, config=None):
+        super().__init__(name, config)
+        self.closed = False
+        _Recorder.instances.append(self)
+
+    def run(self, task_input):
+        if task_input.get("fail"):
+            raise RuntimeError("boom")
+        return {"name": self.name, "config": self.config}
+
+    def close(self):
+        self.closed = True
+
+
+def _orchestrator(shared=False):
+    _Recorder.instances = []
+    registry = AgentRegistry()
+    registry.register("rec", _Recorder, shared=shared)
+    registry.register("echo", EchoAgent)
+    return Orchestrator(registry)
+
+
+def test_results_wrap_agent_output_and_agents_are_closed():
+    orch = _orchestrator()
+    result = orch.run_task(Task(id="1", agent_type="rec", config={"k": 1}))
+    assert result == {"task_id": "1", "agent_type": "rec", "result": {"name": "rec", "config": {"k": 1}}}
+    assert orch.run_task(Task(id="2", agent_type="rec", name="named"))["result"]["name"] == "named"
+    assert [a.closed for a in _Recorder.instances] == [True, True]
+    assert orch.run_tasks([Task(id="e", agent_type="echo", input={"m": 1})])[0]["result"] == {"echo": {"m": 1}}
+
+
+def test_failures_become_error_results():
+    orch = _orchestrator()
+    assert orch.run_task(Task(id="1", agent_type="rec", input={"fail": True}))["error"] == "RuntimeError: boom"
+    assert _Recorder.instances[0].closed
+    assert orch.run_task(Task(id="2", agent_type="nope"))["error"] == "unknown agent_type: nope"
+    orch.shutdown()
+    assert "shut down" in orch.run_task(Task(id="3", agent_type="echo"))["error"]
+
+
+def test_shared_agents_are_left_open():
+    orch = _orchestrator(shared=True)
+    orch.run_task(Task(id="1", agent_type="rec"))
+    assert not _Recorder.instances[0].closed
+
+
+def test_shell_agent_reports_exit_code_and_output():
+    agent = ShellAgent("shell")
+    result = agent.run({"command": f'"{sys.executable}" -c "print(42); raise SystemExit(3)"'})
+    assert (result["returncode"], result["stdout"].strip()) == (3, "42")
+    assert "timed out" in agent.run({"command": f'"{sys.executable}" -c "import time; time.sleep(5)"', "timeout": 0.2})["error"]
+    assert agent.run({}) == {"error": "missing 'command'"}
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from synthos_core.payloads import ARENA_PREFIX, PayloadArena, PayloadRef, sweep_stale_arenas
+
+
+BIG = b"x" * (128 * 1024)
+
+
+def _echo_runner(task):
+    data = task.input["data"]
+    if task.input.get("sleep"):
+        time.sleep(task.input["sleep"])
+    if task.input.get("big"):
+        return {"data": BIG}
+    if task.input.get("hand_on"):
+        return {"data": data}
+    return {"size": len(bytes(data.view())) if isinstance(data, PayloadRef) else len(data)}
+
+
+def _runner_factory():
+    return _echo_runner
+
+
+def test_export_swaps_large_values_for_refs(tmp_path):
+    arena = PayloadArena(str(tmp_path), inline_limit=1024)
+    created = []
+    value = {"small": b"abc", "big": [BIG]}
+
+    exported = arena.export(value, created)
+
+    assert exported["small"] == b"abc"
+    assert isinstance(exported["big"][0], PayloadRef)
+    assert bytes(exported["big"][0].view()) == BIG
+    assert created == [exported["big"][0]]
+    assert arena.export({"small": b"abc"}) == {"small": b"abc"}
+
+
+def test_arena_size_is_capped(tmp_path):
+    arena = PayloadArena(str(tmp_path), inline_limit=1024, max_bytes=len(BIG) + 1000)
+    first = arena.export(BIG)
+    assert isinstance(first, PayloadRef)
+    assert arena.export(BIG) is BIG
+    with pytest.raises(OSError):
+        arena.allocate(len(BIG))
+
+    view = first.view()
+    arena.release(first)
+    assert not os.path.exists(first.path)
+    assert isinstance(arena.export(BIG), PayloadRef)
+    assert len(view) == len(BIG)
+
+
+def test_owned_arena_sweeps_arenas_of_dead_owners(tmp_path, monkeypatch):
+    monkeypatch.setattr("synthos_core.payloads._default_root_dir", lambda: str(tmp_path))
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale = tmp_path / f"{ARENA_PREFIX}{int(dead.stdout)}-abc"
+    stale.mkdir()
+    (stale / "payload").write_bytes(BIG)
+    live = tmp_path / f"{ARENA_PREFIX}{os.getpid()}-def"
+    live.mkdir()
+    unrelated = tmp_path / "other"
+    unrelated.mkdir()
+
+    arena = PayloadArena()
+
+    assert not stale.exists()
+    assert live.exists() and unrelated.exists()
+    assert os.path.basename(arena.root).startswith(f"{ARENA_PREFIX}{os.getpid()}-")
+    arena.close()
+    assert not os.path.exists(arena.root)
+    assert sweep_stale_arenas(str(tmp_path)) == []
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    from synthos_core.execution import ProcessWorkerPool
+
+    monkeypatch.setattr("synthos_core.payloads._default_root_dir", lambda: str(tmp_path))
+    pool = ProcessWorkerPool(_runner_factory, max_workers=1)
+    yield pool
+    pool.close()
+
+
+def _task(**task_input):
+    from synthos_core.orchestrator import Task
+
+    return Task(id="t", agent_type="echo", input=task_input)
+
+
+def test_pool_unlinks_input_payloads_after_each_task(pool):
+    assert pool.run_task(_task(data=BIG)) == {"size": len(BIG)}
+    assert os.listdir(pool.arena.root) == []
+
+    result = pool.run_task(_task(data=BIG, sleep=5), timeout=0.5)
+    assert "timed out" in result["error"]
+    assert os.listdir(pool.arena.root) == []
+
+
+def test_pool_keeps_input_payloads_the_result_hands_on(pool):
+    result = pool.run_task(_task(data=BIG, hand_on=True))
+    assert bytes(result["data"].view()) == BIG
+    pool.release_result(result)
+    assert os.listdir(pool.arena.root) == []
+
+
+def test_arena_budget_is_shared_by_every_process_using_it(tmp_path):
+    owner = PayloadArena(str(tmp_path), inline_limit=1024, max_bytes=len(BIG) + 1000)
+    attached = PayloadArena(str(tmp_path), inline_limit=1024, max_bytes=len(BIG) + 1000)
+    ref = owner.export(BIG)
+    assert attached.used == len(BIG)
+    assert attached.export(BIG) is BIG
+
+    attached.release(ref)
+    assert isinstance(owner.export(BIG), PayloadRef)
+
+
+def test_recycled_workers_do_not_reset_the_budget(tmp_path, monkeypatch):
+    from synthos_core.execution import ProcessWorkerPool
+
+    monkeypatch.setattr("synthos_core.payloads._default_root_dir", lambda: str(tmp_path))
+    pool = ProcessWorkerPool(_runner_factory, max_workers=1, max_tasks_per_worker=1, arena_max_bytes=len(BIG))
+    try:
+        first = pool.run_task(_task(data=b"", big=True))
+        assert isinstance(first["data"], PayloadRef)
+        # A fresh worker, but the first result still holds the whole budget
+        assert pool.run_task(_task(data=b"", big=True))["data"] == BIG
+        pool.release_result(first)
+        assert isinstance(pool.run_task(_task(data=b"", big=True))["data"], PayloadRef)
+    finally:
+        pool.close()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from synthos_core.orchestrator import Orchestrator, Task
+from synthos_core.pool import AgentPool
+from synthos_core.registry import AgentRegistry
+
+
+class _Agent:
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.closed = False
+
+    def run(self, task_input):
+        return {"name": self.name}
+
+    def close(self):
+        self.closed = True
+
+
+def test_same_settings_reuse_one_instance():
+    pool = AgentPool()
+    factory = pool.wrap("trekcore", _Agent)
+    first = factory("a", {"x": 1, "y": 2})
+    assert factory("a", {"y": 2, "x": 1}) is first
+    assert factory("b", {"x": 1, "y": 2}) is not first
+    assert factory("a", None) is not first
+    assert (pool.hits, pool.misses, len(pool)) == (1, 3, 3)
+
+
+def test_least_recently_used_instance_is_evicted_and_closed():
+    pool = AgentPool(max_size=2)
+    factory = pool.wrap("trekcore", _Agent)
+    a, b = factory("a"), factory("b")
+    assert factory("a") is a
+    for agent in (a, b, a):
+        pool.release(agent)
+    c = factory("c")
+    assert b.closed and not a.closed and not c.closed
+    assert len(pool) == 2
+
+    pool.release(c)
+    pool.close()
+    assert a.closed and c.closed and len(pool) == 0
+
+
+def test_instances_in_use_are_closed_only_once_released():
+    pool = AgentPool(max_size=1)
+    factory = pool.wrap("trekcore", _Agent)
+    a = factory("a")
+    assert factory("a") is a
+    b = factory("b")
+    assert not a.closed and len(pool) == 1
+    pool.release(a)
+    assert not a.closed
+    pool.release(a)
+    assert a.closed
+
+    pool.close()
+    assert not b.closed
+    pool.release(b)
+    assert b.closed
+
+
+def test_idle_instances_expire():
+    pool = AgentPool(idle_timeout=0.05)
+    factory = pool.wrap("trekcore", _Agent)
+    a = factory("a")
+    time.sleep(0.1)
+    # Still leased, so not idle
+    assert factory("b") is not a and not a.closed
+    pool.release(a)
+    assert factory("a") is a
+    pool.release(a)
+    time.sleep(0.1)
+    assert factory("a") is not a
+    assert a.closed
+
+
+def test_orchestrator_hands_pooled_agents_back():
+    pool = AgentPool(max_size=1)
+    created = []
+
+    def factory(name, config):
+        created.append(_Agent(name, config))
+        return created[-1]
+
+    registry = AgentRegistry()
+    registry.register("trekcore", pool.wrap("trekcore", factory), shared=True, release=pool.release)
+    orch = Orchestrator(registry)
+    assert orch.run_task(Task(id="1", agent_type="trekcore", name="a"))["result"] == {"name": "a"}
+    assert orch.run_task(Task(id="2", agent_type="trekcore", name="b"))["result"] == {"name": "b"}
+    # a was handed back after its task, so evicting it closed it at once
+    assert [agent.closed for agent in created] == [True, False]
+
+
+def test_pool_size_must_be_positive():
+    with pytest.raises(ValueError):
+        AgentPool(max_size=0)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from synthos_core.orchestrator import Task
+from synthos_core.payloads import PayloadArena
+from synthos_core.resultcache import ResultCache
+
+
+def _counting_runner(result):
+    calls = []
+
+    def run_task(task):
+        calls.append(task.id)
+        return result(task) if callable(result) else result
+
+    return run_task, calls
+
+
+def test_wrap_serves_repeats_from_cache_and_counts(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    run_task, calls = _counting_runner({"value": 1})
+    cached = cache.wrap(run_task, lambda agent_type, task_input: 60)
+
+    first = cached(Task(id="a", agent_type="echo", input={"q": 1}))
+    second = cached(Task(id="b", agent_type="echo", input={"q": 1}))
+
+    assert first["cache"] == "miss" and second == {"value": 1, "task_id": "b", "cache": "hit"}
+    assert calls == ["a"]
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    # A fresh cache over the same directory reads the entry back from disk
+    assert ResultCache(str(tmp_path)).wrap(run_task, lambda *_: 60)(Task(id="c", agent_type="echo", input={"q": 1}))["cache"] == "hit"
+
+
+def test_binary_and_error_results_are_not_cached(tmp_path):
+    arena = PayloadArena(str(tmp_path), inline_limit=4)
+    results = {
+        "bytes": {"data": b"abc"},
+        "ref": {"items": [{"data": arena.store(b"payload")}]},
+        "error": {"error": "boom"},
+    }
+    cache = ResultCache(str(tmp_path / "cache"))
+    run_task, calls = _counting_runner(lambda task: results[task.input["kind"]])
+    cached = cache.wrap(run_task, lambda *_: 60)
+
+    for kind in results:
+        cached(Task(id=kind, agent_type="echo", input={"kind": kind}))
+        cached(Task(id=kind, agent_type="echo", input={"kind": kind}))
+
+    assert calls == ["bytes", "bytes", "ref", "ref", "error", "error"]
+    assert cache.stats() == {"hits": 0, "misses": 6}
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from synthos_core.orchestrator import Task
+from synthos_core.scheduler import TaskScheduler
+
+
+def _task(task_id: str, agent_type: str = "echo") -> Task:
+    return Task(id=task_id, agent_type=agent_type, input={})
+
+
+def _echo(task: Task):
+    return {"task_id": task.id, "agent_type": task.agent_type}
+
+
+def test_results_in_input_order_and_dependencies_honoured():
+    finished = []
+
+    def run(task: Task):
+        if task.id == "a":
+            time.sleep(0.05)
+        finished.append(task.id)
+        return _echo(task)
+
+    tasks = [_task("a"), _task("b"), _task("c")]
+    results = TaskScheduler(run, max_workers=3).run(tasks, depends_on=[[], ["a"], []])
+    assert [r["task_id"] for r in results] == ["a", "b", "c"]
+    assert finished.index("a") < finished.index("b")
+
+
+def test_failure_propagates_down_a_long_chain_without_recursion():
+    n = 3000
+
+    def run(task: Task):
+        if task.id == "t0":
+            raise RuntimeError("boom")
+        return _echo(task)
+
+    tasks = [_task(f"t{i}") for i in range(n)]
+    depends_on = [[]] + [[f"t{i - 1}"] for i in range(1, n)]
+    results = TaskScheduler(run, max_workers=2).run(tasks, depends_on)
+    assert results[0]["error"] == "boom"
+    assert results[1]["error"] == "dependency failed: t0"
+    assert results[-1]["error"] == f"dependency failed: t{n - 2}"
+
+
+def test_per_agent_limit_caps_concurrency():
+    active = {"slow": 0}
+    peak = {"slow": 0}
+    lock = threading.Lock()
+
+    def run(task: Task):
+        with lock:
+            active[task.agent_type] = active.get(task.agent_type, 0) + 1
+            peak[task.agent_type] = max(peak.get(task.agent_type, 0), active[task.agent_type])
+        time.sleep(0.01)
+        with lock:
+            active[task.agent_type] -= 1
+        return _echo(task)
+
+    tasks = [_task(str(i), "slow") for i in range(8)]
+    TaskScheduler(run, max_workers=4, per_agent_limit=2).run(tasks)
+    assert peak["slow"] == 2
+
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    scheduler = TaskScheduler(_echo)
+    with pytest.raises(ValueError, match="cycle"):
+        scheduler.run([_task("a"), _task("b")], [["b"], ["a"]])
+    with pytest.raises(ValueError, match="unknown"):
+        scheduler.run([_task("a")], [["missing"]])
+
+
+def test_run_stream_yields_every_result():
+    tasks = (_task(str(i)) for i in range(50))
+    results = list(TaskScheduler(_echo, max_workers=4).run_stream(tasks))
+    assert sorted(int(r["task_id"]) for r in results) == list(range(50))
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+
+from synthos_ai.integrations import session as shared  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(monkeypatch):
+    monkeypatch.setattr(shared, "_session", None)
+    yield
+    if shared._session is not None:
+        shared._session.close()
+
+
+def test_concurrent_first_use_creates_one_session():
+    start = threading.Barrier(8)
+    seen = []
+
+    def use():
+        start.wait()
+        seen.append(shared.get_session())
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(s) for s in seen}) == 1
+    assert shared.get_session() is seen[0]
+
+
+def test_configure_session_replaces_the_shared_session():
+    first = shared.get_session()
+    second = shared.configure_session(pool_connections=2, pool_maxsize=4)
+    assert second is not first
+    assert shared.get_session() is second
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from synthos_core import taskfile
+from synthos_core.taskfile import iter_json_array
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(text: str):
+        path = tmp_path / "tasks.json"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    return write
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1 << 20])
+def test_elements_match_json_loads_across_window_sizes(write, monkeypatch, chunk_size):
+    monkeypatch.setattr(taskfile, "CHUNK_SIZE", chunk_size)
+    items = [
+        {"id": "1", "agent_type": "echo", "input": {"message": "héllo ✓"}},
+        12345,
+        -0.5e3,
+        "s",
+        None,
+        [True, False, {"nested": [1, 2]}],
+    ]
+    path = write(" \n" + json.dumps(items, ensure_ascii=False, indent=1) + "\n")
+    assert list(iter_json_array(path)) == items
+
+
+def test_single_object_and_empty_inputs(write):
+    assert list(iter_json_array(write('{"agent_type": "echo"}'))) == [{"agent_type": "echo"}]
+    assert list(iter_json_array(write(""))) == []
+    assert list(iter_json_array(write("  \n"))) == []
+    assert list(iter_json_array(write("[ ]"))) == []
+
+
+def test_malformed_arrays_raise(write):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write("[1 2]")))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write('[{"a": 1},')))
+
+
+def test_leading_object_reads_every_ndjson_line(write):
+    path = write('{"id": "1", "agent_type": "echo"}\n\n{"id": "2", "agent_type": "echo"}\n')
+    assert [item["id"] for item in iter_json_array(path)] == ["1", "2"]
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write('{"id": "1"}\nnot json\n')))
+
+
+def test_trailing_data_after_array_raises(write):
+    assert list(iter_json_array(write("[1, 2] \n"))) == [1, 2]
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write("[1, 2] 3")))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write("[] x")))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from synthos_core.textindex import MAX_SEGMENTS, InvertedIndex, tokenize
+
+
+DOCS = [
+    ("http://d/shortcuts", "Keyboard shortcuts for the editor: open the command palette"),
+    ("http://d/models", "Choose a model for chat and for the command line agent"),
+    ("http://d/privacy", "Privacy mode keeps your code off our servers"),
+]
+
+
+def test_tokenize_lowercases_and_drops_single_characters():
+    assert tokenize("Open a File, then SAVE it") == ["open", "file", "then", "save", "it"]
+
+
+def test_search_ranks_by_bm25(tmp_path):
+    index = InvertedIndex(str(tmp_path))
+    assert index.update("en", DOCS) == 3
+
+    assert [doc for doc, _ in index.search("keyboard shortcuts", "en")] == ["http://d/shortcuts"]
+    ranked = index.search("command", "en")
+    assert {doc for doc, _ in ranked} == {"http://d/shortcuts", "http://d/models"}
+    assert ranked[0][1] >= ranked[1][1] > 0
+    assert index.search("command", "ja") == []
+    index.close()
+
+
+def test_updates_are_incremental_and_persistent(tmp_path):
+    index = InvertedIndex(str(tmp_path))
+    index.update("en", DOCS)
+    assert index.update("en", DOCS) == 0
+    assert index.update("en", [("http://d/privacy", "Privacy mode and telemetry settings")], removed=["http://d/models"]) == 1
+    index.close()
+
+    reopened = InvertedIndex(str(tmp_path))
+    assert [doc for doc, _ in reopened.search("telemetry", "en")] == ["http://d/privacy"]
+    assert reopened.search("servers", "en") == []
+    assert reopened.search("model", "en") == []
+    reopened.close()
+
+
+def test_segments_merge_without_losing_documents(tmp_path):
+    index = InvertedIndex(str(tmp_path))
+    for i in range(MAX_SEGMENTS + 3):
+        index.update("en", [(f"http://d/{i}", f"page {i} about shortcuts")])
+    assert len(list((tmp_path / "en").glob("seg-*"))) <= MAX_SEGMENTS
+    assert len(index.search("shortcuts", "en", limit=100)) == MAX_SEGMENTS + 3
+    index.close()
+
+
+def test_second_reader_sees_updates(tmp_path):
+    reader = InvertedIndex(str(tmp_path))
+    assert reader.search("shortcuts", "en") == []
+    writer = InvertedIndex(str(tmp_path))
+    writer.update("en", DOCS)
+    writer.close()
+    assert [doc for doc, _ in reader.search("keyboard", "en")] == ["http://d/shortcuts"]
+    reader.close()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from synthos_core.transcode import MANIFEST_NAME, TARGET_RMS_DBFS, transcode_file, transcode_library  # noqa: E402
+
+
+def _read(path):
+    with wave.open(str(path), "rb") as f:
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2").astype(np.float64) / 32767
+        return f.getframerate(), f.getnchannels(), samples
+
+
+def _tone(rate: int, seconds: float = 1.0, amplitude: float = 0.05):
+    t = np.arange(int(rate * seconds)) / rate
+    return amplitude * np.sin(2 * np.pi * 440 * t)
+
+
+def test_transcode_file_resamples_and_normalises(tmp_path, write_wav):
+    source = write_wav(tmp_path / "in.wav", _tone(22050), rate=22050)
+
+    info = transcode_file(str(source), str(tmp_path / "out.wav"))
+
+    rate, channels, samples = _read(tmp_path / "out.wav")
+    assert (rate, channels) == (44100, 1)
+    assert abs(len(samples) - 44100) <= 2
+    assert info["frames"] == len(samples)
+    rms_dbfs = 20 * np.log10(np.sqrt(np.mean(samples ** 2)))
+    assert rms_dbfs == pytest.approx(TARGET_RMS_DBFS, abs=0.2)
+
+
+def test_transcode_library_skips_current_outputs(tmp_path, write_wav):
+    library, output = tmp_path / "lib", tmp_path / "out"
+    write_wav(library / "ships" / "warp.wav", _tone(44100))
+    write_wav(library / "doors" / "open.wav", _tone(22050), rate=22050)
+    (library / "doors" / "broken.wav").write_bytes(b"junk")
+
+    first = transcode_library(str(library), str(output), workers=2)
+    assert (first["converted"], first["current"]) == (2, 0)
+    assert list(first["failed"]) == ["doors/broken.wav"]
+    assert set(json.loads((output / MANIFEST_NAME).read_text())) == {"ships/warp.wav", "doors/open.wav"}
+
+    second = transcode_library(str(library), str(output), workers=2)
+    assert (second["converted"], second["current"]) == (0, 2)
+
+    write_wav(library / "ships" / "warp.wav", _tone(44100, amplitude=0.2))
+    assert transcode_library(str(library), str(output), workers=2)["converted"] == 1
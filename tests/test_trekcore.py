@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+
+from synthos_core.agents_trekcore import _hashed_name, _view_names
+
+
+def test_view_names_keep_basename_when_unique():
+    assert _view_names(["http://x/audio/a/door.wav", "http://x/audio/a/hail.wav"]) == {
+        "http://x/audio/a/door.wav": "door.wav",
+        "http://x/audio/a/hail.wav": "hail.wav",
+    }
+
+
+def test_view_names_suffix_colliding_basenames_by_url_alone():
+    urls = ["http://x/audio/a/door.wav", "http://x/audio/b/door.wav", "http://x/audio/c/door.wav"]
+    names = _view_names(urls)
+    assert names == {url: _hashed_name(url) for url in urls}
+    assert len(set(names.values())) == 3
+    assert all(n.startswith("door-") and n.endswith(".wav") for n in names.values())
+    assert _view_names(urls[::-1]) == names
+    assert _view_names(urls[1:])[urls[1]] == names[urls[1]]
+
+
+def test_download_never_repoints_an_existing_view(tmp_path, monkeypatch, site):
+    from synthos_core.agents_trekcore import TrekCoreAgent
+
+    monkeypatch.chdir(tmp_path)
+    config = {"storage_dir": str(tmp_path / "store"), "http_cache_dir": str(tmp_path / "http")}
+    site.file("/audio/ships/warp.wav", b"RIFF ships")
+    site.file("/a/warp.wav", b"RIFF other")
+    for links in ('<a href="warp.wav">warp</a>', '<a href="warp.wav">warp</a> <a href="/a/warp.wav">same name</a>'):
+        site.page("/audio/ships/", links)
+        agent = TrekCoreAgent("trekcore", config)
+        try:
+            result = agent.run({"action": "download", "category_url": site.url("/audio/ships/")})
+        finally:
+            agent.close()
+        assert result["failed_count"] == 0
+
+    ships = tmp_path / "store" / "ships"
+    assert (ships / "warp.wav").read_bytes() == b"RIFF ships"
+    assert (ships / _hashed_name(site.url("/a/warp.wav"))).read_bytes() == b"RIFF other"
+    assert len(list(ships.iterdir())) == 2
+
+
+def test_download_reports_clips_that_failed(tmp_path, monkeypatch, site):
+    from synthos_core.agents_trekcore import TrekCoreAgent
+
+    monkeypatch.chdir(tmp_path)
+    site.page("/audio/ships/", '<a href="hail.wav">hail</a> <a href="gone.wav">gone</a>')
+    site.file("/audio/ships/hail.wav", b"RIFF hail")
+    agent = TrekCoreAgent("trekcore", {"storage_dir": str(tmp_path / "store"), "http_cache_dir": str(tmp_path / "http")})
+    try:
+        result = agent.run({"action": "download", "category_url": site.url("/audio/ships/")})
+    finally:
+        agent.close()
+
+    assert (result["downloaded_count"], result["failed_count"]) == (1, 1)
+    assert [e["url"] for e in result["errors"]] == [site.url("/audio/ships/gone.wav")]
+    assert "404" in result["errors"][0]["error"]
+    assert (tmp_path / "store" / "ships" / "hail.wav").read_bytes() == b"RIFF hail"
+
+
+def test_download_transcodes_category_when_configured(tmp_path, monkeypatch, site, write_wav):
+    np = pytest.importorskip("numpy")
+    from synthos_core.agents_trekcore import TrekCoreAgent
+
+    monkeypatch.chdir(tmp_path)
+    clip = write_wav(tmp_path / "src.wav", 0.1 * np.sin(np.arange(22050) / 10.0))
+    site.page("/audio/ships/", '<a href="warp.wav">warp</a> <a href="/other/warp.wav">same name</a>')
+    site.file("/audio/ships/warp.wav", clip.read_bytes())
+    site.file("/other/warp.wav", clip.read_bytes())
+    config = {"storage_dir": str(tmp_path / "store"), "http_cache_dir": str(tmp_path / "http"), "transcode_dir": str(tmp_path / "pcm")}
+    agent = TrekCoreAgent("trekcore", config)
+    try:
+        result = agent.run({"action": "download", "category_url": site.url("/audio/ships/")})
+    finally:
+        agent.close()
+
+    assert result["downloaded_count"] == 2
+    assert result["transcode"]["converted"] == 2
+    assert len(list((tmp_path / "pcm" / "ships").glob("*.wav"))) == 2